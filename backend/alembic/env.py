@@ -17,7 +17,14 @@ from app.models import (
     MindMapEdge,
     Flashcard,
     FlashcardProgress,
+    FlashcardReviewLog,
+    FSRSParameters,
     GameSession,
+    StudyStats,
+    FlashcardDueCount,
+    MindMapStructureCache,
+    FlashcardEvaluationCache,
+    BackgroundJob,
 )
 
 # este es el objeto Alembic Config, que proporciona
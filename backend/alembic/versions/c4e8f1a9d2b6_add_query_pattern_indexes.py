@@ -0,0 +1,36 @@
+"""add query pattern indexes
+
+Revision ID: c4e8f1a9d2b6
+Revises: b7d41e6a2c93
+Create Date: 2026-10-18 16:05:41.218734
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4e8f1a9d2b6'
+down_revision = 'b7d41e6a2c93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Los nodos, aristas, el progreso por usuario y la caché de evaluaciones ya
+    # tienen índices por sus restricciones únicas (mind_map_id, ...) / (user_id, ...)
+    op.create_index('ix_mind_maps_user_id_created_at', 'mind_maps', ['user_id', sa.text('created_at DESC')], unique=False)
+    op.create_index('ix_game_sessions_user_id_created_at', 'game_sessions', ['user_id', sa.text('created_at DESC')], unique=False)
+    op.create_index('ix_game_sessions_mind_map_id', 'game_sessions', ['mind_map_id'], unique=False)
+    op.create_index('ix_flashcards_mind_map_id_created_at', 'flashcards', ['mind_map_id', 'created_at'], unique=False)
+    op.create_index('ix_flashcard_progress_user_id_next_review_date', 'flashcard_progress', ['user_id', 'next_review_date'], unique=False)
+    op.create_index('ix_flashcard_progress_flashcard_id', 'flashcard_progress', ['flashcard_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_flashcard_progress_flashcard_id', table_name='flashcard_progress')
+    op.drop_index('ix_flashcard_progress_user_id_next_review_date', table_name='flashcard_progress')
+    op.drop_index('ix_flashcards_mind_map_id_created_at', table_name='flashcards')
+    op.drop_index('ix_game_sessions_mind_map_id', table_name='game_sessions')
+    op.drop_index('ix_game_sessions_user_id_created_at', table_name='game_sessions')
+    op.drop_index('ix_mind_maps_user_id_created_at', table_name='mind_maps')
@@ -1,18 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
-from app.database import get_db
-from app.dependencies import get_current_user
+from app.config import settings
+from app.database import get_db, AsyncSessionLocal
+from app.dependencies import get_current_user, get_flashcard_service
 from app.models.user import User
 from app.schemas.flashcard import (
     FlashcardResponse,
     FlashcardReview,
+    FlashcardReviewBatchRequest,
+    FlashcardReviewBatchResponse,
     FlashcardProgressResponse,
+    FlashcardDueQueueResponse,
+    FlashcardDueCountResponse,
     FlashcardAnswerSubmission,
     AIEvaluationResponse,
+    FlashcardBatchEvaluationRequest,
+    FlashcardBatchEvaluationResponse,
 )
 from app.services.flashcard_service import FlashcardService
-from app.services.ai_service import AIService
 
 
 router = APIRouter(prefix="/flashcards", tags=["Flashcards"])
@@ -25,9 +33,9 @@ async def get_flashcards_for_mind_map(
     mind_map_id: UUID,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
+    flashcard_service: FlashcardService = Depends(get_flashcard_service),
 ):
     """Obtén todas las tarjetas para un mapa mental."""
-    flashcard_service = FlashcardService()
     flashcards = await flashcard_service.get_flashcards_for_mind_map(
         db=db, mind_map_id=mind_map_id
     )
@@ -41,9 +49,9 @@ async def review_flashcard(
     review: FlashcardReview,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
+    flashcard_service: FlashcardService = Depends(get_flashcard_service),
 ):
     """Revisar una tarjeta de estudio y actualizar el progreso utilizando el algoritmo SM-2."""
-    flashcard_service = FlashcardService()
 
     try:
         progress = await flashcard_service.review_flashcard(
@@ -59,19 +67,70 @@ async def review_flashcard(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
-@router.get("/due", response_model=list[FlashcardProgressResponse])
+@router.post("/reviews", response_model=FlashcardReviewBatchResponse)
+async def review_flashcards_batch(
+    batch: FlashcardReviewBatchRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    flashcard_service: FlashcardService = Depends(get_flashcard_service),
+):
+    """Registrar varias revisiones (p. ej. una sesión hecha sin conexión) en una sola solicitud."""
+    try:
+        results, skipped = await flashcard_service.review_flashcards(
+            db=db,
+            user_id=current_user.id,
+            reviews=[
+                (item.flashcard_id, item.quality, item.reviewed_at)
+                for item in batch.reviews
+            ],
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+    return FlashcardReviewBatchResponse(results=results, skipped=skipped)
+
+
+@router.get("/due", response_model=FlashcardDueQueueResponse)
 async def get_due_flashcards(
+    mind_map_id: UUID | None = None,
+    limit: int = Query(
+        settings.FLASHCARDS_DUE_PAGE_SIZE,
+        ge=1,
+        le=settings.FLASHCARDS_DUE_MAX_PAGE_SIZE,
+    ),
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    flashcard_service: FlashcardService = Depends(get_flashcard_service),
+):
+    """Obtener la siguiente página de la cola de tarjetas de estudio pendientes de revisión."""
+    try:
+        items, next_cursor = await flashcard_service.get_due_flashcards(
+            db=db,
+            user_id=current_user.id,
+            mind_map_id=mind_map_id,
+            limit=limit,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return FlashcardDueQueueResponse(items=items, next_cursor=next_cursor)
+
+
+@router.get("/due/count", response_model=FlashcardDueCountResponse)
+async def count_due_flashcards(
     mind_map_id: UUID | None = None,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
+    flashcard_service: FlashcardService = Depends(get_flashcard_service),
 ):
-    """Obtener tarjetas de estudio pendientes de revisión."""
-    flashcard_service = FlashcardService()
-    due_flashcards = await flashcard_service.get_due_flashcards(
+    """Contar las tarjetas de estudio pendientes hoy."""
+    counts = await flashcard_service.count_due_flashcards(
         db=db, user_id=current_user.id, mind_map_id=mind_map_id
     )
 
-    return due_flashcards
+    return FlashcardDueCountResponse(**counts)
 
 
 @router.get("/{flashcard_id}/progress", response_model=FlashcardProgressResponse)
@@ -79,13 +138,19 @@ async def get_flashcard_progress(
     flashcard_id: UUID,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
+    flashcard_service: FlashcardService = Depends(get_flashcard_service),
 ):
     """Obtener progreso para una tarjeta de estudio específica."""
-    flashcard_service = FlashcardService()
     progress = await flashcard_service.get_flashcard_progress(
         db=db, user_id=current_user.id, flashcard_id=flashcard_id
     )
 
+    if not progress:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Flashcard no encontrada",
+        )
+
     return progress
 
 
@@ -95,10 +160,9 @@ async def evaluate_flashcard_answer(
     submission: FlashcardAnswerSubmission,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
+    flashcard_service: FlashcardService = Depends(get_flashcard_service),
 ):
     """Evaluar la respuesta escrita del usuario usando IA y proporcionar retroalimentación."""
-    flashcard_service = FlashcardService()
-    ai_service = AIService()
 
     try:
         # Obtener la flashcard
@@ -112,11 +176,9 @@ async def evaluate_flashcard_answer(
                 detail="Flashcard no encontrada",
             )
 
-        # Evaluar la respuesta con IA
-        evaluation = await ai_service.evaluate_flashcard_answer(
-            question=flashcard.question,
-            correct_answer=flashcard.answer,
-            user_answer=submission.user_answer,
+        # Evaluar la respuesta con IA (o reutilizar una evaluación en caché)
+        evaluation = await flashcard_service.evaluate_answer(
+            db=db, flashcard=flashcard, user_answer=submission.user_answer
         )
 
         return AIEvaluationResponse(**evaluation)
@@ -128,3 +190,68 @@ async def evaluate_flashcard_answer(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error al evaluar la respuesta: {str(e)}",
         )
+
+
+@router.post("/{flashcard_id}/evaluate/stream")
+async def stream_flashcard_evaluation(
+    flashcard_id: UUID,
+    submission: FlashcardAnswerSubmission,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    flashcard_service: FlashcardService = Depends(get_flashcard_service),
+):
+    """
+    Evaluar la respuesta escrita del usuario transmitiendo el resultado como server-sent events.
+
+    Eventos: score (calificación), feedback (fragmentos de la retroalimentación)
+    y done (evaluación completa).
+    """
+    flashcard = await flashcard_service.get_flashcard_by_id(
+        db=db, flashcard_id=flashcard_id
+    )
+
+    if not flashcard:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Flashcard no encontrada",
+        )
+
+    async def event_stream():
+        # La sesión de la solicitud se cierra antes de transmitir la respuesta
+        async with AsyncSessionLocal() as stream_db:
+            async for event, data in flashcard_service.stream_evaluation(
+                db=stream_db, flashcard=flashcard, user_answer=submission.user_answer
+            ):
+                yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/evaluate-batch", response_model=FlashcardBatchEvaluationResponse)
+async def evaluate_flashcard_answers_batch(
+    batch: FlashcardBatchEvaluationRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    flashcard_service: FlashcardService = Depends(get_flashcard_service),
+):
+    """Evaluar varias respuestas escritas con IA en una sola solicitud."""
+
+    try:
+        results = await flashcard_service.evaluate_answers(
+            db=db,
+            answers=[(item.flashcard_id, item.user_answer) for item in batch.answers],
+        )
+
+        return FlashcardBatchEvaluationResponse(results=results)
+
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error al evaluar las respuestas: {str(e)}",
+        )
@@ -0,0 +1,51 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from uuid import UUID
+from app.dependencies import get_current_user
+from app.models.user import User
+from app.schemas.job import JobResponse
+from app.services.job_service import job_service
+
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: UUID,
+    current_user: User = Depends(get_current_user),
+):
+    """Obtener el estado de un trabajo en segundo plano."""
+    job = await job_service.get_job(job_id=job_id, user_id=current_user.id)
+
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Trabajo no encontrado"
+        )
+
+    return job
+
+
+@router.get("/{job_id}/events")
+async def stream_job_events(
+    job_id: UUID,
+    current_user: User = Depends(get_current_user),
+):
+    """Transmitir las actualizaciones del trabajo como server-sent events."""
+    job = await job_service.get_job(job_id=job_id, user_id=current_user.id)
+
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Trabajo no encontrado"
+        )
+
+    async def event_stream():
+        async for update in job_service.watch(job):
+            data = JobResponse.model_validate(update).model_dump_json()
+            yield f"event: {update.status}\ndata: {data}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
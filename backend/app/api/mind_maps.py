@@ -1,8 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    status,
+    UploadFile,
+    File,
+    Form,
+    Response,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 from app.database import get_db
-from app.dependencies import get_current_user
+from app.dependencies import get_current_user, get_mind_map_service
 from app.models.user import User
 from app.schemas.mind_map import (
     MindMapResponse,
@@ -10,65 +19,61 @@ from app.schemas.mind_map import (
     NodeSchema,
     EdgeSchema,
 )
+from app.schemas.job import JobResponse
 from app.services.mind_map_service import MindMapService
-from app.services.flashcard_service import FlashcardService
+from app.services.pdf_service import PDFService, UploadTooLargeError
+from app.services.job_service import job_service
+from app.services.mind_map_jobs import MIND_MAP_CREATION_JOB
 
 
 router = APIRouter(prefix="/mind-maps", tags=["Mind Maps"])
 
 
-@router.post("", response_model=MindMapResponse, status_code=status.HTTP_201_CREATED)
+@router.post("", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
 async def create_mind_map(
+    response: Response,
     file: UploadFile = File(...),
     title: str | None = Form(None),
-    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Sube PDF y crea un mapa mental."""
+    """
+    Sube PDF y encola la creación del mapa mental.
+
+    El procesamiento (extracción de texto, mapa mental y flashcards) se realiza en
+    segundo plano; el estado se consulta en /api/jobs/{job_id}.
+    """
     # Validar tipo de archivo
     if not file.filename.lower().endswith(".pdf"):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Solo se permiten archivos PDF"
         )
 
-    # Leer el contenido del archivo
-    pdf_bytes = await file.read()
-
-    if len(pdf_bytes) > 10 * 1024 * 1024:  # 10MB limit
+    # Guardar el archivo en disco por bloques (verifica el tamaño y calcula el hash)
+    try:
+        spooled_pdf = await PDFService.spool_upload(file)
+    except UploadTooLargeError as e:
         raise HTTPException(
-            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            detail="El archivo es demasiado grande. El tamaño máximo es 10MB",
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e)
         )
 
-    # Crear un mapa mental
     try:
-        mind_map_service = MindMapService()
-        mind_map = await mind_map_service.create_mind_map_from_pdf(
-            db=db,
+        job = await job_service.submit(
+            MIND_MAP_CREATION_JOB,
             user_id=current_user.id,
-            pdf_bytes=pdf_bytes,
-            filename=file.filename,
-            title=title,
+            payload={
+                "pdf_path": spooled_pdf.path,
+                "content_hash": spooled_pdf.content_hash,
+                "filename": file.filename,
+                "title": title,
+            },
         )
+    except Exception:
+        spooled_pdf.remove()
+        raise
 
-        # Generar tarjetas de estudio en segundo plano (async)
-        flashcard_service = FlashcardService()
-        await flashcard_service.generate_flashcards_for_mind_map(
-            db=db, mind_map_id=mind_map.id, pdf_bytes=pdf_bytes
-        )
-
-        # Convertir al formato de respuesta
-        return format_mind_map_response(mind_map)
+    response.headers["Location"] = f"/api/jobs/{job.id}"
 
-    except ValueError as e:
-        # Manejar errores de procesamiento de PDF (por ejemplo, sin texto extraíble)
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
-    except Exception as e:
-        # Manejar errores inesperados
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error procesando el PDF: {str(e)}",
-        )
+    return job
 
 
 @router.get("", response_model=list[MindMapListResponse])
@@ -77,9 +82,9 @@ async def list_mind_maps(
     limit: int = 100,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
+    mind_map_service: MindMapService = Depends(get_mind_map_service),
 ):
     """Obtener todos los mapas mentales del usuario actual."""
-    mind_map_service = MindMapService()
     mind_maps = await mind_map_service.get_user_mind_maps(
         db=db, user_id=current_user.id, skip=skip, limit=limit
     )
@@ -92,9 +97,9 @@ async def get_mind_map(
     mind_map_id: UUID,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
+    mind_map_service: MindMapService = Depends(get_mind_map_service),
 ):
     """Obtener detalles del mapa mental por ID."""
-    mind_map_service = MindMapService()
     mind_map = await mind_map_service.get_mind_map_by_id(
         db=db, mind_map_id=mind_map_id, user_id=current_user.id
     )
@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from uuid import UUID
+from app.database import get_db
+from app.dependencies import get_current_user
+from app.models.user import User
+from app.schemas.stats import StudyStatsResponse
+from app.services.stats_service import study_stats
+
+
+router = APIRouter(prefix="/stats", tags=["Stats"])
+
+
+@router.get("", response_model=StudyStatsResponse)
+async def get_study_stats(
+    mind_map_id: UUID | None = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Obtener las estadísticas de estudio del usuario (por mapa mental y totales)."""
+    return await study_stats.get_stats(
+        db=db, user_id=current_user.id, mind_map_id=mind_map_id
+    )
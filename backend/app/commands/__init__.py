@@ -0,0 +1 @@
+"""Comandos de mantenimiento (python -m app.commands.<comando>)."""
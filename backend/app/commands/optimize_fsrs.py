@@ -0,0 +1,66 @@
+"""
+Ajustar los parámetros FSRS de cada usuario a su historial de revisiones.
+
+Pensado para ejecutarse periódicamente (p. ej. cada noche): procesa los usuarios
+con suficientes revisiones que aún no tienen parámetros o cuyo historial ha
+crecido desde el último ajuste. Los parámetros se usan cuando
+FLASHCARDS_SCHEDULER=fsrs.
+
+Uso:
+    python -m app.commands.optimize_fsrs [--user-id UUID] [--iterations 150]
+"""
+
+import argparse
+import asyncio
+from uuid import UUID
+from app.config import settings
+from app.database import AsyncSessionLocal, engine
+from app.services.fsrs_optimizer import optimize_user_parameters, users_to_optimize
+from app.utils.logger import setup_logger, log_info, log_success, log_warning
+
+
+async def main(args: argparse.Namespace) -> None:
+    setup_logger("mapit")
+    try:
+        async with AsyncSessionLocal() as db:
+            user_ids = (
+                [args.user_id]
+                if args.user_id
+                else await users_to_optimize(db, args.min_reviews, args.refit_growth)
+            )
+        log_info(f"Ajustando parámetros FSRS de {len(user_ids)} usuarios...")
+
+        optimized = 0
+        for user_id in user_ids:
+            # Una sesión por usuario: el historial de cada uno se libera al terminar
+            async with AsyncSessionLocal() as db:
+                parameters = await optimize_user_parameters(db, user_id, args.iterations)
+            if parameters is None:
+                log_warning(f"Usuario {user_id}: sin revisiones suficientes para el ajuste")
+                continue
+            optimized += 1
+            log_info(
+                f"Usuario {user_id}: {parameters.review_count} revisiones, pérdida "
+                f"{parameters.default_loss:.4f} -> {parameters.loss:.4f}"
+            )
+    finally:
+        await engine.dispose()
+    log_success(f"Parámetros FSRS ajustados para {optimized} usuarios")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--user-id", type=UUID, help="Ajustar solo este usuario")
+    parser.add_argument(
+        "--min-reviews", type=int, default=settings.FSRS_OPTIMIZER_MIN_REVIEWS
+    )
+    parser.add_argument(
+        "--refit-growth",
+        type=float,
+        default=0.2,
+        help="Crecimiento del historial (fracción) para volver a ajustar",
+    )
+    parser.add_argument(
+        "--iterations", type=int, default=settings.FSRS_OPTIMIZER_ITERATIONS
+    )
+    asyncio.run(main(parser.parse_args()))
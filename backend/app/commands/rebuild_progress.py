@@ -0,0 +1,217 @@
+"""
+Reconstruir flashcard_progress a partir del registro de revisiones.
+
+Cada flashcard con revisiones registradas parte del estado anterior a su primera
+revisión y reproduce el resto con el planificador actual del usuario, por lotes y
+de forma vectorizada; las flashcards sin revisiones registradas no se modifican, y
+tampoco las revisadas durante la reconstrucción. Al terminar se recalculan los
+contadores de study_stats.
+
+Uso:
+    python -m app.commands.rebuild_progress [--user-id UUID] [--batch-size 1000]
+"""
+
+import argparse
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+from uuid import UUID
+import numpy as np
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import AsyncSessionLocal, engine
+from app.models.flashcard import FlashcardProgress, FlashcardReviewLog
+from app.services.schedulers import ReviewStateArrays, load_schedulers
+from app.services.stats_service import study_stats
+from app.utils.logger import setup_logger, log_info, log_success
+
+
+async def upsert_progress(db: AsyncSession, rows: list[dict]) -> None:
+    """Guardar en bloque el progreso reconstruido."""
+    if not rows:
+        await db.commit()
+        return
+    statement = insert(FlashcardProgress).values(rows)
+    statement = statement.on_conflict_do_update(
+        constraint="uq_user_flashcard",
+        set_={
+            "easiness_factor": statement.excluded.easiness_factor,
+            "interval": statement.excluded.interval,
+            "repetitions": statement.excluded.repetitions,
+            "stability": statement.excluded.stability,
+            "difficulty": statement.excluded.difficulty,
+            "next_review_date": statement.excluded.next_review_date,
+            "last_reviewed_at": statement.excluded.last_reviewed_at,
+            "updated_at": statement.excluded.updated_at,
+        },
+    )
+    await db.execute(statement)
+    await db.commit()
+
+
+async def lock_unchanged(db: AsyncSession, groups: list[tuple[tuple, list]]) -> set[tuple]:
+    """
+    Bloquear el progreso del lote y devolver las flashcards sin revisiones nuevas.
+
+    Toma el mismo bloqueo (FOR UPDATE en orden de flashcard) que review_flashcards,
+    que escribe el registro en la misma transacción: una vez bloqueadas, el recuento
+    del registro ya incluye cualquier revisión posterior a la lectura.
+    """
+    keys = [key for key, _ in groups]
+    key_columns = tuple_(FlashcardProgress.user_id, FlashcardProgress.flashcard_id)
+    await db.execute(
+        select(FlashcardProgress.id)
+        .where(key_columns.in_(keys))
+        .order_by(FlashcardProgress.flashcard_id, FlashcardProgress.user_id)
+        .with_for_update()
+    )
+    logged = await db.execute(
+        select(FlashcardReviewLog.user_id, FlashcardReviewLog.flashcard_id, func.count())
+        .where(tuple_(FlashcardReviewLog.user_id, FlashcardReviewLog.flashcard_id).in_(keys))
+        .group_by(FlashcardReviewLog.user_id, FlashcardReviewLog.flashcard_id)
+    )
+    review_counts = {(user, flashcard): count for user, flashcard, count in logged}
+    return {key for key, reviews in groups if review_counts.get(key) == len(reviews)}
+
+
+async def rebuild_progress(user_id: UUID | None = None, batch_size: int = 1000) -> dict:
+    """
+    Reconstruir el progreso (de un usuario o de todos) desde flashcard_reviews.
+
+    Returns:
+        Número de revisiones leídas, de flashcards reconstruidas y de omitidas
+        por revisarse durante la reconstrucción
+    """
+    query = select(
+        FlashcardReviewLog.user_id,
+        FlashcardReviewLog.flashcard_id,
+        FlashcardReviewLog.quality,
+        FlashcardReviewLog.reviewed_at,
+        FlashcardReviewLog.elapsed_days,
+        FlashcardReviewLog.prior_easiness_factor,
+        FlashcardReviewLog.prior_interval,
+        FlashcardReviewLog.prior_repetitions,
+        FlashcardReviewLog.prior_stability,
+        FlashcardReviewLog.prior_difficulty,
+    ).order_by(
+        FlashcardReviewLog.user_id,
+        FlashcardReviewLog.flashcard_id,
+        FlashcardReviewLog.reviewed_at,
+        FlashcardReviewLog.id,
+    )
+    if user_id:
+        query = query.where(FlashcardReviewLog.user_id == user_id)
+
+    now = datetime.utcnow()
+    counts = {"reviews": 0, "flashcards": 0, "skipped": 0}
+
+    async def write_batch(db: AsyncSession, groups: list[tuple[tuple, list]]) -> None:
+        lengths = np.array([len(reviews) for _, reviews in groups])
+        qualities = np.zeros((len(groups), lengths.max()), dtype=np.int64)
+        elapsed_days = np.zeros((len(groups), lengths.max()), dtype=np.int64)
+        for index, (_, reviews) in enumerate(groups):
+            qualities[index, : len(reviews)] = [review.quality for review in reviews]
+            elapsed_days[index, : len(reviews)] = [review.elapsed_days for review in reviews]
+
+        # Estado anterior a la primera revisión registrada de cada flashcard
+        first_reviews = [reviews[0] for _, reviews in groups]
+        prior = ReviewStateArrays(
+            np.array([review.prior_easiness_factor for review in first_reviews]),
+            np.array([review.prior_interval for review in first_reviews]),
+            np.array([review.prior_repetitions for review in first_reviews]),
+            np.array([review.prior_stability for review in first_reviews], dtype=np.float64),
+            np.array([review.prior_difficulty for review in first_reviews], dtype=np.float64),
+        )
+
+        # Cada usuario se reproduce con su planificador (y sus parámetros FSRS)
+        users = np.array([user for (user, _), _ in groups])
+        schedulers = await load_schedulers(db, list(dict.fromkeys(users)))
+        state = ReviewStateArrays(*(np.empty_like(values) for values in prior))
+        for user, scheduler in schedulers.items():
+            rows = users == user
+            replayed = scheduler.replay(
+                ReviewStateArrays(*(values[rows] for values in prior)),
+                qualities[rows],
+                elapsed_days[rows],
+                lengths[rows],
+            )
+            for values, user_values in zip(state, replayed):
+                values[rows] = user_values
+
+        unchanged = await lock_unchanged(db, groups)
+        await upsert_progress(
+            db,
+            [
+                {
+                    "id": uuid.uuid4(),
+                    "user_id": user,
+                    "flashcard_id": flashcard,
+                    "easiness_factor": float(state.easiness_factor[index]),
+                    "interval": int(state.interval[index]),
+                    "repetitions": int(state.repetitions[index]),
+                    "stability": None
+                    if np.isnan(state.stability[index])
+                    else float(state.stability[index]),
+                    "difficulty": None
+                    if np.isnan(state.difficulty[index])
+                    else float(state.difficulty[index]),
+                    "next_review_date": reviews[-1].reviewed_at.date()
+                    + timedelta(days=int(state.interval[index])),
+                    "last_reviewed_at": reviews[-1].reviewed_at,
+                    "created_at": reviews[0].reviewed_at,
+                    "updated_at": now,
+                }
+                for index, ((user, flashcard), reviews) in enumerate(groups)
+                if (user, flashcard) in unchanged
+            ],
+        )
+        counts["flashcards"] += len(unchanged)
+        counts["skipped"] += len(groups) - len(unchanged)
+
+    # Lectura en streaming y escritura por lotes en otra sesión
+    async with AsyncSessionLocal() as reader, AsyncSessionLocal() as writer:
+        result = await reader.stream(query.execution_options(yield_per=batch_size))
+
+        groups: list[tuple[tuple, list]] = []
+        async for row in result:
+            counts["reviews"] += 1
+            key = (row.user_id, row.flashcard_id)
+            if groups and groups[-1][0] == key:
+                groups[-1][1].append(row)
+                continue
+            # Empieza otra flashcard: las del lote ya están completas
+            if len(groups) >= batch_size:
+                await write_batch(writer, groups)
+                groups = []
+            groups.append((key, [row]))
+
+        if groups:
+            await write_batch(writer, groups)
+
+        # Los contadores de study_stats dependen del progreso reconstruido
+        await study_stats.rebuild(writer, [user_id] if user_id else None)
+
+    return counts
+
+
+async def main(args: argparse.Namespace) -> None:
+    setup_logger("mapit")
+    log_info("Reconstruyendo el progreso desde el registro de revisiones...")
+    try:
+        counts = await rebuild_progress(args.user_id, args.batch_size)
+    finally:
+        await engine.dispose()
+    log_success(
+        f"Progreso reconstruido: {counts['flashcards']} flashcards "
+        f"a partir de {counts['reviews']} revisiones"
+    )
+    if counts["skipped"]:
+        log_info(f"{counts['skipped']} flashcards omitidas por revisarse durante el proceso")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--user-id", type=UUID, help="Reconstruir solo este usuario")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,37 @@
+"""
+Recalcular los contadores de estudio (study_stats y flashcard_due_counts).
+
+Los contadores se mantienen de forma incremental al crear mapas mentales, revisar
+flashcards y completar partidas; este comando los recalcula desde las tablas de
+origen (tras la migración que los crea o si se sospecha que no cuadran).
+
+Uso:
+    python -m app.commands.rebuild_stats [--user-id UUID]
+"""
+
+import argparse
+import asyncio
+from uuid import UUID
+from app.database import AsyncSessionLocal, engine
+from app.services.stats_service import study_stats
+from app.utils.logger import setup_logger, log_info, log_success
+
+
+async def main(args: argparse.Namespace) -> None:
+    setup_logger("mapit")
+    log_info("Recalculando los contadores de estudio...")
+    try:
+        async with AsyncSessionLocal() as db:
+            counts = await study_stats.rebuild(db, [args.user_id] if args.user_id else None)
+    finally:
+        await engine.dispose()
+    log_success(
+        f"Contadores recalculados: {counts['mind_maps']} mapas mentales "
+        f"y {counts['due_dates']} fechas de revisión"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--user-id", type=UUID, help="Recalcular solo este usuario")
+    asyncio.run(main(parser.parse_args()))
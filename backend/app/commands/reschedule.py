@@ -0,0 +1,68 @@
+"""
+Reprogramar en bloque las revisiones de flashcards.
+
+Aplica de forma vectorizada un factor de facilidad mínimo, un multiplicador de
+intervalos y/o un desplazamiento de días al progreso guardado.
+
+Uso:
+    # Posponer 3 días todo lo pendiente hasta hoy (p. ej. tras una caída)
+    python -m app.commands.reschedule --shift-days 3 --due-before 2026-10-18
+
+    python -m app.commands.reschedule --min-ef 1.5 --interval-modifier 0.8 --user-id UUID
+"""
+
+import argparse
+import asyncio
+from datetime import date
+from uuid import UUID
+from app.database import engine
+from app.services.rescheduling import RescheduleOptions, reschedule_progress
+from app.utils.logger import setup_logger, log_info, log_success
+
+
+async def main(args: argparse.Namespace) -> None:
+    setup_logger("mapit")
+    options = RescheduleOptions(
+        min_easiness_factor=args.min_ef,
+        interval_modifier=args.interval_modifier,
+        shift_days=args.shift_days,
+    )
+    log_info(f"Reprogramando revisiones: {options}")
+    try:
+        counts = await reschedule_progress(
+            options,
+            user_id=args.user_id,
+            mind_map_id=args.mind_map_id,
+            due_before=args.due_before,
+            batch_size=args.batch_size,
+            dry_run=args.dry_run,
+        )
+    finally:
+        await engine.dispose()
+    log_success(
+        f"{counts['changed']} de {counts['rows']} filas de progreso "
+        f"{'se modificarían' if args.dry_run else 'modificadas'}"
+    )
+    if counts["skipped"]:
+        log_info(f"{counts['skipped']} filas omitidas por revisarse durante el proceso")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--min-ef", type=float, help="Factor de facilidad mínimo")
+    parser.add_argument("--interval-modifier", type=float, help="Multiplicador de intervalos")
+    parser.add_argument("--shift-days", type=int, default=0, help="Días a posponer")
+    parser.add_argument("--user-id", type=UUID)
+    parser.add_argument("--mind-map-id", type=UUID)
+    parser.add_argument(
+        "--due-before",
+        type=date.fromisoformat,
+        help="Solo revisiones pendientes hasta esta fecha (AAAA-MM-DD)",
+    )
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--dry-run", action="store_true", help="Calcular sin escribir")
+    args = parser.parse_args()
+
+    if args.min_ef is None and args.interval_modifier is None and not args.shift_days:
+        parser.error("Indica al menos un ajuste: --min-ef, --interval-modifier o --shift-days")
+    asyncio.run(main(args))
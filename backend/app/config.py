@@ -13,7 +13,79 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
     # External APIs
-    GEMINI_API_KEY: str
+    GEMINI_API_KEY: str = ""
+    AI_PROVIDER: str = "gemini"  # gemini | fake
+    AI_MODEL: str = "gemini-flash-latest"
+    AI_HTTP_POOL_SIZE: int = 20
+    AI_HTTP_TIMEOUT_SECONDS: float = 120
+    AI_MIND_MAP_TIMEOUT_SECONDS: float = 120
+    AI_FLASHCARDS_TIMEOUT_SECONDS: float = 90
+    AI_JSON_MAX_RETRIES: int = 1
+    AI_MIND_MAP_CHUNK_CHARS: int = 30000
+    AI_MIND_MAP_MAX_CHUNKS: int = 12
+    AI_MIND_MAP_CHUNK_CONCURRENCY: int = 4
+    AI_MAX_CONCURRENT_REQUESTS: int = 8
+    AI_RATE_LIMIT_PER_SECOND: float = 5
+    AI_RATE_LIMIT_BURST: int = 10
+    AI_MAX_RETRIES: int = 3
+    AI_RETRY_BASE_DELAY_SECONDS: float = 1
+    AI_RETRY_MAX_DELAY_SECONDS: float = 20
+    AI_EVALUATION_BATCH_SIZE: int = 10
+
+    # Fake AI provider (AI_PROVIDER=fake, sin red, para pruebas de carga)
+    AI_FAKE_LATENCY_MS: float = 800
+    AI_FAKE_LATENCY_SIGMA: float = 0.5
+    AI_FAKE_ERROR_RATE: float = 0
+    AI_FAKE_RATE_LIMIT_RATE: float = 0
+    AI_FAKE_SEED: int | None = 0
+
+    # Evaluation cache
+    EVALUATION_CACHE_MAX_ENTRIES: int = 10000
+    EVALUATION_CACHE_TTL_SECONDS: int = 30 * 24 * 3600
+    # Los aciertos de las cachés persistentes se escriben en bloque cada N segundos
+    CACHE_HITS_FLUSH_INTERVAL_SECONDS: float = 30
+
+    # Local answer grading (antes de llamar a la IA)
+    GRADER_ENABLED: bool = True
+    # Solo acepta sin IA respuestas exactas o con errores de escritura; el umbral
+    # se usa en la calificación aproximada cuando la IA no está disponible
+    GRADER_ACCEPT_THRESHOLD: float = 0.8
+    GRADER_REJECT_THRESHOLD: float = 0.15
+    GRADER_MAX_EDIT_CHARS: int = 300
+
+    # Flashcard review queue (límites diarios por usuario, sumando todos sus mapas mentales)
+    FLASHCARDS_NEW_PER_DAY: int = 20
+    FLASHCARDS_REVIEWS_PER_DAY: int = 200
+    FLASHCARDS_DUE_PAGE_SIZE: int = 20
+    FLASHCARDS_DUE_MAX_PAGE_SIZE: int = 100
+
+    # Study stats (panel)
+    STATS_MATURE_INTERVAL_DAYS: int = 21
+
+    # Flashcard scheduler (sm2 | fsrs)
+    FLASHCARDS_SCHEDULER: str = "sm2"
+    FSRS_DESIRED_RETENTION: float = 0.9
+    FSRS_MAXIMUM_INTERVAL_DAYS: int = 36500
+    FSRS_OPTIMIZER_MIN_REVIEWS: int = 400
+    FSRS_OPTIMIZER_ITERATIONS: int = 150
+
+    # PDF processing
+    MAX_UPLOAD_SIZE_MB: int = 10
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024
+    UPLOAD_TMP_DIR: str | None = None
+    PDF_PROCESS_POOL_SIZE: int = 2
+    PDF_PAGES_PER_TASK: int = 50
+    PDF_MAX_PAGES: int = 500
+    PDF_EXTRACTION_TIMEOUT_SECONDS: float = 60
+
+    # Background jobs
+    # "database": estado en background_jobs, consultable desde cualquier worker de
+    # uvicorn y tras un reinicio. "local": solo en memoria (un único proceso)
+    JOB_BACKEND: str = "database"
+    JOB_WORKERS: int = 2
+    JOB_RESULT_TTL_SECONDS: int = 3600
+    JOB_STALE_AFTER_SECONDS: int = 1800
+    JOB_WATCH_POLL_INTERVAL_SECONDS: float = 1
 
     # CORS
     FRONTEND_URL: str = "http://localhost:5173"
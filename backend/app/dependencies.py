@@ -1,10 +1,13 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 from app.database import get_db
 from app.models.user import User
+from app.services.ai_service import AIService
 from app.services.auth_service import AuthService
+from app.services.flashcard_service import FlashcardService
+from app.services.mind_map_service import MindMapService
 from app.utils.security import decode_access_token
 from app.schemas.user import TokenData
 
@@ -42,3 +45,22 @@ async def get_current_user(
         raise credentials_exception
 
     return user
+
+
+def get_ai_service(request: Request) -> AIService:
+    """Dependencia para obtener el servicio de IA compartido (creado al iniciar la app)."""
+    return request.app.state.ai_service
+
+
+def get_flashcard_service(
+    ai_service: AIService = Depends(get_ai_service),
+) -> FlashcardService:
+    """Dependencia para obtener el servicio de flashcards sobre el cliente compartido."""
+    return FlashcardService(ai_service)
+
+
+def get_mind_map_service(
+    ai_service: AIService = Depends(get_ai_service),
+) -> MindMapService:
+    """Dependencia para obtener el servicio de mapas mentales sobre el cliente compartido."""
+    return MindMapService(ai_service)
@@ -1,8 +1,22 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
-from app.api import auth, mind_maps, flashcards, game
+from app.api import auth, mind_maps, flashcards, game, jobs, stats
 from app.middleware import LoggingMiddleware
+from app.services.ai_client import close_ai_client
+from app.services.ai_providers import get_ai_provider, reset_ai_provider
+from app.services.ai_scheduler import ai_scheduler
+from app.services.cache_service import cache_hits, evaluation_cache
+from app.services.local_grader import local_grader
+from app.services.ai_service import AIService
+from app.services.job_service import job_service
+from app.services.mind_map_jobs import (
+    MIND_MAP_CREATION_JOB,
+    cleanup_mind_map_creation_job,
+    run_mind_map_creation_job,
+)
+from app.services.pdf_service import shutdown_pdf_executor
+from app.services.schedulers import create_scheduler
 from app.utils.logger import setup_logger, log_success
 
 # Configuracion del logger
@@ -32,6 +46,8 @@ app.include_router(auth.router, prefix="/api")
 app.include_router(mind_maps.router, prefix="/api")
 app.include_router(flashcards.router, prefix="/api")
 app.include_router(game.router, prefix="/api")
+app.include_router(jobs.router, prefix="/api")
+app.include_router(stats.router, prefix="/api")
 
 
 @app.get("/")
@@ -46,8 +62,43 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/health/ai")
+async def ai_health_check():
+    """Métricas del planificador de IA, la caché de evaluaciones y el calificador local."""
+    return {
+        **ai_scheduler.get_metrics(),
+        "evaluation_cache": evaluation_cache.stats,
+        "local_grader": local_grader.stats,
+    }
+
+
 @app.on_event("startup")
 async def startup_event():
     """Mensaje de inicio del registro"""
+    # Proveedor de IA compartido (una sola instancia y pool HTTP por proceso)
+    app.state.ai_service = AIService(provider=get_ai_provider())
+
+    # Iniciar los workers de trabajos en segundo plano
+    job_service.register_handler(
+        MIND_MAP_CREATION_JOB, run_mind_map_creation_job, cleanup_mind_map_creation_job
+    )
+    await job_service.start()
+
+    # Escritura en bloque de los aciertos de las cachés persistentes
+    await cache_hits.start()
+
+    # Falla al arrancar si FLASHCARDS_SCHEDULER no es válido
+    log_success(f"Planificador de flashcards: {create_scheduler().name}")
+
     log_success("MapIT API iniciada correctamente - Servidor corriendo")
     logger.info(f"Documentación disponible en: http://localhost:8000/docs")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Detener los workers, las escrituras en bloque, el pool de procesos PDF y el cliente de IA."""
+    await job_service.stop()
+    await cache_hits.stop()
+    shutdown_pdf_executor()
+    reset_ai_provider()
+    close_ai_client()
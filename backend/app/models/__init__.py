@@ -1,7 +1,15 @@
 from app.models.user import User
 from app.models.mind_map import MindMap, MindMapNode, MindMapEdge
-from app.models.flashcard import Flashcard, FlashcardProgress
+from app.models.flashcard import (
+    Flashcard,
+    FlashcardProgress,
+    FlashcardReviewLog,
+    FSRSParameters,
+)
 from app.models.game import GameSession
+from app.models.stats import StudyStats, FlashcardDueCount
+from app.models.cache import MindMapStructureCache, FlashcardEvaluationCache
+from app.models.job import BackgroundJob
 
 __all__ = [
     "User",
@@ -10,5 +18,12 @@ __all__ = [
     "MindMapEdge",
     "Flashcard",
     "FlashcardProgress",
+    "FlashcardReviewLog",
+    "FSRSParameters",
     "GameSession",
+    "StudyStats",
+    "FlashcardDueCount",
+    "MindMapStructureCache",
+    "FlashcardEvaluationCache",
+    "BackgroundJob",
 ]
@@ -0,0 +1,75 @@
+import uuid
+from datetime import datetime
+from sqlalchemy import (
+    String,
+    DateTime,
+    Integer,
+    JSON,
+    Text,
+    ForeignKey,
+    UniqueConstraint,
+)
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import UUID
+from app.database import Base
+
+
+class MindMapStructureCache(Base):
+    """Estructura de mapa mental generada por IA, reutilizable entre subidas del mismo PDF."""
+
+    __tablename__ = "mind_map_structure_cache"
+    __table_args__ = (
+        UniqueConstraint(
+            "content_hash",
+            "prompt_version",
+            "model_name",
+            name="uq_structure_cache_key",
+        ),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    content_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    prompt_version: Mapped[str] = mapped_column(String(50), nullable=False)
+    model_name: Mapped[str] = mapped_column(String(100), nullable=False)
+    structure: Mapped[dict] = mapped_column(JSON, nullable=False)
+    hit_count: Mapped[int] = mapped_column(Integer, default=0)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    last_used_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
+class FlashcardEvaluationCache(Base):
+    """Evaluación de IA de una respuesta normalizada a una flashcard."""
+
+    __tablename__ = "flashcard_evaluation_cache"
+    __table_args__ = (
+        UniqueConstraint(
+            "flashcard_id",
+            "content_fingerprint",
+            "answer_hash",
+            "prompt_version",
+            "model_name",
+            name="uq_evaluation_cache_key",
+        ),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    flashcard_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("flashcards.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    # Hash de la pregunta y la respuesta de la flashcard: si cambian, la entrada deja de coincidir
+    content_fingerprint: Mapped[str] = mapped_column(String(64), nullable=False)
+    answer_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    prompt_version: Mapped[str] = mapped_column(String(50), nullable=False)
+    model_name: Mapped[str] = mapped_column(String(100), nullable=False)
+    quality: Mapped[int] = mapped_column(Integer, nullable=False)
+    feedback: Mapped[str] = mapped_column(Text, nullable=False)
+    quality_label: Mapped[str] = mapped_column(String(50), nullable=False)
+    hit_count: Mapped[int] = mapped_column(Integer, default=0)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    last_used_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
@@ -6,12 +6,14 @@ from sqlalchemy import (
     Text,
     Float,
     Integer,
+    BigInteger,
     ForeignKey,
     Date,
+    Index,
     UniqueConstraint,
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
 from app.database import Base
 
 
@@ -19,6 +21,9 @@ class Flashcard(Base):
     """Tarjeta de estudio generada a partir de contenido PDF."""
 
     __tablename__ = "flashcards"
+    __table_args__ = (
+        Index("ix_flashcards_mind_map_id_created_at", "mind_map_id", "created_at"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -40,11 +45,24 @@ class Flashcard(Base):
 
 
 class FlashcardProgress(Base):
-    """Progreso del usuario en las tarjetas de estudio utilizando el algoritmo SM-2."""
+    """
+    Progreso del usuario en las tarjetas de estudio.
+
+    El estado SM-2 (factor de facilidad, intervalo y repeticiones) se mantiene con
+    cualquier planificador; stability y difficulty son el estado de memoria FSRS
+    (nulos mientras la flashcard no se haya revisado con FSRS).
+    """
 
     __tablename__ = "flashcard_progress"
     __table_args__ = (
         UniqueConstraint("user_id", "flashcard_id", name="uq_user_flashcard"),
+        Index(
+            "ix_flashcard_progress_user_id_next_review_date",
+            "user_id",
+            "next_review_date",
+        ),
+        # Borrados en cascada desde flashcards
+        Index("ix_flashcard_progress_flashcard_id", "flashcard_id"),
     )
 
     id: Mapped[uuid.UUID] = mapped_column(
@@ -61,6 +79,8 @@ class FlashcardProgress(Base):
     easiness_factor: Mapped[float] = mapped_column(Float, default=2.5)
     interval: Mapped[int] = mapped_column(Integer, default=0)
     repetitions: Mapped[int] = mapped_column(Integer, default=0)
+    stability: Mapped[float | None] = mapped_column(Float)
+    difficulty: Mapped[float | None] = mapped_column(Float)
     next_review_date: Mapped[date] = mapped_column(Date, default=date.today)
     last_reviewed_at: Mapped[datetime | None] = mapped_column(DateTime)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
@@ -73,3 +93,70 @@ class FlashcardProgress(Base):
     flashcard: Mapped["Flashcard"] = relationship(
         "Flashcard", back_populates="progress"
     )
+
+
+class FlashcardReviewLog(Base):
+    """
+    Registro de solo inserción de las revisiones de flashcards.
+
+    FlashcardProgress es una proyección de este registro: guarda el estado
+    anterior y posterior de cada revisión, de modo que el progreso se puede
+    reconstruir (o recalcular con otro algoritmo). El id es secuencial para
+    reproducir en orden las revisiones con el mismo instante.
+    """
+
+    __tablename__ = "flashcard_reviews"
+    __table_args__ = (
+        Index(
+            "ix_flashcard_reviews_user_id_flashcard_id_reviewed_at",
+            "user_id",
+            "flashcard_id",
+            "reviewed_at",
+        ),
+        # Borrados en cascada desde flashcards
+        Index("ix_flashcard_reviews_flashcard_id", "flashcard_id"),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    flashcard_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("flashcards.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    quality: Mapped[int] = mapped_column(Integer, nullable=False)
+    reviewed_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    # Días desde la revisión anterior (0 en la primera)
+    elapsed_days: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    prior_easiness_factor: Mapped[float] = mapped_column(Float, nullable=False)
+    prior_interval: Mapped[int] = mapped_column(Integer, nullable=False)
+    prior_repetitions: Mapped[int] = mapped_column(Integer, nullable=False)
+    easiness_factor: Mapped[float] = mapped_column(Float, nullable=False)
+    interval: Mapped[int] = mapped_column(Integer, nullable=False)
+    repetitions: Mapped[int] = mapped_column(Integer, nullable=False)
+    prior_stability: Mapped[float | None] = mapped_column(Float)
+    prior_difficulty: Mapped[float | None] = mapped_column(Float)
+    stability: Mapped[float | None] = mapped_column(Float)
+    difficulty: Mapped[float | None] = mapped_column(Float)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
+class FSRSParameters(Base):
+    """Parámetros FSRS ajustados al historial de revisiones de un usuario."""
+
+    __tablename__ = "fsrs_parameters"
+
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    weights: Mapped[list[float]] = mapped_column(ARRAY(Float), nullable=False)
+    # Revisiones usadas en el ajuste y pérdida (log loss) antes y después
+    review_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    default_loss: Mapped[float] = mapped_column(Float, nullable=False)
+    loss: Mapped[float] = mapped_column(Float, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import String, DateTime, Integer, Boolean, ForeignKey
+from sqlalchemy import String, DateTime, Integer, Boolean, ForeignKey, Index, desc
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID
 from app.database import Base
@@ -10,6 +10,10 @@ class GameSession(Base):
     """Sesión de juego para el juego de reordenamiento de mapas mentales."""
 
     __tablename__ = "game_sessions"
+    __table_args__ = (
+        Index("ix_game_sessions_user_id_created_at", "user_id", desc("created_at")),
+        Index("ix_game_sessions_mind_map_id", "mind_map_id"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
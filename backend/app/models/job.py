@@ -0,0 +1,30 @@
+import uuid
+from datetime import datetime
+from sqlalchemy import String, DateTime, JSON, Text, ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import UUID
+from app.database import Base
+
+
+class BackgroundJob(Base):
+    """
+    Estado de un trabajo en segundo plano.
+
+    Permite consultar el trabajo desde cualquier proceso del servidor y después de
+    un reinicio; la carga útil (p. ej. el PDF) solo vive en el proceso que lo ejecuta.
+    """
+
+    __tablename__ = "background_jobs"
+    __table_args__ = (Index("ix_background_jobs_status_updated_at", "status", "updated_at"),)
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    job_type: Mapped[str] = mapped_column(String(50), nullable=False)
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    status: Mapped[str] = mapped_column(String(20), nullable=False)
+    stage: Mapped[str] = mapped_column(String(50), nullable=False)
+    result: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
@@ -7,7 +7,9 @@ from sqlalchemy import (
     Float,
     Integer,
     ForeignKey,
+    Index,
     UniqueConstraint,
+    desc,
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID
@@ -18,6 +20,9 @@ class MindMap(Base):
     """Mapa mental generado a partir de PDF."""
 
     __tablename__ = "mind_maps"
+    __table_args__ = (
+        Index("ix_mind_maps_user_id_created_at", "user_id", desc("created_at")),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
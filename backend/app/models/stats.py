@@ -0,0 +1,60 @@
+import uuid
+from datetime import datetime, date
+from sqlalchemy import DateTime, Integer, ForeignKey, Date
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import UUID
+from app.database import Base
+
+
+class StudyStats(Base):
+    """
+    Contadores de estudio de un usuario en un mapa mental.
+
+    Se mantienen de forma incremental en la misma transacción que las revisiones,
+    la creación de flashcards y las partidas completadas, para que el panel no
+    tenga que recorrer flashcards, progreso ni partidas.
+    """
+
+    __tablename__ = "study_stats"
+
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    mind_map_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("mind_maps.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    # Flashcards nunca revisadas, en aprendizaje y maduras (según su intervalo)
+    flashcards_new: Mapped[int] = mapped_column(Integer, default=0)
+    flashcards_learning: Mapped[int] = mapped_column(Integer, default=0)
+    flashcards_mature: Mapped[int] = mapped_column(Integer, default=0)
+    games_completed: Mapped[int] = mapped_column(Integer, default=0)
+    game_score_total: Mapped[int] = mapped_column(Integer, default=0)
+    # Mejor partida: mayor puntuación y, a igual puntuación, menor tiempo
+    best_score: Mapped[int | None] = mapped_column(Integer)
+    best_time_seconds: Mapped[int | None] = mapped_column(Integer)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
+
+
+class FlashcardDueCount(Base):
+    """
+    Número de flashcards ya revisadas de un usuario en un mapa mental por fecha de revisión.
+
+    Las pendientes hoy son la suma de las fechas hasta hoy, sin recorrer el progreso.
+    """
+
+    __tablename__ = "flashcard_due_counts"
+
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    mind_map_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("mind_maps.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    due_date: Mapped[date] = mapped_column(Date, primary_key=True)
+    flashcards: Mapped[int] = mapped_column(Integer, default=0)
@@ -9,9 +9,20 @@ from app.schemas.mind_map import (
 from app.schemas.flashcard import (
     FlashcardResponse,
     FlashcardReview,
+    FlashcardReviewItem,
+    FlashcardReviewBatchRequest,
+    FlashcardReviewBatchResponse,
     FlashcardProgressResponse,
+    FlashcardDueQueueResponse,
+    FlashcardDueCountResponse,
+    FlashcardBatchAnswer,
+    FlashcardBatchEvaluationRequest,
+    FlashcardBatchEvaluationItem,
+    FlashcardBatchEvaluationResponse,
 )
 from app.schemas.game import GameSessionCreate, GameSessionUpdate, GameSessionResponse
+from app.schemas.job import JobResponse
+from app.schemas.stats import StudyStatsCounters, MindMapStudyStats, StudyStatsResponse
 
 __all__ = [
     "UserCreate",
@@ -25,8 +36,21 @@ __all__ = [
     "MindMapListResponse",
     "FlashcardResponse",
     "FlashcardReview",
+    "FlashcardReviewItem",
+    "FlashcardReviewBatchRequest",
+    "FlashcardReviewBatchResponse",
     "FlashcardProgressResponse",
+    "FlashcardDueQueueResponse",
+    "FlashcardDueCountResponse",
+    "FlashcardBatchAnswer",
+    "FlashcardBatchEvaluationRequest",
+    "FlashcardBatchEvaluationItem",
+    "FlashcardBatchEvaluationResponse",
     "GameSessionCreate",
     "GameSessionUpdate",
     "GameSessionResponse",
+    "JobResponse",
+    "StudyStatsCounters",
+    "MindMapStudyStats",
+    "StudyStatsResponse",
 ]
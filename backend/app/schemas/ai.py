@@ -0,0 +1,59 @@
+from pydantic import BaseModel, Field
+
+
+class AINode(BaseModel):
+    """Nodo de mapa mental tal como lo genera la IA."""
+
+    id: str
+    label: str
+    content: str | None = None
+    level: int = 0
+
+    # La IA a veces devuelve IDs numéricos
+    model_config = {"coerce_numbers_to_str": True}
+
+
+class AIEdge(BaseModel):
+    """Conexión de mapa mental tal como la genera la IA."""
+
+    id: str
+    source: str
+    target: str
+
+    model_config = {"coerce_numbers_to_str": True}
+
+
+class AIMindMapStructure(BaseModel):
+    """Esquema de respuesta de la IA para un mapa mental."""
+
+    title: str
+    nodes: list[AINode]
+    edges: list[AIEdge]
+
+
+class AIMindMapRoot(BaseModel):
+    """Esquema de respuesta de la IA para el tema principal de un documento."""
+
+    title: str
+    content: str | None = None
+
+
+class AIFlashcard(BaseModel):
+    """Esquema de respuesta de la IA para una flashcard."""
+
+    question: str
+    answer: str
+
+
+class AIEvaluation(BaseModel):
+    """Esquema de respuesta de la IA para la evaluación de una respuesta."""
+
+    quality: int = Field(..., description="Calidad de 0 a 5")
+    feedback: str
+    quality_label: str
+
+
+class AIBatchEvaluation(AIEvaluation):
+    """Esquema de respuesta de la IA para una evaluación dentro de un lote."""
+
+    index: int = Field(..., description="Número de la respuesta evaluada")
@@ -18,10 +18,25 @@ class FlashcardReview(BaseModel):
     """Esquema para la revisión de una flashcard."""
 
     quality: int = Field(
-        ..., ge=0, le=5, description="Calidad de recuerdo: 0-5 (algoritmo SM-2)"
+        ..., ge=0, le=5, description="Calidad de recuerdo: 0-5 (escala de SM-2)"
     )
 
 
+class FlashcardReviewItem(FlashcardReview):
+    """Esquema para una revisión dentro de un envío por lotes."""
+
+    flashcard_id: UUID
+    reviewed_at: datetime | None = Field(
+        None, description="Momento de la revisión (p. ej. sin conexión); por defecto, ahora"
+    )
+
+
+class FlashcardReviewBatchRequest(BaseModel):
+    """Esquema para registrar varias revisiones en una sola solicitud."""
+
+    reviews: list[FlashcardReviewItem] = Field(..., min_length=1, max_length=500)
+
+
 class FlashcardAnswerSubmission(BaseModel):
     """Esquema para enviar la respuesta escrita del usuario."""
 
@@ -38,16 +53,75 @@ class AIEvaluationResponse(BaseModel):
     quality_label: str = Field(..., description="Etiqueta de calidad: Perfecto, Bien, Correcto, Difícil, Mal, No recuerdo")
 
 
+class FlashcardBatchAnswer(BaseModel):
+    """Esquema para una respuesta dentro de una evaluación por lotes."""
+
+    flashcard_id: UUID
+    user_answer: str = Field(..., min_length=1, description="Respuesta escrita por el usuario")
+
+
+class FlashcardBatchEvaluationRequest(BaseModel):
+    """Esquema para evaluar varias respuestas en una sola solicitud."""
+
+    answers: list[FlashcardBatchAnswer] = Field(..., min_length=1, max_length=50)
+
+
+class FlashcardBatchEvaluationItem(AIEvaluationResponse):
+    """Esquema para la evaluación de una respuesta del lote."""
+
+    flashcard_id: UUID
+
+
+class FlashcardBatchEvaluationResponse(BaseModel):
+    """Esquema para la respuesta de evaluación por lotes (mismo orden que la solicitud)."""
+
+    results: list[FlashcardBatchEvaluationItem]
+
+
 class FlashcardProgressResponse(BaseModel):
     """Esquema para la respuesta de progreso de la flashcard."""
 
-    id: UUID
+    id: UUID | None = Field(
+        None, description="Nulo si la flashcard aún no se ha revisado nunca"
+    )
     flashcard_id: UUID
     flashcard: FlashcardResponse
     easiness_factor: float
     interval: int
     repetitions: int
+    stability: float | None = Field(
+        None, description="Estabilidad FSRS en días (nula si no se ha revisado con FSRS)"
+    )
+    difficulty: float | None = Field(None, description="Dificultad FSRS: 1-10")
     next_review_date: date
     last_reviewed_at: datetime | None
 
     model_config = {"from_attributes": True}
+
+
+class FlashcardDueQueueResponse(BaseModel):
+    """Esquema para una página de la cola de flashcards pendientes."""
+
+    items: list[FlashcardProgressResponse]
+    next_cursor: str | None = Field(
+        None, description="Cursor de la página siguiente; nulo si no hay más"
+    )
+
+
+class FlashcardDueCountResponse(BaseModel):
+    """Esquema para el número de flashcards pendientes hoy (con los límites diarios)."""
+
+    new: int = Field(..., description="Flashcards nunca revisadas")
+    review: int = Field(..., description="Flashcards con revisiones anteriores")
+    total: int
+
+
+class FlashcardReviewBatchResponse(BaseModel):
+    """Esquema para la respuesta de un envío de revisiones por lotes."""
+
+    results: list[FlashcardProgressResponse] = Field(
+        ..., description="Progreso final de cada flashcard revisada"
+    )
+    skipped: int = Field(
+        0, description="Revisiones ignoradas por no ser posteriores a la última registrada"
+    )
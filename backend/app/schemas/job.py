@@ -0,0 +1,20 @@
+from pydantic import BaseModel, Field
+from uuid import UUID
+from datetime import datetime
+
+
+class JobResponse(BaseModel):
+    """Esquema para el estado de un trabajo en segundo plano."""
+
+    id: UUID
+    job_type: str
+    status: str = Field(..., description="queued, running, completed o failed")
+    stage: str = Field(..., description="Etapa actual del procesamiento")
+    result: dict | None = Field(
+        None, description="Resultado del trabajo (p. ej. {'mind_map_id': ...})"
+    )
+    error: str | None = None
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = {"from_attributes": True}
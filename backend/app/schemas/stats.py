@@ -0,0 +1,33 @@
+from pydantic import BaseModel, Field
+from uuid import UUID
+
+
+class StudyStatsCounters(BaseModel):
+    """Esquema para los contadores de estudio de uno o varios mapas mentales."""
+
+    due_today: int = Field(..., description="Flashcards revisadas antes y pendientes hoy")
+    new: int = Field(..., description="Flashcards nunca revisadas")
+    available_today: int = Field(
+        ..., description="Flashcards que la cola de estudio servirá hoy, con los límites diarios"
+    )
+    learning: int = Field(..., description="Flashcards en aprendizaje")
+    mature: int = Field(..., description="Flashcards con intervalo largo (maduras)")
+    games_completed: int
+    average_score: float | None
+    best_score: int | None
+    best_time_seconds: int | None = Field(
+        None, description="Tiempo de la partida con la mejor puntuación"
+    )
+
+
+class MindMapStudyStats(StudyStatsCounters):
+    """Esquema para los contadores de estudio de un mapa mental."""
+
+    mind_map_id: UUID
+
+
+class StudyStatsResponse(BaseModel):
+    """Esquema para el panel de estadísticas de estudio."""
+
+    totals: StudyStatsCounters
+    mind_maps: list[MindMapStudyStats]
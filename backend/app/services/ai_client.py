@@ -0,0 +1,81 @@
+import json
+import requests
+from google import genai
+from google.genai import errors
+from google.genai._api_client import HttpResponse, RequestJsonEncoder
+from requests.adapters import HTTPAdapter
+from app.config import settings
+from app.utils.logger import log_warning
+
+
+_client: genai.Client | None = None
+_http_session: requests.Session | None = None
+
+
+def _create_http_session() -> requests.Session:
+    """Crear una sesión HTTP con pool de conexiones keep-alive."""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=1, pool_maxsize=settings.AI_HTTP_POOL_SIZE
+    )
+    session.mount("https://", adapter)
+    return session
+
+
+def _use_pooled_session(client: genai.Client, session: requests.Session) -> None:
+    """
+    Hacer que el cliente reutilice la sesión HTTP compartida.
+
+    google-genai 0.3.0 abre una requests.Session nueva (y una conexión TLS nueva)
+    en cada solicitud; se sustituye por una que usa el pool compartido.
+    """
+    api_client = client._api_client
+    if not hasattr(api_client, "_request_unauthorized"):
+        log_warning("Versión de google-genai no compatible con el pool HTTP compartido")
+        return
+
+    def request_unauthorized(http_request, stream: bool = False) -> HttpResponse:
+        data = None
+        if http_request.data:
+            if not isinstance(http_request.data, bytes):
+                data = json.dumps(http_request.data, cls=RequestJsonEncoder)
+            else:
+                data = http_request.data
+
+        request = requests.Request(
+            method=http_request.method,
+            url=http_request.url,
+            headers=http_request.headers,
+            data=data,
+        ).prepare()
+        response = session.send(
+            request, stream=stream, timeout=settings.AI_HTTP_TIMEOUT_SECONDS
+        )
+        errors.APIError.raise_for_response(response)
+        return HttpResponse(response.headers, response if stream else [response.text])
+
+    api_client._request_unauthorized = request_unauthorized
+
+
+def init_ai_client() -> genai.Client:
+    """Crear el cliente de Gemini compartido por todo el proceso."""
+    global _client, _http_session
+    if _client is None:
+        _http_session = _create_http_session()
+        _client = genai.Client(api_key=settings.GEMINI_API_KEY)
+        _use_pooled_session(_client, _http_session)
+    return _client
+
+
+def get_ai_client() -> genai.Client:
+    """Obtener el cliente de Gemini compartido (se crea si aún no existe)."""
+    return _client or init_ai_client()
+
+
+def close_ai_client() -> None:
+    """Cerrar las conexiones del cliente compartido."""
+    global _client, _http_session
+    if _http_session is not None:
+        _http_session.close()
+    _client = None
+    _http_session = None
@@ -0,0 +1,274 @@
+import asyncio
+import json
+import random
+import re
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator
+import requests
+from google import genai
+from google.genai import errors
+from google.genai.types import GenerateContentConfig
+from app.config import settings
+from app.schemas.ai import (
+    AIMindMapStructure,
+    AIMindMapRoot,
+    AIFlashcard,
+    AIEvaluation,
+    AIBatchEvaluation,
+)
+from app.services.ai_client import get_ai_client
+from app.services.local_grader import local_grader
+from app.utils.ai_json import to_response_schema
+
+
+class AIProvider(ABC):
+    """Proveedor de generación de texto usado por AIService."""
+
+    model: str
+
+    @abstractmethod
+    async def generate_json(
+        self, prompt: str, response_type: Any, temperature: float | None = None
+    ) -> str:
+        """Generar una respuesta JSON (como texto) que cumpla el esquema de response_type."""
+
+    @abstractmethod
+    def stream_text(self, prompt: str) -> AsyncIterator[str]:
+        """Generar texto libre en fragmentos a medida que se produce."""
+
+
+class GeminiProvider(AIProvider):
+    """Proveedor respaldado por la API de Gemini."""
+
+    def __init__(self, client: genai.Client, model: str):
+        self.client = client
+        self.model = model
+
+    async def generate_json(
+        self, prompt: str, response_type: Any, temperature: float | None = None
+    ) -> str:
+        config = GenerateContentConfig(
+            response_modalities=["TEXT"],
+            response_mime_type="application/json",
+            response_schema=to_response_schema(response_type),
+            temperature=temperature,
+        )
+        response = await self.client.aio.models.generate_content(
+            model=self.model, contents=prompt, config=config
+        )
+        return response.text
+
+    async def stream_text(self, prompt: str) -> AsyncIterator[str]:
+        # google-genai 0.3.0 lee el stream de forma bloqueante incluso desde el
+        # cliente asíncrono: cada fragmento se lee en un hilo para no bloquear el event loop
+        stream = self.client.models.generate_content_stream(
+            model=self.model, contents=prompt
+        )
+        try:
+            while True:
+                response = await asyncio.to_thread(next, stream, None)
+                if response is None:
+                    break
+                if response.text:
+                    yield response.text
+        finally:
+            stream.close()
+
+
+class FakeProvider(AIProvider):
+    """
+    Proveedor local sin red para pruebas de carga.
+
+    Las respuestas se derivan de forma determinista del texto del prompt. La
+    latencia sigue una distribución log-normal y se pueden inyectar errores 5xx
+    y 429 (los mismos errores que lanza el SDK de Gemini).
+    """
+
+    def __init__(
+        self,
+        latency_ms: float,
+        latency_sigma: float,
+        error_rate: float,
+        rate_limit_rate: float,
+        seed: int | None = None,
+    ):
+        self.model = "fake"
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self._random = random.Random(seed)
+
+    async def generate_json(
+        self, prompt: str, response_type: Any, temperature: float | None = None
+    ) -> str:
+        latency = self._sample_latency()
+        await self._inject_errors(latency)
+        await asyncio.sleep(latency)
+
+        if response_type is AIMindMapStructure:
+            result = self._mind_map(self._source_text(prompt))
+        elif response_type is AIMindMapRoot:
+            result = self._mind_map_root(prompt)
+        elif response_type == list[AIFlashcard]:
+            result = self._flashcards(prompt)
+        elif response_type is AIEvaluation:
+            result = self._evaluation(prompt)
+        elif response_type == list[AIBatchEvaluation]:
+            result = self._batch_evaluation(prompt)
+        else:
+            raise ValueError(f"Tipo de respuesta no soportado: {response_type}")
+
+        return json.dumps(result, ensure_ascii=False)
+
+    async def stream_text(self, prompt: str) -> AsyncIterator[str]:
+        latency = self._sample_latency()
+        await self._inject_errors(latency)
+
+        evaluation = self._evaluation(prompt)
+        words = evaluation["feedback"].split(" ")
+        chunks = [f"CALIDAD: {evaluation['quality']}\n"] + [
+            " ".join(words[start : start + 4]) + " "
+            for start in range(0, len(words), 4)
+        ]
+
+        # La mitad de la latencia hasta el primer fragmento, el resto repartido
+        await asyncio.sleep(latency / 2)
+        for chunk in chunks:
+            yield chunk
+            await asyncio.sleep(latency / 2 / len(chunks))
+
+    def _sample_latency(self) -> float:
+        return self._random.lognormvariate(0, self.latency_sigma) * self.latency_ms / 1000
+
+    async def _inject_errors(self, latency: float) -> None:
+        roll = self._random.random()
+        if roll < self.rate_limit_rate:
+            # Los 429 se devuelven rápido
+            await asyncio.sleep(latency / 10)
+            raise errors.ClientError(
+                429, self._error_response(429, "RESOURCE_EXHAUSTED", "Resource has been exhausted")
+            )
+        if roll < self.rate_limit_rate + self.error_rate:
+            await asyncio.sleep(latency)
+            raise errors.ServerError(
+                503, self._error_response(503, "UNAVAILABLE", "The model is overloaded")
+            )
+
+    @staticmethod
+    def _error_response(code: int, status: str, message: str) -> requests.Response:
+        response = requests.Response()
+        response.status_code = code
+        response.headers["Content-Type"] = "application/json"
+        response._content = json.dumps(
+            {"error": {"code": code, "status": status, "message": message}}
+        ).encode()
+        return response
+
+    @staticmethod
+    def _source_text(prompt: str) -> str:
+        """Extraer el texto de entrada de los prompts de AIService."""
+        match = re.search(r"Texto(?: a analizar)?:\n(.*)\n\nResponde", prompt, re.S)
+        return match.group(1) if match else prompt
+
+    @staticmethod
+    def _sentences(text: str) -> list[str]:
+        sentences = re.split(r"(?<=[.!?])\s+|\n+", text)
+        return [sentence.strip() for sentence in sentences if len(sentence.strip()) > 20]
+
+    @staticmethod
+    def _label(sentence: str, words: int = 4) -> str:
+        return " ".join(sentence.split()[:words]).strip(".,;:")
+
+    def _mind_map(self, text: str) -> dict:
+        sentences = self._sentences(text) or [text.strip() or "Contenido"]
+        title = self._label(sentences[0], 6)
+
+        nodes = [{"id": "1", "label": title, "content": sentences[0], "level": 0}]
+        edges = []
+
+        def add_node(parent: str, sentence: str, level: int) -> str:
+            node_id = str(len(nodes) + 1)
+            nodes.append(
+                {"id": node_id, "label": self._label(sentence), "content": sentence, "level": level}
+            )
+            edges.append({"id": f"e{len(edges) + 1}", "source": parent, "target": node_id})
+            return node_id
+
+        # Hasta 4 ramas con 2 hojas cada una, repartidas a lo largo del texto
+        rest = sentences[1:] or sentences
+        branches = rest[:: max(1, len(rest) // 4)][:4]
+        for branch in branches:
+            branch_id = add_node("1", branch, 1)
+            start = rest.index(branch) + 1
+            for leaf in rest[start : start + 2]:
+                add_node(branch_id, leaf, 2)
+
+        return {"title": title, "nodes": nodes, "edges": edges}
+
+    @staticmethod
+    def _mind_map_root(prompt: str) -> dict:
+        titles = re.findall(r"^- (.*?):", prompt, re.M)
+        title = titles[0] if titles else "Documento"
+        return {"title": f"Resumen: {title}", "content": ", ".join(titles)}
+
+    def _flashcards(self, prompt: str) -> list[dict]:
+        match = re.search(r"Genera (\d+) flashcards", prompt)
+        num_cards = int(match.group(1)) if match else 10
+
+        sentences = self._sentences(self._source_text(prompt))[:num_cards]
+        return [
+            {"question": f"¿Qué se indica sobre «{self._label(sentence)}»?", "answer": sentence}
+            for sentence in sentences
+        ]
+
+    @staticmethod
+    def _evaluate(correct_answer: str, user_answer: str) -> dict:
+        # La calificación aproximada del calificador local es determinista
+        return local_grader.estimate(correct_answer, user_answer)
+
+    def _evaluation(self, prompt: str) -> dict:
+        correct = re.search(r"RESPUESTA CORRECTA: (.*)", prompt)
+        user = re.search(r"RESPUESTA DEL ESTUDIANTE: (.*)", prompt)
+        return self._evaluate(
+            correct.group(1) if correct else "", user.group(1) if user else ""
+        )
+
+    def _batch_evaluation(self, prompt: str) -> list[dict]:
+        blocks = re.split(r"^### Respuesta (\d+)\n", prompt, flags=re.M)[1:]
+        return [
+            {"index": int(index), **self._evaluation(block)}
+            for index, block in zip(blocks[::2], blocks[1::2])
+        ]
+
+
+_provider: AIProvider | None = None
+
+
+def create_ai_provider() -> AIProvider:
+    """Crear el proveedor de IA configurado (AI_PROVIDER)."""
+    if settings.AI_PROVIDER == "gemini":
+        return GeminiProvider(get_ai_client(), settings.AI_MODEL)
+    if settings.AI_PROVIDER == "fake":
+        return FakeProvider(
+            latency_ms=settings.AI_FAKE_LATENCY_MS,
+            latency_sigma=settings.AI_FAKE_LATENCY_SIGMA,
+            error_rate=settings.AI_FAKE_ERROR_RATE,
+            rate_limit_rate=settings.AI_FAKE_RATE_LIMIT_RATE,
+            seed=settings.AI_FAKE_SEED,
+        )
+    raise ValueError(f"Proveedor de IA no soportado: {settings.AI_PROVIDER}")
+
+
+def get_ai_provider() -> AIProvider:
+    """Obtener el proveedor de IA compartido (se crea si aún no existe)."""
+    global _provider
+    if _provider is None:
+        _provider = create_ai_provider()
+    return _provider
+
+
+def reset_ai_provider() -> None:
+    """Descartar el proveedor compartido (se llama al detener la aplicación)."""
+    global _provider
+    _provider = None
@@ -0,0 +1,287 @@
+import asyncio
+import heapq
+import itertools
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, TypeVar
+from google.genai import errors
+from app.config import settings
+from app.utils.logger import log_warning
+
+T = TypeVar("T")
+
+
+class AIPriority:
+    """Carriles de prioridad para las llamadas a la IA (menor valor = más prioridad)."""
+
+    INTERACTIVE = 0  # El usuario espera la respuesta (p. ej. evaluar una flashcard)
+    BULK = 1  # Generación de mapas mentales y flashcards en segundo plano
+
+    NAMES = {INTERACTIVE: "interactive", BULK: "bulk"}
+
+
+# Tasa mínima del token bucket: con 0 nunca se repondría ningún token
+MIN_RATE_PER_SECOND = 0.01
+
+
+class TokenBucket:
+    """
+    Limitador de tasa por token bucket con tasa adaptable.
+
+    La tasa se reduce a la mitad cuando el proveedor responde 429 y se recupera
+    poco a poco con cada respuesta correcta (AIMD), sin superar la tasa configurada.
+    Quienes esperan un token lo reciben por orden de prioridad y, dentro de cada
+    carril, por orden de llegada.
+    """
+
+    def __init__(self, rate: float, capacity: int, min_rate: float):
+        self.max_rate = max(rate, MIN_RATE_PER_SECOND)
+        self.rate = self.max_rate
+        self.min_rate = min(max(min_rate, MIN_RATE_PER_SECOND), self.max_rate)
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated_at = time.monotonic()
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._dispatcher: asyncio.Task | None = None
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated_at) * self.rate
+        )
+        self._updated_at = now
+
+    async def acquire(self, priority: int = AIPriority.BULK) -> None:
+        """Esperar hasta que haya un token disponible y consumirlo."""
+        self._refill()
+        if not self._waiters and self._tokens >= 1:
+            self._tokens -= 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), waiter))
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            # Si el token ya había sido asignado, devolverlo
+            if waiter.done() and not waiter.cancelled():
+                self._tokens = min(self.capacity, self._tokens + 1)
+            raise
+
+    async def _dispatch(self) -> None:
+        """Repartir los tokens a medida que se reponen, al primero en espera de mayor prioridad."""
+        while self._waiters:
+            self._refill()
+            if self._tokens < 1:
+                # La tasa puede cambiar durante la espera: se recalcula en cada vuelta
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                continue
+            _, _, waiter = heapq.heappop(self._waiters)
+            if not waiter.done():
+                self._tokens -= 1
+                waiter.set_result(None)
+
+    def throttle(self) -> None:
+        """Reducir la tasa tras un 429."""
+        self._refill()
+        self.rate = max(self.min_rate, self.rate / 2)
+
+    def recover(self) -> None:
+        """Recuperar parte de la tasa tras una respuesta correcta."""
+        if self.rate < self.max_rate:
+            self._refill()
+            self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+
+class AIScheduler:
+    """
+    Planificador de las llamadas salientes a la IA.
+
+    Limita las llamadas simultáneas, aplica el token bucket, atiende primero el
+    carril interactivo y reintenta los 429/5xx con backoff exponencial con jitter.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        rate_per_second: float,
+        burst: int,
+        max_retries: int,
+        retry_base_delay: float,
+        retry_max_delay: float,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.bucket = TokenBucket(
+            rate_per_second, burst, min_rate=rate_per_second / 10
+        )
+
+        self._in_flight = 0
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+
+        self._queued = {priority: 0 for priority in AIPriority.NAMES}
+        self._wait_stats = {
+            priority: {"count": 0, "total": 0.0, "max": 0.0}
+            for priority in AIPriority.NAMES
+        }
+        self._counters = {"completed": 0, "failed": 0, "retries": 0, "rate_limited": 0}
+
+    async def run(
+        self,
+        call: Callable[[], Awaitable[T]],
+        priority: int = AIPriority.BULK,
+    ) -> T:
+        """
+        Ejecutar una llamada a la IA respetando los límites.
+
+        Args:
+            call: Función sin argumentos que crea la corrutina de la llamada
+            priority: Carril de prioridad (AIPriority)
+
+        Returns:
+            El resultado de la llamada
+
+        Raises:
+            La última excepción si se agotan los reintentos o no es reintentable
+        """
+        for attempt in range(self.max_retries + 1):
+            await self._acquire(priority)
+            try:
+                await self.bucket.acquire(priority)
+                result = await call()
+            except Exception as e:
+                if not self._is_retryable(e) or attempt == self.max_retries:
+                    self._counters["failed"] += 1
+                    raise
+                error = e
+            else:
+                self._counters["completed"] += 1
+                self.bucket.recover()
+                return result
+            finally:
+                self._release()
+
+            # El espacio se libera durante la espera para no bloquear a otras llamadas
+            if getattr(error, "code", None) == 429:
+                self._counters["rate_limited"] += 1
+                self.bucket.throttle()
+            self._counters["retries"] += 1
+
+            delay = self._backoff_delay(attempt)
+            log_warning(
+                f"Llamada a la IA fallida ({error.code}), reintento {attempt + 1} "
+                f"en {delay:.1f}s"
+            )
+            await asyncio.sleep(delay)
+
+    @asynccontextmanager
+    async def slot(self, priority: int = AIPriority.BULK) -> AsyncIterator[None]:
+        """
+        Reservar un espacio de ejecución durante todo el bloque (p. ej. una respuesta en streaming).
+
+        Respeta la concurrencia, la prioridad y el token bucket, pero no reintenta:
+        una respuesta en streaming no se puede repetir una vez empezada.
+        """
+        await self._acquire(priority)
+        try:
+            await self.bucket.acquire(priority)
+            yield
+        except Exception as e:
+            self._counters["failed"] += 1
+            if getattr(e, "code", None) == 429:
+                self._counters["rate_limited"] += 1
+                self.bucket.throttle()
+            raise
+        else:
+            self._counters["completed"] += 1
+            self.bucket.recover()
+        finally:
+            self._release()
+
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        """Los 429 y los errores 5xx del proveedor son transitorios."""
+        if isinstance(error, errors.ServerError):
+            return True
+        return isinstance(error, errors.ClientError) and error.code == 429
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """Backoff exponencial con jitter completo."""
+        ceiling = min(self.retry_max_delay, self.retry_base_delay * 2**attempt)
+        return random.uniform(0, ceiling)
+
+    async def _acquire(self, priority: int) -> None:
+        """Obtener un espacio de ejecución, esperando en el carril indicado."""
+        started_at = time.monotonic()
+
+        if self._in_flight < self.max_concurrency and not self._waiters:
+            self._in_flight += 1
+        else:
+            waiter = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiters, (priority, next(self._sequence), waiter))
+            self._queued[priority] += 1
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                # Si el espacio ya había sido asignado, devolverlo
+                if waiter.done() and not waiter.cancelled():
+                    self._release()
+                raise
+            finally:
+                self._queued[priority] -= 1
+
+        waited = time.monotonic() - started_at
+        stats = self._wait_stats[priority]
+        stats["count"] += 1
+        stats["total"] += waited
+        stats["max"] = max(stats["max"], waited)
+
+    def _release(self) -> None:
+        """Liberar un espacio y cedérselo al siguiente en espera de mayor prioridad."""
+        self._in_flight -= 1
+        while self._waiters and self._in_flight < self.max_concurrency:
+            _, _, waiter = heapq.heappop(self._waiters)
+            if not waiter.done():
+                self._in_flight += 1
+                waiter.set_result(None)
+
+    def get_metrics(self) -> dict:
+        """Métricas de la cola: profundidad, espera y contadores."""
+        return {
+            "in_flight": self._in_flight,
+            "max_concurrency": self.max_concurrency,
+            "rate_per_second": round(self.bucket.rate, 3),
+            "queue_depth": {
+                name: self._queued[priority]
+                for priority, name in AIPriority.NAMES.items()
+            },
+            "wait_seconds": {
+                name: {
+                    "count": stats["count"],
+                    "avg": round(stats["total"] / stats["count"], 4)
+                    if stats["count"]
+                    else 0.0,
+                    "max": round(stats["max"], 4),
+                }
+                for priority, name in AIPriority.NAMES.items()
+                for stats in [self._wait_stats[priority]]
+            },
+            **self._counters,
+        }
+
+
+ai_scheduler = AIScheduler(
+    max_concurrency=settings.AI_MAX_CONCURRENT_REQUESTS,
+    rate_per_second=settings.AI_RATE_LIMIT_PER_SECOND,
+    burst=settings.AI_RATE_LIMIT_BURST,
+    max_retries=settings.AI_MAX_RETRIES,
+    retry_base_delay=settings.AI_RETRY_BASE_DELAY_SECONDS,
+    retry_max_delay=settings.AI_RETRY_MAX_DELAY_SECONDS,
+)
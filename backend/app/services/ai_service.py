@@ -1,20 +1,52 @@
-import json
-import os
-from google import genai
-from google.genai.types import GenerateContentConfig
+import asyncio
+import re
+from typing import Any, AsyncIterator
+from pydantic import TypeAdapter
 from app.config import settings
+from app.services.ai_providers import AIProvider, get_ai_provider
+from app.services.ai_scheduler import AIPriority, AIScheduler, ai_scheduler
+from app.services.local_grader import local_grader
+from app.schemas.ai import (
+    AIMindMapStructure,
+    AIMindMapRoot,
+    AIFlashcard,
+    AIEvaluation,
+    AIBatchEvaluation,
+)
+from app.utils.ai_json import parse_json_response
+from app.utils.logger import log_info, log_warning
 
 
-class AIService:
-    """Servicio para operaciones de IA utilizando Gemini Flash Latest."""
+class AIResponseError(ValueError):
+    """La IA no devolvió una respuesta con el formato esperado."""
 
-    def __init__(self):
-        """Inicializar el servicio de IA con el cliente de Gemini."""
-        # Establecer la clave API como variable de entorno (requerida por el SDK de google-genai)
-        os.environ["GOOGLE_API_KEY"] = settings.GEMINI_API_KEY
 
-        self.client = genai.Client()
-        self.model = "gemini-flash-latest"
+class AIService:
+    """Servicio para operaciones de IA (Gemini o el proveedor configurado en AI_PROVIDER)."""
+
+    # Incrementar cuando cambie el prompt del mapa mental para invalidar la caché de estructuras
+    MIND_MAP_PROMPT_VERSION = "mind-map-v2"
+    # Incrementar cuando cambie el prompt de evaluación para invalidar la caché de evaluaciones
+    EVALUATION_PROMPT_VERSION = "evaluation-v1"
+
+    QUALITY_LABELS = {
+        5: "Perfecto",
+        4: "Bien",
+        3: "Correcto",
+        2: "Difícil",
+        1: "Mal",
+        0: "No recuerdo",
+    }
+
+    def __init__(
+        self,
+        provider: AIProvider | None = None,
+        scheduler: AIScheduler | None = None,
+    ):
+        """Inicializar el servicio de IA con el proveedor y el planificador compartidos."""
+        self.provider = provider or get_ai_provider()
+        self.scheduler = scheduler or ai_scheduler
+        self.model = self.provider.model
 
     async def generate_mind_map_structure(
         self, text: str, title: str | None = None
@@ -22,6 +54,9 @@ class AIService:
         """
         Genere la estructura de un mapa mental a partir del texto usando Gemini.
 
+        Los textos más largos que AI_MIND_MAP_CHUNK_CHARS se dividen en fragmentos
+        que se procesan en paralelo y se combinan en una sola jerarquía.
+
         Args:
             text: Texto extraído de PDF
             title: Título opcional para el mapa mental
@@ -33,6 +68,19 @@ class AIService:
                 "edges": [{"id": str, "source": str, "target": str}]
             }
         """
+        if len(text) > settings.AI_MIND_MAP_CHUNK_CHARS:
+            structure = await self._generate_chunked_mind_map(text)
+        else:
+            structure = await self._generate_mind_map_section(text)
+
+        # Utilice el título proporcionado o el título generado por IA
+        if title:
+            structure["title"] = title
+
+        return structure
+
+    async def _generate_mind_map_section(self, text: str) -> dict:
+        """Generar el mapa mental de un texto con una sola llamada a Gemini."""
         prompt = f"""Analiza el siguiente texto y genera un mapa mental jerárquico en formato JSON.
 
 IMPORTANTE: Responde ÚNICAMENTE con el objeto JSON, sin texto adicional antes o después.
@@ -64,30 +112,7 @@ Texto a analizar:
 Responde SOLO con el JSON (sin markdown, sin explicaciones):"""
 
         try:
-            response = await self.client.aio.models.generate_content(
-                model=self.model,
-                contents=prompt,
-                config=GenerateContentConfig(response_modalities=["TEXT"]),
-            )
-
-            # Extraer JSON de la respuesta
-            response_text = response.text.strip()
-
-            # Eliminar bloques de código de rebajas si están presentes
-            if response_text.startswith("```"):
-                lines = response_text.split("\n")
-                response_text = (
-                    "\n".join(lines[1:-1]) if len(lines) > 2 else response_text
-                )
-                response_text = (
-                    response_text.replace("```json", "").replace("```", "").strip()
-                )
-
-            structure = json.loads(response_text)
-
-            # Validar estructura
-            if "nodes" not in structure or "edges" not in structure:
-                raise ValueError("Estructura no válida de la IA: nodos o bordes faltantes")
+            structure = await self._generate_structured(prompt, AIMindMapStructure)
 
             # Validar nodos mínimos
             if len(structure["nodes"]) < 2:
@@ -95,37 +120,225 @@ Responde SOLO con el JSON (sin markdown, sin explicaciones):"""
                     f"La IA generó un número insuficiente de nodos: solo {len(structure['nodes'])} nodo(s)"
                 )
 
-            # Utilice el título proporcionado o el título generado por IA
-            if title:
-                structure["title"] = title
-
             return structure
 
-        except json.JSONDecodeError as e:
+        except AIResponseError as e:
             # Registrar el error para depurarlo
-            print(f"Error de decodificación de JSON: {str(e)}")
-            print(
-                f"Response text: {response_text if 'response_text' in locals() else 'N/A'}"
-            )
+            log_warning(f"Error de decodificación de JSON: {str(e)}")
             raise ValueError(
                 "La IA no pudo generar un mapa mental válido. "
                 "Por favor, intenta con un PDF diferente o con más contenido."
             )
         except ValueError as e:
             # Volver a generar errores de validación
-            print(f"Validation error: {str(e)}")
+            log_warning(f"Error de validación del mapa mental: {str(e)}")
             raise ValueError(
                 f"Error al generar el mapa mental: {str(e)}. "
                 "El PDF puede ser muy corto o el contenido no es adecuado para generar un mapa mental."
             )
         except Exception as e:
             # Registrar el error para depurarlo
-            print(f"Error inesperado al generar el mapa mental: {str(e)}")
-            print(
-                f"Texto de respuesta (si está disponible): {response_text if 'response_text' in locals() else 'N/A'}"
-            )
+            log_warning(f"Error inesperado al generar el mapa mental: {str(e)}")
             raise ValueError(f"Error inesperado al procesar el PDF con IA: {str(e)}")
 
+    async def _generate_chunked_mind_map(self, text: str) -> dict:
+        """
+        Generar un mapa mental por fragmentos (map-reduce).
+
+        Cada fragmento produce un submapa (en paralelo, con concurrencia limitada);
+        una llamada final de consolidación define el tema principal y los submapas
+        se cuelgan de un nodo raíz común con IDs renumerados de forma estable.
+        """
+        chunks = self._split_text(text)
+        semaphore = asyncio.Semaphore(settings.AI_MIND_MAP_CHUNK_CONCURRENCY)
+
+        async def generate_section(chunk: str) -> dict:
+            async with semaphore:
+                return await self._generate_mind_map_section(chunk)
+
+        results = await asyncio.gather(
+            *(generate_section(chunk) for chunk in chunks), return_exceptions=True
+        )
+
+        sections = [result for result in results if isinstance(result, dict)]
+        if not sections:
+            # Todos los fragmentos fallaron: propagar el primer error
+            raise results[0]
+
+        log_info(
+            f"Mapa mental por fragmentos: {len(sections)}/{len(chunks)} fragmentos generados"
+        )
+
+        root = await self._consolidate_sections(sections)
+
+        return self._merge_sections(root, sections)
+
+    @staticmethod
+    def _split_text(text: str) -> list[str]:
+        """
+        Dividir el texto en fragmentos respetando páginas y párrafos.
+
+        El tamaño de fragmento crece si hace falta para no superar AI_MIND_MAP_MAX_CHUNKS.
+        """
+        max_chars = max(
+            settings.AI_MIND_MAP_CHUNK_CHARS,
+            -(-len(text) // settings.AI_MIND_MAP_MAX_CHUNKS),
+        )
+
+        chunks: list[str] = []
+        current: list[str] = []
+        current_length = 0
+
+        for paragraph in text.split("\n\n"):
+            # Párrafos demasiado largos se cortan en bloques de max_chars
+            pieces = [
+                paragraph[start : start + max_chars]
+                for start in range(0, len(paragraph), max_chars)
+            ] or [""]
+
+            for piece in pieces:
+                if current and current_length + len(piece) > max_chars:
+                    chunks.append("\n\n".join(current))
+                    current, current_length = [], 0
+                current.append(piece)
+                current_length += len(piece) + 2
+
+        if current:
+            chunks.append("\n\n".join(current))
+
+        chunks = [chunk for chunk in chunks if chunk.strip()]
+
+        # Agrupar fragmentos consecutivos si el reparto dejó más del máximo
+        group_size = -(-len(chunks) // settings.AI_MIND_MAP_MAX_CHUNKS)
+        if group_size > 1:
+            chunks = [
+                "\n\n".join(chunks[start : start + group_size])
+                for start in range(0, len(chunks), group_size)
+            ]
+
+        return chunks
+
+    async def _consolidate_sections(self, sections: list[dict]) -> dict:
+        """
+        Obtener el título y la descripción del nodo raíz a partir de los submapas.
+
+        Returns:
+            Dict con: {"title": str, "content": str}
+        """
+        outline = "\n".join(
+            f"- {section.get('title', '')}: "
+            + ", ".join(
+                node["label"] for node in section["nodes"] if node.get("level") == 1
+            )
+            for section in sections
+        )
+
+        prompt = f"""Estos son los temas de las secciones de un mismo documento, con sus subtemas:
+
+{outline}
+
+Genera el tema principal que engloba todas las secciones.
+
+IMPORTANTE: Responde ÚNICAMENTE con el objeto JSON, sin texto adicional.
+
+Formato requerido:
+{{"title": "Tema principal del documento", "content": "Descripción breve del documento"}}
+
+Responde SOLO con el JSON:"""
+
+        try:
+            return await self._generate_structured(prompt, AIMindMapRoot)
+        except Exception as e:
+            # Respaldo: usar el título de la primera sección
+            log_warning(f"Error al consolidar el mapa mental: {type(e).__name__} {e}")
+            return {"title": sections[0].get("title") or "Mapa mental", "content": None}
+
+    @staticmethod
+    def _merge_sections(root: dict, sections: list[dict]) -> dict:
+        """
+        Unir los submapas bajo un nodo raíz común.
+
+        Los IDs se asignan secuencialmente en el orden de los fragmentos, por lo que
+        el mismo conjunto de submapas produce siempre los mismos IDs.
+        """
+        nodes = [
+            {
+                "id": "1",
+                "label": root["title"],
+                "content": root.get("content"),
+                "level": 0,
+            }
+        ]
+        edges = []
+
+        def add_edge(source: str, target: str) -> None:
+            edges.append({"id": f"e{len(edges) + 1}", "source": source, "target": target})
+
+        for section in sections:
+            id_map: dict[str, str] = {}
+            for node in section["nodes"]:
+                new_id = str(len(nodes) + 1)
+                id_map[str(node["id"])] = new_id
+                level = node.get("level", 0)
+                nodes.append({**node, "id": new_id, "level": level + 1})
+
+                # Las raíces de cada submapa se conectan al nodo raíz común
+                if level == 0:
+                    add_edge("1", new_id)
+
+            for edge in section["edges"]:
+                source = id_map.get(str(edge["source"]))
+                target = id_map.get(str(edge["target"]))
+                if source and target:
+                    add_edge(source, target)
+
+        return {"title": root["title"], "nodes": nodes, "edges": edges}
+
+    async def _generate_structured(
+        self,
+        prompt: str,
+        response_type: Any,
+        temperature: float | None = None,
+        priority: int = AIPriority.BULK,
+    ) -> Any:
+        """
+        Generar una respuesta JSON validada contra un esquema.
+
+        El proveedor genera en modo JSON con el esquema de response_type. Si la
+        respuesta no es válida se reintenta hasta AI_JSON_MAX_RETRIES veces,
+        indicando al modelo el error encontrado. Cada llamada pasa por el
+        planificador con la prioridad indicada.
+
+        Returns:
+            La respuesta como dict/list (validada con el esquema)
+
+        Raises:
+            AIResponseError: Si ninguna respuesta es válida
+        """
+        adapter = TypeAdapter(response_type)
+
+        contents = prompt
+        for attempt in range(settings.AI_JSON_MAX_RETRIES + 1):
+            text = await self.scheduler.run(
+                lambda: self.provider.generate_json(
+                    contents, response_type, temperature=temperature
+                ),
+                priority=priority,
+            )
+
+            try:
+                parsed = adapter.validate_python(parse_json_response(text))
+                return adapter.dump_python(parsed)
+            except ValueError as e:
+                error = str(e)
+                log_warning(f"Respuesta JSON no válida (intento {attempt + 1}): {error[:300]}")
+                contents = (
+                    f"{prompt}\n\nTu respuesta anterior no era válida ({error[:300]}). "
+                    "Responde de nuevo SOLO con JSON válido que cumpla el formato requerido."
+                )
+
+        raise AIResponseError(f"La IA no devolvió JSON válido: {error[:300]}")
+
     async def generate_flashcards(self, text: str, num_cards: int = 10) -> list[dict]:
         """
         Genera tarjetas didácticas a partir de texto usando Gemini.
@@ -135,7 +348,7 @@ Responde SOLO con el JSON (sin markdown, sin explicaciones):"""
             num_cards: Número de tarjetas didácticas a generar
 
         Returns:
-            Lista de dicts: [{"question": str, "answer": str}]
+            Lista de dicts: [{"question": str, "answer": str}] (vacía si la IA falla)
         """
         prompt = f"""Genera {num_cards} flashcards educativas del siguiente texto.
 
@@ -159,45 +372,21 @@ Texto:
 Responde SOLO con el array JSON:"""
 
         try:
-            response = await self.client.aio.models.generate_content(
-                model=self.model,
-                contents=prompt,
-                config=GenerateContentConfig(
-                    response_modalities=["TEXT"], temperature=0.8
-                ),
+            return await self._generate_structured(
+                prompt, list[AIFlashcard], temperature=0.8
             )
 
-            response_text = response.text.strip()
-
-            # Eliminar bloques de código de rebajas
-            if response_text.startswith("```"):
-                lines = response_text.split("\n")
-                response_text = (
-                    "\n".join(lines[1:-1]) if len(lines) > 2 else response_text
-                )
-                response_text = (
-                    response_text.replace("```json", "").replace("```", "").strip()
-                )
-
-            flashcards = json.loads(response_text)
-
-            # Validar estructura
-            if not isinstance(flashcards, list):
-                raise ValueError("Formato de flashcards no válido")
-
-            return flashcards
-
         except Exception as e:
-            # Respaldo: crear una tarjeta didáctica sencilla
-            return [
-                {
-                    "question": "¿Cuál es el tema principal del documento?",
-                    "answer": text,
-                }
-            ]
+            # Sin flashcards antes que una tarjeta con el documento entero como respuesta
+            log_warning(f"No se pudieron generar flashcards: {type(e).__name__} {e}")
+            return []
 
     async def evaluate_flashcard_answer(
-        self, question: str, correct_answer: str, user_answer: str
+        self,
+        question: str,
+        correct_answer: str,
+        user_answer: str,
+        fallback: bool = True,
     ) -> dict:
         """
         Evalúa la respuesta del usuario a una flashcard usando IA.
@@ -206,6 +395,7 @@ Responde SOLO con el array JSON:"""
             question: La pregunta de la flashcard
             correct_answer: La respuesta correcta
             user_answer: La respuesta proporcionada por el usuario
+            fallback: Si la IA falla, usar la calificación local en lugar de lanzar el error
 
         Returns:
             Dict con: {
@@ -245,61 +435,192 @@ Formato requerido:
 Responde SOLO con el JSON:"""
 
         try:
-            response = await self.client.aio.models.generate_content(
-                model=self.model,
-                contents=prompt,
-                config=GenerateContentConfig(
-                    response_modalities=["TEXT"]
-                ),
+            evaluation = await self._generate_structured(
+                prompt, AIEvaluation, priority=AIPriority.INTERACTIVE
             )
 
-            response_text = response.text.strip()
+            # Asegurar que quality esté en el rango correcto
+            evaluation["quality"] = max(0, min(5, int(evaluation["quality"])))
+
+            return evaluation
 
-            # Eliminar bloques de código markdown
-            if response_text.startswith("```"):
-                lines = response_text.split("\n")
-                response_text = (
-                    "\n".join(lines[1:-1]) if len(lines) > 2 else response_text
-                )
-                response_text = (
-                    response_text.replace("```json", "").replace("```", "").strip()
+        except Exception as e:
+            if not fallback:
+                raise
+            # Respaldo: calificación local por similitud de texto
+            log_warning(f"Evaluación con IA no disponible: {type(e).__name__} {e}")
+            return local_grader.estimate(correct_answer, user_answer)
+
+    async def evaluate_flashcard_answers_batch(
+        self, items: list[dict]
+    ) -> list[dict | None]:
+        """
+        Evalúa varias respuestas con una llamada a la IA por cada lote.
+
+        Las respuestas se agrupan en lotes de AI_EVALUATION_BATCH_SIZE que se
+        evalúan en paralelo.
+
+        Args:
+            items: Lista de dicts: [{"question": str, "correct_answer": str, "user_answer": str}]
+
+        Returns:
+            Lista con la evaluación de cada respuesta en el mismo orden, o None
+            para las que la IA no pudo evaluar
+        """
+        batch_size = settings.AI_EVALUATION_BATCH_SIZE
+        batches = [
+            items[start : start + batch_size]
+            for start in range(0, len(items), batch_size)
+        ]
+
+        results = await asyncio.gather(
+            *(self._evaluate_batch(batch) for batch in batches),
+            return_exceptions=True,
+        )
+
+        evaluations: list[dict | None] = []
+        for batch, result in zip(batches, results):
+            if isinstance(result, BaseException):
+                log_warning(
+                    f"Evaluación por lotes no disponible: {type(result).__name__} {result}"
                 )
+                result = [None] * len(batch)
+            evaluations.extend(result)
 
-            evaluation = json.loads(response_text)
+        return evaluations
 
-            # Validar que tenga los campos requeridos
-            if (
-                "quality" not in evaluation
-                or "feedback" not in evaluation
-                or "quality_label" not in evaluation
-            ):
-                raise ValueError("Evaluación incompleta de la IA")
+    async def _evaluate_batch(self, items: list[dict]) -> list[dict | None]:
+        """Evaluar un lote de respuestas con una sola llamada a Gemini."""
+        answers = "\n\n".join(
+            f"""### Respuesta {index}
+PREGUNTA: {item["question"]}
+RESPUESTA CORRECTA: {item["correct_answer"]}
+RESPUESTA DEL ESTUDIANTE: {item["user_answer"]}"""
+            for index, item in enumerate(items, start=1)
+        )
 
-            # Asegurar que quality esté en el rango correcto
-            evaluation["quality"] = max(0, min(5, int(evaluation["quality"])))
+        prompt = f"""Eres un tutor educativo. Evalúa cada una de las respuestas del estudiante a preguntas de flashcards.
 
-            return evaluation
+{answers}
 
-        except Exception as e:
-            # Respaldo: evaluación básica por coincidencia de texto
-            user_lower = user_answer.lower().strip()
-            correct_lower = correct_answer.lower().strip()
-
-            if user_lower == correct_lower:
-                return {
-                    "quality": 5,
-                    "feedback": "Respuesta exactamente correcta",
-                    "quality_label": "Perfecto",
-                }
-            elif correct_lower in user_lower or user_lower in correct_lower:
-                return {
-                    "quality": 3,
-                    "feedback": "Respuesta parcialmente correcta. Revisa los detalles.",
-                    "quality_label": "Correcto",
-                }
-            else:
-                return {
-                    "quality": 1,
-                    "feedback": "Respuesta incorrecta. Repasa el concepto.",
-                    "quality_label": "Mal",
-                }
+Para CADA respuesta proporciona:
+1. Una calificación de calidad (0-5) según estos criterios:
+   - 5 (Perfecto): Respuesta completamente correcta y precisa
+   - 4 (Bien): Respuesta correcta con detalles adecuados
+   - 3 (Correcto): Respuesta correcta pero incompleta o con algunos errores menores
+   - 2 (Difícil): Respuesta parcialmente correcta, falta información importante
+   - 1 (Mal): Respuesta incorrecta o con errores significativos
+   - 0 (No recuerdo): Respuesta completamente incorrecta o sin sentido
+
+2. Retroalimentación constructiva y específica (máximo 200 caracteres)
+
+IMPORTANTE: Responde ÚNICAMENTE con el array JSON, un elemento por respuesta, sin texto adicional.
+
+Formato requerido:
+[
+  {{"index": 1, "quality": 0-5, "feedback": "Retroalimentación aquí", "quality_label": "Perfecto/Bien/Correcto/Difícil/Mal/No recuerdo"}}
+]
+
+Responde SOLO con el array JSON:"""
+
+        evaluations = await self._generate_structured(
+            prompt, list[AIBatchEvaluation], priority=AIPriority.INTERACTIVE
+        )
+
+        results: list[dict | None] = [None] * len(items)
+        for evaluation in evaluations:
+            position = evaluation.pop("index") - 1
+            if 0 <= position < len(items):
+                evaluation["quality"] = max(0, min(5, int(evaluation["quality"])))
+                results[position] = evaluation
+
+        # Las respuestas que la IA omitió se evalúan por separado
+        missing = [position for position, result in enumerate(results) if result is None]
+        retried = await asyncio.gather(
+            *(
+                self.evaluate_flashcard_answer(**items[position], fallback=False)
+                for position in missing
+            ),
+            return_exceptions=True,
+        )
+        for position, result in zip(missing, retried):
+            if not isinstance(result, BaseException):
+                results[position] = result
+
+        return results
+
+    async def stream_flashcard_evaluation(
+        self, question: str, correct_answer: str, user_answer: str
+    ) -> AsyncIterator[dict]:
+        """
+        Evalúa la respuesta del usuario emitiendo el resultado a medida que se genera.
+
+        El modelo escribe primero la calificación y después la retroalimentación,
+        así que la calificación se emite en cuanto llega la primera línea.
+
+        Yields:
+            Primero {"quality": int, "quality_label": str}; después
+            {"feedback": str} con cada fragmento de la retroalimentación
+
+        Raises:
+            AIResponseError: Si la primera línea no contiene una calificación
+        """
+        prompt = f"""Eres un tutor educativo. Evalúa la respuesta del estudiante a una pregunta de flashcard.
+
+PREGUNTA: {question}
+
+RESPUESTA CORRECTA: {correct_answer}
+
+RESPUESTA DEL ESTUDIANTE: {user_answer}
+
+Criterios de calidad (0-5):
+- 5 (Perfecto): Respuesta completamente correcta y precisa
+- 4 (Bien): Respuesta correcta con detalles adecuados
+- 3 (Correcto): Respuesta correcta pero incompleta o con algunos errores menores
+- 2 (Difícil): Respuesta parcialmente correcta, falta información importante
+- 1 (Mal): Respuesta incorrecta o con errores significativos
+- 0 (No recuerdo): Respuesta completamente incorrecta o sin sentido
+
+IMPORTANTE: Responde EXACTAMENTE con este formato de texto plano, sin markdown:
+CALIDAD: <número del 0 al 5>
+<retroalimentación constructiva y específica, máximo 200 caracteres>"""
+
+        buffer = ""
+        scored = False
+
+        async for chunk in self._stream_text(prompt, priority=AIPriority.INTERACTIVE):
+            if scored:
+                yield {"feedback": chunk}
+                continue
+
+            buffer += chunk
+            if "\n" not in buffer:
+                continue
+
+            first_line, feedback = buffer.split("\n", 1)
+            match = re.search(r"[0-5]", first_line)
+            if not match:
+                raise AIResponseError(f"La IA no devolvió una calificación: {first_line[:100]}")
+
+            quality = int(match.group())
+            yield {"quality": quality, "quality_label": self.QUALITY_LABELS[quality]}
+            scored = True
+
+            if feedback.strip():
+                yield {"feedback": feedback.lstrip()}
+
+        if not scored:
+            # Respuesta de una sola línea
+            match = re.search(r"[0-5]", buffer)
+            if not match:
+                raise AIResponseError(f"La IA no devolvió una calificación: {buffer[:100]}")
+            quality = int(match.group())
+            yield {"quality": quality, "quality_label": self.QUALITY_LABELS[quality]}
+
+    async def _stream_text(
+        self, prompt: str, priority: int = AIPriority.BULK
+    ) -> AsyncIterator[str]:
+        """Generar texto en streaming ocupando un espacio del planificador hasta terminar."""
+        async with self.scheduler.slot(priority):
+            async for chunk in self.provider.stream_text(prompt):
+                yield chunk
@@ -0,0 +1,333 @@
+import asyncio
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import DateTime, Integer, bindparam, func, select, update
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID, insert
+from datetime import datetime, timedelta
+from uuid import UUID
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.cache import MindMapStructureCache, FlashcardEvaluationCache
+from app.utils.logger import log_error
+from app.utils.text import normalize_answer, text_fingerprint
+
+
+class CacheHitRecorder:
+    """
+    Aciertos de las cachés persistentes (hit_count y last_used_at) acumulados en memoria.
+
+    Leer de la caché no escribe en la base de datos: los aciertos se escriben
+    cada flush_interval segundos con un UPDATE por tabla. Solo se registran
+    mientras la escritura periódica está activa (no en comandos); los aciertos
+    pendientes se pierden si el proceso termina de forma abrupta o falla la escritura.
+    """
+
+    MODELS = (MindMapStructureCache, FlashcardEvaluationCache)
+
+    def __init__(self, flush_interval: float):
+        self.flush_interval = flush_interval
+        self._hits: dict[type, Counter] = {model: Counter() for model in self.MODELS}
+        self._last_used: dict[type, dict[UUID, datetime]] = {
+            model: {} for model in self.MODELS
+        }
+        self._task: asyncio.Task | None = None
+
+    def record(self, model: type, entry_id: UUID) -> None:
+        """Registrar un acierto de la entrada entry_id."""
+        if self._task is None:
+            return
+        self._hits[model][entry_id] += 1
+        self._last_used[model][entry_id] = datetime.utcnow()
+
+    async def start(self) -> None:
+        """Iniciar la escritura periódica en segundo plano."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self) -> None:
+        """Detener la escritura periódica y escribir lo pendiente."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        await self.flush()
+
+    async def flush(self) -> None:
+        """Sumar los aciertos pendientes a cada tabla (UPDATE ... FROM unnest(...))."""
+        for model in self.MODELS:
+            hits, last_used = self._hits[model], self._last_used[model]
+            if not hits:
+                continue
+            self._hits[model], self._last_used[model] = Counter(), {}
+
+            values = func.unnest(
+                bindparam("ids", type_=ARRAY(PG_UUID(as_uuid=True))),
+                bindparam("hits", type_=ARRAY(Integer)),
+                bindparam("last_used", type_=ARRAY(DateTime)),
+            ).table_valued("id", "hits", "last_used").render_derived()
+            try:
+                async with AsyncSessionLocal() as db:
+                    await db.execute(
+                        update(model)
+                        .where(model.id == values.c.id)
+                        .values(
+                            hit_count=model.hit_count + values.c.hits,
+                            last_used_at=func.greatest(model.last_used_at, values.c.last_used),
+                        )
+                        .execution_options(synchronize_session=False),
+                        {
+                            "ids": list(hits),
+                            "hits": list(hits.values()),
+                            "last_used": [last_used[entry_id] for entry_id in hits],
+                        },
+                    )
+                    await db.commit()
+            except Exception as e:
+                # Son estadísticas: no se reintentan
+                log_error(f"Error al escribir los aciertos de {model.__tablename__}: {str(e)}")
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+
+cache_hits = CacheHitRecorder(flush_interval=settings.CACHE_HITS_FLUSH_INTERVAL_SECONDS)
+
+
+class StructureCacheService:
+    """Servicio para la caché persistente de estructuras de mapas mentales generadas por IA."""
+
+    @staticmethod
+    async def get_structure(
+        db: AsyncSession, content_hash: str, prompt_version: str, model_name: str
+    ) -> dict | None:
+        """
+        Buscar una estructura previamente generada para el mismo contenido.
+
+        La clave incluye la versión del prompt y el modelo para que un cambio en
+        cualquiera de ellos invalide automáticamente las entradas anteriores.
+        """
+        result = await db.execute(
+            select(MindMapStructureCache).where(
+                MindMapStructureCache.content_hash == content_hash,
+                MindMapStructureCache.prompt_version == prompt_version,
+                MindMapStructureCache.model_name == model_name,
+            )
+        )
+        entry = result.scalar_one_or_none()
+
+        if not entry:
+            return None
+
+        cache_hits.record(MindMapStructureCache, entry.id)
+
+        return entry.structure
+
+    @staticmethod
+    async def store_structure(
+        db: AsyncSession,
+        content_hash: str,
+        prompt_version: str,
+        model_name: str,
+        structure: dict,
+    ) -> None:
+        """Guardar una estructura generada (ignora la escritura si otra subida ya la guardó)."""
+        statement = (
+            insert(MindMapStructureCache)
+            .values(
+                content_hash=content_hash,
+                prompt_version=prompt_version,
+                model_name=model_name,
+                structure=structure,
+                hit_count=0,
+                created_at=datetime.utcnow(),
+                last_used_at=datetime.utcnow(),
+            )
+            .on_conflict_do_nothing(constraint="uq_structure_cache_key")
+        )
+        await db.execute(statement)
+
+
+@dataclass(frozen=True)
+class EvaluationCacheKey:
+    """Clave de una evaluación: flashcard, contenido de la flashcard y respuesta normalizada."""
+
+    flashcard_id: UUID
+    content_fingerprint: str
+    answer_hash: str
+    prompt_version: str
+    model_name: str
+
+    @classmethod
+    def build(
+        cls,
+        flashcard_id: UUID,
+        question: str,
+        correct_answer: str,
+        user_answer: str,
+        prompt_version: str,
+        model_name: str,
+    ) -> "EvaluationCacheKey":
+        """Construir la clave; si cambia el texto de la flashcard, cambia la clave."""
+        return cls(
+            flashcard_id=flashcard_id,
+            content_fingerprint=text_fingerprint(question, correct_answer),
+            answer_hash=text_fingerprint(normalize_answer(user_answer)),
+            prompt_version=prompt_version,
+            model_name=model_name,
+        )
+
+
+class EvaluationCacheService:
+    """
+    Caché de evaluaciones de respuestas en dos niveles.
+
+    Un LRU en memoria acotado a max_entries delante de la tabla
+    flashcard_evaluation_cache. Las entradas caducan tras ttl_seconds en ambos niveles.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self._entries: OrderedDict[EvaluationCacheKey, tuple[dict, datetime]] = (
+            OrderedDict()
+        )
+        self.stats = {"memory_hits": 0, "db_hits": 0, "misses": 0}
+
+    async def get(self, db: AsyncSession, key: EvaluationCacheKey) -> dict | None:
+        """Buscar una evaluación en memoria y, si no está, en la base de datos."""
+        return (await self.get_many(db, [key])).get(key)
+
+    async def get_many(
+        self, db: AsyncSession, keys: list[EvaluationCacheKey]
+    ) -> dict[EvaluationCacheKey, dict]:
+        """
+        Buscar varias evaluaciones; las que no están en memoria se leen en una sola consulta.
+
+        Returns:
+            Dict de clave a evaluación, solo con las claves encontradas
+        """
+        now = datetime.utcnow()
+        found: dict[EvaluationCacheKey, dict] = {}
+        pending: set[EvaluationCacheKey] = set()
+
+        for key in keys:
+            entry = self._entries.get(key)
+            if entry:
+                evaluation, created_at = entry
+                if now - created_at < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.stats["memory_hits"] += 1
+                    found[key] = dict(evaluation)
+                    continue
+                del self._entries[key]
+            pending.add(key)
+
+        if not pending:
+            return found
+
+        # Filtro amplio por flashcard y respuesta; la clave completa se compara en Python
+        result = await db.execute(
+            select(FlashcardEvaluationCache).where(
+                FlashcardEvaluationCache.flashcard_id.in_(
+                    {key.flashcard_id for key in pending}
+                ),
+                FlashcardEvaluationCache.answer_hash.in_(
+                    {key.answer_hash for key in pending}
+                ),
+                FlashcardEvaluationCache.created_at > now - self.ttl,
+            )
+        )
+
+        for row in result.scalars():
+            key = EvaluationCacheKey(
+                flashcard_id=row.flashcard_id,
+                content_fingerprint=row.content_fingerprint,
+                answer_hash=row.answer_hash,
+                prompt_version=row.prompt_version,
+                model_name=row.model_name,
+            )
+            if key not in pending:
+                continue
+
+            cache_hits.record(FlashcardEvaluationCache, row.id)
+
+            evaluation = {
+                "quality": row.quality,
+                "feedback": row.feedback,
+                "quality_label": row.quality_label,
+            }
+            self._remember(key, evaluation, row.created_at)
+            self.stats["db_hits"] += 1
+            found[key] = dict(evaluation)
+            pending.discard(key)
+
+        self.stats["misses"] += len(pending)
+
+        return found
+
+    async def store(
+        self, db: AsyncSession, key: EvaluationCacheKey, evaluation: dict
+    ) -> None:
+        """Guardar una evaluación en ambos niveles (reemplaza una entrada caducada)."""
+        await self.store_many(db, {key: evaluation})
+
+    async def store_many(
+        self, db: AsyncSession, evaluations: dict[EvaluationCacheKey, dict]
+    ) -> None:
+        """Guardar varias evaluaciones con una sola sentencia INSERT."""
+        if not evaluations:
+            return
+
+        now = datetime.utcnow()
+        rows = []
+        for key, evaluation in evaluations.items():
+            values = {
+                "quality": evaluation["quality"],
+                "feedback": evaluation["feedback"],
+                "quality_label": evaluation["quality_label"],
+            }
+            rows.append(
+                {
+                    "flashcard_id": key.flashcard_id,
+                    "content_fingerprint": key.content_fingerprint,
+                    "answer_hash": key.answer_hash,
+                    "prompt_version": key.prompt_version,
+                    "model_name": key.model_name,
+                    "hit_count": 0,
+                    "created_at": now,
+                    "last_used_at": now,
+                    **values,
+                }
+            )
+            self._remember(key, values, now)
+
+        statement = insert(FlashcardEvaluationCache).values(rows)
+        statement = statement.on_conflict_do_update(
+            constraint="uq_evaluation_cache_key",
+            set_={
+                "quality": statement.excluded.quality,
+                "feedback": statement.excluded.feedback,
+                "quality_label": statement.excluded.quality_label,
+                "created_at": statement.excluded.created_at,
+                "last_used_at": statement.excluded.last_used_at,
+            },
+        )
+        await db.execute(statement)
+
+    def _remember(
+        self, key: EvaluationCacheKey, evaluation: dict, created_at: datetime
+    ) -> None:
+        self._entries[key] = (evaluation, created_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+evaluation_cache = EvaluationCacheService(
+    max_entries=settings.EVALUATION_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.EVALUATION_CACHE_TTL_SECONDS,
+)
@@ -1,53 +1,59 @@
+import base64
+import json
+from dataclasses import dataclass
+from typing import Any, AsyncIterator
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
-from uuid import UUID
-from datetime import datetime, date, timedelta
-from app.models.flashcard import Flashcard, FlashcardProgress
+from sqlalchemy import select, func, case, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from uuid import UUID, uuid4
+from datetime import datetime, date, timezone
+from app.config import settings
+from app.models.flashcard import Flashcard, FlashcardProgress, FlashcardReviewLog
 from app.models.mind_map import MindMap
 from app.services.ai_service import AIService
-from app.services.pdf_service import PDFService
+from app.services.cache_service import EvaluationCacheKey, evaluation_cache
+from app.services.local_grader import local_grader
+from app.services.schedulers import ReviewState, load_schedulers
+from app.services.stats_service import ProgressChange, reviewed_today_query, study_stats
+from app.utils.logger import log_warning
+from app.utils.sm2 import INITIAL_STATE, next_review_date
 
 
-class FlashcardService:
-    """Servicio para operaciones con flashcards y algoritmo SM-2."""
+@dataclass(slots=True)
+class FlashcardProgressView:
+    """
+    Progreso de una flashcard leído sin cargar entidades ORM.
 
-    def __init__(self):
-        self.ai_service = AIService()
+    id es None mientras la flashcard no se haya revisado nunca (progreso virtual).
+    """
 
-    async def generate_flashcards_for_mind_map(
-        self,
-        db: AsyncSession,
-        mind_map_id: UUID,
-        pdf_bytes: bytes | None = None,
-        num_cards: int = 10,
-    ) -> list[Flashcard]:
-        """
-        Generar flashcards para un mapa mental.
+    id: UUID | None
+    flashcard_id: UUID
+    flashcard: Any
+    easiness_factor: float
+    interval: int
+    repetitions: int
+    stability: float | None
+    difficulty: float | None
+    next_review_date: date
+    last_reviewed_at: datetime | None
 
-        Si no se proporciona pdf_bytes, se utilizarán las flashcards existentes o fallará.
-        """
-        # Comprueba si ya existen flashcards
-        result = await db.execute(
-            select(Flashcard).where(Flashcard.mind_map_id == mind_map_id)
-        )
-        existing_flashcards = list(result.scalars().all())
 
-        if existing_flashcards:
-            return existing_flashcards
+class _ConcurrentFirstReview(Exception):
+    """Otra solicitud creó a la vez el progreso de una flashcard nueva."""
 
-        # ¿Necesitas un PDF para generar tarjetas didácticas?
-        if not pdf_bytes:
-            return []
 
-        # Extraer texto
-        pdf_service = PDFService()
-        text, _ = await pdf_service.process_pdf(pdf_bytes)
+class FlashcardService:
+    """Servicio para operaciones con flashcards y repetición espaciada."""
 
-        # Generar flashcards usando IA
-        flashcard_data = await self.ai_service.generate_flashcards(text, num_cards)
+    def __init__(self, ai_service: AIService | None = None):
+        self.ai_service = ai_service or AIService()
 
-        # Crear flashcards
+    @staticmethod
+    def add_flashcards(
+        db: AsyncSession, mind_map_id: UUID, flashcard_data: list[dict]
+    ) -> list[Flashcard]:
+        """Añadir a la sesión las flashcards generadas (sin confirmar)."""
         flashcards = []
         for data in flashcard_data:
             flashcard = Flashcard(
@@ -58,8 +64,6 @@ class FlashcardService:
             db.add(flashcard)
             flashcards.append(flashcard)
 
-        await db.commit()
-
         return flashcards
 
     async def get_flashcards_for_mind_map(
@@ -82,179 +86,617 @@ class FlashcardService:
         )
         return result.scalar_one_or_none()
 
+    async def evaluate_answer(
+        self, db: AsyncSession, flashcard: Flashcard, user_answer: str
+    ) -> dict:
+        """
+        Evaluar la respuesta de un usuario a una flashcard.
+
+        Los casos claros los resuelve el calificador local sin llamar a la IA.
+        Las respuestas equivalentes (mismas palabras sin importar mayúsculas,
+        acentos, puntuación o espacios) reutilizan la evaluación en caché. Las
+        evaluaciones de respaldo (sin IA) no se guardan.
+
+        Returns:
+            Dict con: {"quality": int, "feedback": str, "quality_label": str}
+        """
+        evaluation = local_grader.grade(flashcard.answer, user_answer)
+        if evaluation:
+            return evaluation
+
+        key = self._evaluation_cache_key(flashcard, user_answer)
+
+        evaluation = await evaluation_cache.get(db, key)
+        if evaluation:
+            return evaluation
+
+        try:
+            evaluation = await self.ai_service.evaluate_flashcard_answer(
+                question=flashcard.question,
+                correct_answer=flashcard.answer,
+                user_answer=user_answer,
+                fallback=False,
+            )
+        except Exception as e:
+            log_warning(f"Evaluación con IA no disponible: {type(e).__name__} {e}")
+            return local_grader.estimate(flashcard.answer, user_answer)
+
+        await evaluation_cache.store(db, key, evaluation)
+        await db.commit()
+
+        return evaluation
+
+    async def stream_evaluation(
+        self, db: AsyncSession, flashcard: Flashcard, user_answer: str
+    ) -> AsyncIterator[tuple[str, dict]]:
+        """
+        Evaluar una respuesta emitiendo eventos a medida que el resultado está disponible.
+
+        Los casos resueltos por el calificador local o la caché se emiten de
+        inmediato; en el resto la calificación llega antes que la retroalimentación.
+
+        Yields:
+            Tuplas (evento, datos): ("score", {"quality", "quality_label"}),
+            ("feedback", {"text"}) por cada fragmento y ("done", evaluación completa)
+        """
+        evaluation = local_grader.grade(flashcard.answer, user_answer)
+
+        if evaluation is None:
+            key = self._evaluation_cache_key(flashcard, user_answer)
+            evaluation = await evaluation_cache.get(db, key)
+
+        if evaluation is None:
+            evaluation = {"quality": None, "quality_label": None, "feedback": ""}
+            try:
+                async for update in self.ai_service.stream_flashcard_evaluation(
+                    question=flashcard.question,
+                    correct_answer=flashcard.answer,
+                    user_answer=user_answer,
+                ):
+                    if "quality" in update:
+                        evaluation.update(update)
+                        yield "score", update
+                    else:
+                        evaluation["feedback"] += update["feedback"]
+                        yield "feedback", {"text": update["feedback"]}
+            except Exception as e:
+                log_warning(f"Evaluación con IA no disponible: {type(e).__name__} {e}")
+                if evaluation["quality"] is None:
+                    # Todavía no se emitió nada: usar la calificación local
+                    evaluation = local_grader.estimate(flashcard.answer, user_answer)
+                    yield "score", self._score(evaluation)
+                    yield "feedback", {"text": evaluation["feedback"]}
+                yield "done", evaluation
+                return
+
+            evaluation["feedback"] = evaluation["feedback"].strip()
+            await evaluation_cache.store(db, key, evaluation)
+            await db.commit()
+        else:
+            yield "score", self._score(evaluation)
+            yield "feedback", {"text": evaluation["feedback"]}
+
+        yield "done", evaluation
+
+    @staticmethod
+    def _score(evaluation: dict) -> dict:
+        return {
+            "quality": evaluation["quality"],
+            "quality_label": evaluation["quality_label"],
+        }
+
+    async def evaluate_answers(
+        self, db: AsyncSession, answers: list[tuple[UUID, str]]
+    ) -> list[dict]:
+        """
+        Evaluar varias respuestas (flashcard_id, user_answer) a la vez.
+
+        Las flashcards se cargan con una sola consulta y la caché se consulta en
+        bloque; solo las respuestas pendientes se envían a la IA, en lotes. Si la
+        IA no evalúa alguna respuesta se usa la calificación local para ella.
+
+        Returns:
+            Lista de dicts en el mismo orden: {"flashcard_id", "quality", "feedback", "quality_label"}
+
+        Raises:
+            ValueError: Si alguna flashcard no existe
+        """
+        flashcard_ids = {flashcard_id for flashcard_id, _ in answers}
+        result = await db.execute(
+            select(Flashcard).where(Flashcard.id.in_(flashcard_ids))
+        )
+        flashcards = {flashcard.id: flashcard for flashcard in result.scalars()}
+
+        missing = flashcard_ids - flashcards.keys()
+        if missing:
+            raise ValueError(
+                f"Flashcards no encontradas: {', '.join(str(id) for id in missing)}"
+            )
+
+        evaluations: list[dict | None] = [
+            local_grader.grade(flashcards[flashcard_id].answer, user_answer)
+            for flashcard_id, user_answer in answers
+        ]
+
+        pending = {
+            position: self._evaluation_cache_key(flashcards[flashcard_id], user_answer)
+            for position, (flashcard_id, user_answer) in enumerate(answers)
+            if evaluations[position] is None
+        }
+        cached = await evaluation_cache.get_many(db, list(pending.values()))
+
+        to_evaluate: dict[EvaluationCacheKey, list[int]] = {}
+        for position, key in pending.items():
+            if key in cached:
+                evaluations[position] = cached[key]
+            else:
+                # Respuestas equivalentes a la misma flashcard se evalúan una vez
+                to_evaluate.setdefault(key, []).append(position)
+
+        if to_evaluate:
+            items = []
+            for positions in to_evaluate.values():
+                flashcard_id, user_answer = answers[positions[0]]
+                flashcard = flashcards[flashcard_id]
+                items.append(
+                    {
+                        "question": flashcard.question,
+                        "correct_answer": flashcard.answer,
+                        "user_answer": user_answer,
+                    }
+                )
+
+            results = await self.ai_service.evaluate_flashcard_answers_batch(items)
+
+            fresh = {}
+            for (key, positions), evaluation in zip(to_evaluate.items(), results):
+                if evaluation is not None:
+                    fresh[key] = evaluation
+                for position in positions:
+                    if evaluation is None:
+                        flashcard_id, user_answer = answers[position]
+                        evaluation = local_grader.estimate(
+                            flashcards[flashcard_id].answer, user_answer
+                        )
+                    evaluations[position] = evaluation
+
+            if fresh:
+                await evaluation_cache.store_many(db, fresh)
+                await db.commit()
+
+        return [
+            {"flashcard_id": flashcard_id, **evaluation}
+            for (flashcard_id, _), evaluation in zip(answers, evaluations)
+        ]
+
+    def _evaluation_cache_key(
+        self, flashcard: Flashcard, user_answer: str
+    ) -> EvaluationCacheKey:
+        """Clave de caché de la evaluación para el prompt y modelo actuales."""
+        return EvaluationCacheKey.build(
+            flashcard_id=flashcard.id,
+            question=flashcard.question,
+            correct_answer=flashcard.answer,
+            user_answer=user_answer,
+            prompt_version=self.ai_service.EVALUATION_PROMPT_VERSION,
+            model_name=self.ai_service.model,
+        )
+
+    def _progress_view_query(self, user_id: UUID):
+        """
+        Consulta del progreso del usuario en sus flashcards (una fila por flashcard).
+
+        Las flashcards nunca revisadas no tienen fila en flashcard_progress: el LEFT
+        JOIN devuelve para ellas el progreso inicial (pendiente desde hoy).
+        """
+        return (
+            select(
+                Flashcard.id,
+                Flashcard.mind_map_id,
+                Flashcard.question,
+                Flashcard.answer,
+                Flashcard.created_at,
+                FlashcardProgress.id.label("progress_id"),
+                func.coalesce(
+                    FlashcardProgress.easiness_factor, INITIAL_STATE.easiness_factor
+                ).label("easiness_factor"),
+                func.coalesce(FlashcardProgress.interval, INITIAL_STATE.interval).label(
+                    "interval"
+                ),
+                func.coalesce(
+                    FlashcardProgress.repetitions, INITIAL_STATE.repetitions
+                ).label("repetitions"),
+                FlashcardProgress.stability,
+                FlashcardProgress.difficulty,
+                func.coalesce(FlashcardProgress.next_review_date, date.today()).label(
+                    "next_review_date"
+                ),
+                FlashcardProgress.last_reviewed_at,
+            )
+            .join(MindMap, Flashcard.mind_map_id == MindMap.id)
+            .outerjoin(
+                FlashcardProgress,
+                (FlashcardProgress.flashcard_id == Flashcard.id)
+                & (FlashcardProgress.user_id == user_id),
+            )
+            .where(MindMap.user_id == user_id)
+        )
+
+    @staticmethod
+    def _progress_view(row) -> FlashcardProgressView:
+        # La fila expone id, mind_map_id, question, answer y created_at de la flashcard
+        return FlashcardProgressView(
+            id=row.progress_id,
+            flashcard_id=row.id,
+            flashcard=row,
+            easiness_factor=row.easiness_factor,
+            interval=row.interval,
+            repetitions=row.repetitions,
+            stability=row.stability,
+            difficulty=row.difficulty,
+            next_review_date=row.next_review_date,
+            last_reviewed_at=row.last_reviewed_at,
+        )
+
     async def get_flashcard_progress(
         self, db: AsyncSession, user_id: UUID, flashcard_id: UUID
-    ) -> FlashcardProgress:
-        """Obtener o crear el progreso de la flashcard para un usuario."""
+    ) -> FlashcardProgressView | None:
+        """Obtener el progreso de una flashcard del usuario (None si no existe)."""
         result = await db.execute(
-            select(FlashcardProgress)
+            self._progress_view_query(user_id).where(Flashcard.id == flashcard_id)
+        )
+        row = result.one_or_none()
+        return self._progress_view(row) if row else None
+
+    async def review_flashcards(
+        self,
+        db: AsyncSession,
+        user_id: UUID,
+        reviews: list[tuple[UUID, int, datetime | None]],
+    ) -> tuple[list[FlashcardProgressView], int]:
+        """
+        Aplicar varias revisiones (flashcard_id, quality, reviewed_at) con el planificador del usuario.
+
+        El progreso actual se lee con una sola consulta, las revisiones se aplican en
+        memoria en orden cronológico (una flashcard puede repetirse) y el resultado se
+        guarda con un único upsert; cada revisión se añade además al registro
+        flashcard_reviews, del que el progreso es una proyección. Las revisiones no posteriores a la última ya
+        registrada de la flashcard se ignoran, de modo que reenviar una sesión
+        sincronizada sin conexión no la aplica dos veces.
+
+        Las filas de progreso existentes se bloquean antes de leerlas, de modo que
+        dos solicitudes concurrentes sobre la misma flashcard se aplican una tras
+        otra. Si otra solicitud crea a la vez el progreso de una flashcard nueva,
+        las revisiones se vuelven a aplicar sobre el suyo.
+
+        Returns:
+            El progreso final de cada flashcard (en orden de primera aparición) y
+            el número de revisiones ignoradas
+
+        Raises:
+            ValueError: Si alguna flashcard no existe o no pertenece al usuario
+        """
+        try:
+            async with db.begin_nested():
+                views, skipped = await self._apply_reviews(db, user_id, reviews)
+        except _ConcurrentFirstReview:
+            # Las filas creadas por la otra solicitud ya existen y se bloquean
+            async with db.begin_nested():
+                views, skipped = await self._apply_reviews(db, user_id, reviews)
+
+        if skipped < len(reviews):
+            await db.commit()
+        return views, skipped
+
+    async def _apply_reviews(
+        self,
+        db: AsyncSession,
+        user_id: UUID,
+        reviews: list[tuple[UUID, int, datetime | None]],
+    ) -> tuple[list[FlashcardProgressView], int]:
+        """Aplicar las revisiones sin confirmar (ver review_flashcards)."""
+        now = datetime.utcnow()
+        flashcard_ids = list(dict.fromkeys(flashcard_id for flashcard_id, _, _ in reviews))
+
+        # Bloquear el progreso existente (en orden, para no provocar interbloqueos)
+        await db.execute(
+            select(FlashcardProgress.id)
             .where(
                 FlashcardProgress.user_id == user_id,
-                FlashcardProgress.flashcard_id == flashcard_id,
+                FlashcardProgress.flashcard_id.in_(flashcard_ids),
             )
-            .options(selectinload(FlashcardProgress.flashcard))
+            .order_by(FlashcardProgress.flashcard_id)
+            .with_for_update()
         )
-        progress = result.scalar_one_or_none()
-
-        if not progress:
-            # Crear progreso inicial
-            progress = FlashcardProgress(
-                user_id=user_id,
-                flashcard_id=flashcard_id,
-                easiness_factor=2.5,
-                interval=0,
-                repetitions=0,
-                next_review_date=date.today(),
+        result = await db.execute(
+            self._progress_view_query(user_id).where(Flashcard.id.in_(flashcard_ids))
+        )
+        views = {row.id: self._progress_view(row) for row in result}
+
+        missing = set(flashcard_ids) - views.keys()
+        if missing:
+            raise ValueError(
+                f"Flashcards no encontradas: {', '.join(str(id) for id in missing)}"
             )
-            db.add(progress)
-            await db.commit()
-            await db.refresh(progress)
 
-            # Cargar flashcard
-            result = await db.execute(
-                select(FlashcardProgress)
-                .where(FlashcardProgress.id == progress.id)
-                .options(selectinload(FlashcardProgress.flashcard))
+        # Fechas en UTC sin zona horaria, como el resto de columnas; nunca en el futuro
+        timed_reviews = sorted(
+            (
+                min(
+                    reviewed_at.astimezone(timezone.utc).replace(tzinfo=None)
+                    if reviewed_at and reviewed_at.tzinfo
+                    else reviewed_at or now,
+                    now,
+                ),
+                position,
+                flashcard_id,
+                quality,
+            )
+            for position, (flashcard_id, quality, reviewed_at) in enumerate(reviews)
+        )
+
+        scheduler = (await load_schedulers(db, [user_id]))[user_id]
+
+        # Estado antes de las revisiones, para los contadores de study_stats
+        prior_schedules = {
+            id: (view.interval, view.next_review_date) if view.id else (None, None)
+            for id, view in views.items()
+        }
+        stored_reviewed_at = {id: view.last_reviewed_at for id, view in views.items()}
+        first_reviewed_at: dict[UUID, datetime] = {}
+        log_entries: list[dict] = []
+        skipped = 0
+        for reviewed_at, _, flashcard_id, quality in timed_reviews:
+            view = views[flashcard_id]
+            last_reviewed_at = stored_reviewed_at[flashcard_id]
+            if last_reviewed_at and reviewed_at <= last_reviewed_at:
+                skipped += 1
+                continue
+
+            prior = ReviewState(
+                view.easiness_factor,
+                view.interval,
+                view.repetitions,
+                view.stability,
+                view.difficulty,
+            )
+            elapsed_days = (
+                (reviewed_at.date() - view.last_reviewed_at.date()).days
+                if view.last_reviewed_at
+                else 0
+            )
+            state = scheduler.review(prior, quality, elapsed_days)
+            log_entries.append(
+                {
+                    "user_id": user_id,
+                    "flashcard_id": flashcard_id,
+                    "quality": quality,
+                    "reviewed_at": reviewed_at,
+                    "elapsed_days": elapsed_days,
+                    "prior_easiness_factor": prior.easiness_factor,
+                    "prior_interval": prior.interval,
+                    "prior_repetitions": prior.repetitions,
+                    "prior_stability": prior.stability,
+                    "prior_difficulty": prior.difficulty,
+                    "easiness_factor": state.easiness_factor,
+                    "interval": state.interval,
+                    "repetitions": state.repetitions,
+                    "stability": state.stability,
+                    "difficulty": state.difficulty,
+                    "created_at": now,
+                }
+            )
+            (
+                view.easiness_factor,
+                view.interval,
+                view.repetitions,
+                view.stability,
+                view.difficulty,
+            ) = state
+            view.next_review_date = next_review_date(state, reviewed_at.date())
+            view.last_reviewed_at = reviewed_at
+            first_reviewed_at.setdefault(flashcard_id, reviewed_at)
+
+        if first_reviewed_at:
+            statement = insert(FlashcardProgress).values(
+                [
+                    {
+                        "id": views[flashcard_id].id or uuid4(),
+                        "user_id": user_id,
+                        "flashcard_id": flashcard_id,
+                        "easiness_factor": views[flashcard_id].easiness_factor,
+                        "interval": views[flashcard_id].interval,
+                        "repetitions": views[flashcard_id].repetitions,
+                        "stability": views[flashcard_id].stability,
+                        "difficulty": views[flashcard_id].difficulty,
+                        "next_review_date": views[flashcard_id].next_review_date,
+                        "last_reviewed_at": views[flashcard_id].last_reviewed_at,
+                        # Para una flashcard nueva, la fila nace con su primera revisión
+                        "created_at": reviewed_at,
+                        "updated_at": now,
+                    }
+                    for flashcard_id, reviewed_at in first_reviewed_at.items()
+                ]
+            )
+            statement = statement.on_conflict_do_update(
+                constraint="uq_user_flashcard",
+                set_={
+                    "easiness_factor": statement.excluded.easiness_factor,
+                    "interval": statement.excluded.interval,
+                    "repetitions": statement.excluded.repetitions,
+                    "stability": statement.excluded.stability,
+                    "difficulty": statement.excluded.difficulty,
+                    "next_review_date": statement.excluded.next_review_date,
+                    "last_reviewed_at": statement.excluded.last_reviewed_at,
+                    "updated_at": statement.excluded.updated_at,
+                },
+                # Solo sobre la fila leída: si otra solicitud creó la de una flashcard
+                # nueva, su id no coincide y el estado calculado ya no es válido
+                where=FlashcardProgress.id == statement.excluded.id,
+            ).returning(FlashcardProgress.flashcard_id, FlashcardProgress.id)
+
+            written = {
+                flashcard_id: progress_id
+                for flashcard_id, progress_id in await db.execute(statement)
+            }
+            if len(written) < len(first_reviewed_at):
+                raise _ConcurrentFirstReview()
+            for flashcard_id, progress_id in written.items():
+                views[flashcard_id].id = progress_id
+            # En la misma transacción: el registro es la fuente del progreso
+            await db.execute(insert(FlashcardReviewLog), log_entries)
+            await study_stats.record_reviews(
+                db,
+                user_id,
+                [
+                    ProgressChange(
+                        views[flashcard_id].flashcard.mind_map_id,
+                        *prior_schedules[flashcard_id],
+                        views[flashcard_id].interval,
+                        views[flashcard_id].next_review_date,
+                    )
+                    for flashcard_id in first_reviewed_at
+                ],
             )
-            progress = result.scalar_one()
 
-        return progress
+        return [views[flashcard_id] for flashcard_id in flashcard_ids], skipped
 
     async def review_flashcard(
         self, db: AsyncSession, user_id: UUID, flashcard_id: UUID, quality: int
-    ) -> FlashcardProgress:
+    ) -> FlashcardProgressView:
         """
-        Actualizar el progreso de la flashcard usando el algoritmo SM-2.
+        Actualizar el progreso de la flashcard usando el planificador del usuario.
 
         Args:
             Calidad: 0-5 (0=apagón total, 5=respuesta perfecta)
         """
-        progress = await self.get_flashcard_progress(db, user_id, flashcard_id)
-
-        # Algoritmo SM-2
-        if quality >= 3:
-            # Respuesta correcta
-            if progress.repetitions == 0:
-                progress.interval = 1
-            elif progress.repetitions == 1:
-                progress.interval = 6
-            else:
-                progress.interval = int(progress.interval * progress.easiness_factor)
+        progress, _ = await self.review_flashcards(db, user_id, [(flashcard_id, quality, None)])
+        return progress[0]
 
-            progress.repetitions += 1
-        else:
-            # Respuesta incorrecta - reiniciar
-            progress.repetitions = 0
-            progress.interval = 1
-
-        # Actualizar el factor de facilidad
-        progress.easiness_factor = max(
-            1.3,
-            progress.easiness_factor
-            + (0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)),
-        )
-
-        # Establecer la próxima fecha de revisión
-        progress.next_review_date = date.today() + timedelta(days=progress.interval)
-        progress.last_reviewed_at = datetime.utcnow()
-
-        await db.commit()
-        await db.refresh(progress)
+    def _due_queue(self, user_id: UUID, mind_map_id: UUID | None = None):
+        """
+        Subconsulta de la cola de flashcards pendientes hoy, con los límites diarios.
 
-        return progress
+        Las flashcards nuevas (nunca revisadas) y las de repaso se numeran por
+        separado en el orden de la cola; solo se conservan las que caben en lo que
+        queda del límite diario de cada tipo tras las revisiones ya hechas hoy.
 
-    async def get_due_flashcards(
-        self, db: AsyncSession, user_id: UUID, mind_map_id: UUID | None = None
-    ) -> list[FlashcardProgress]:
-        """Obtener flashcards pendientes de revisión, incluidas las nunca revisadas."""
-        # Obtenga tarjetas didácticas que deben revisarse
-        query = (
-            select(FlashcardProgress)
-            .where(
-                FlashcardProgress.user_id == user_id,
-                FlashcardProgress.next_review_date <= date.today(),
-            )
-            .options(selectinload(FlashcardProgress.flashcard))
+        Los límites son del usuario, no de cada mapa mental: las revisiones de hoy
+        se cuentan en todos sus mapas también cuando la cola se filtra por
+        mind_map_id, así que estudiar mapa a mapa no da un cupo nuevo en cada uno.
+        """
+        today = date.today()
+        # Sin filtro por mapa mental: el cupo diario es común a todos los del usuario
+        reviewed_today = reviewed_today_query(user_id).cte("reviewed_today")
+
+        is_new = FlashcardProgress.id.is_(None)
+        next_review = func.coalesce(FlashcardProgress.next_review_date, today)
+        interval = func.coalesce(FlashcardProgress.interval, INITIAL_STATE.interval)
+        easiness_factor = func.coalesce(
+            FlashcardProgress.easiness_factor, INITIAL_STATE.easiness_factor
         )
 
+        ranked = self._progress_view_query(user_id).where(next_review <= today)
         if mind_map_id:
-            query = query.join(Flashcard).where(Flashcard.mind_map_id == mind_map_id)
-
-        result = await db.execute(query)
-        due_flashcards = list(result.scalars().all())
-
-        # Obtenga todas las flashcards para los mapas mentales
-        flashcard_query = select(Flashcard)
-        if mind_map_id:
-            flashcard_query = flashcard_query.where(
-                Flashcard.mind_map_id == mind_map_id
-            )
-        else:
-            # Obtener todas las flashcards para los mapas mentales del usuario
-            flashcard_query = flashcard_query.join(MindMap).where(
-                MindMap.user_id == user_id
+            ranked = ranked.where(Flashcard.mind_map_id == mind_map_id)
+        ranked = ranked.add_columns(
+            is_new.label("is_new"),
+            func.row_number()
+            .over(
+                partition_by=is_new,
+                order_by=(next_review, interval, easiness_factor, Flashcard.id),
             )
+            .label("rank"),
+        ).subquery("ranked")
+
+        remaining = case(
+            (
+                ranked.c.is_new,
+                settings.FLASHCARDS_NEW_PER_DAY
+                - select(reviewed_today.c.new).scalar_subquery(),
+            ),
+            else_=settings.FLASHCARDS_REVIEWS_PER_DAY
+            - select(reviewed_today.c.review).scalar_subquery(),
+        )
+        return select(ranked).where(ranked.c.rank <= remaining).subquery("due_queue")
 
-        flashcard_result = await db.execute(flashcard_query)
-        all_flashcards = list(flashcard_result.scalars().all())
+    @staticmethod
+    def _due_order(queue) -> tuple:
+        """
+        Clave de orden de la cola: fecha de revisión, intervalo y factor de facilidad.
 
-        # Obtener TODO el progreso existente para estas tarjetas didácticas (no solo las vencidas)
-        # para evitar la creación duplicada
-        all_progress_query = select(FlashcardProgress).where(
-            FlashcardProgress.user_id == user_id
+        A igual fecha, un intervalo más corto implica un retraso proporcionalmente
+        mayor. El id de la flashcard desempata para que la clave sea única.
+        """
+        return (
+            queue.c.next_review_date,
+            queue.c.interval,
+            queue.c.easiness_factor,
+            queue.c.id,
         )
-        if mind_map_id:
-            all_progress_query = all_progress_query.join(Flashcard).where(
-                Flashcard.mind_map_id == mind_map_id
+
+    @staticmethod
+    def _encode_due_cursor(row) -> str:
+        key = [row.next_review_date.isoformat(), row.interval, row.easiness_factor, str(row.id)]
+        return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+    @staticmethod
+    def _decode_due_cursor(cursor: str) -> tuple:
+        try:
+            next_review, interval, easiness_factor, flashcard_id = json.loads(
+                base64.urlsafe_b64decode(cursor)
             )
-        else:
-            all_progress_query = (
-                all_progress_query.join(Flashcard)
-                .join(MindMap)
-                .where(MindMap.user_id == user_id)
+            return (
+                date.fromisoformat(next_review),
+                int(interval),
+                float(easiness_factor),
+                UUID(flashcard_id),
             )
+        except (ValueError, TypeError) as e:
+            raise ValueError("Cursor no válido") from e
 
-        all_progress_result = await db.execute(all_progress_query)
-        all_existing_progress = list(all_progress_result.scalars().all())
+    async def get_due_flashcards(
+        self,
+        db: AsyncSession,
+        user_id: UUID,
+        mind_map_id: UUID | None = None,
+        limit: int = settings.FLASHCARDS_DUE_PAGE_SIZE,
+        cursor: str | None = None,
+    ) -> tuple[list[FlashcardProgressView], str | None]:
+        """
+        Obtener una página de la cola de flashcards pendientes, incluidas las nunca revisadas.
 
-        # Obtenga los ID de las flashcards que ya tienen CUALQUIER progreso (debido o no)
-        reviewed_flashcard_ids = {
-            progress.flashcard_id for progress in all_existing_progress
-        }
+        Args:
+            limit: Tamaño de la página
+            cursor: Cursor devuelto con la página anterior (keyset)
 
-        # Crear y guardar entradas de progreso para flashcards nunca revisadas
-        new_progress_list = []
-        for flashcard in all_flashcards:
-            if flashcard.id not in reviewed_flashcard_ids:
-                # Crear progreso inicial para esta flashcard
-                progress = FlashcardProgress(
-                    user_id=user_id,
-                    flashcard_id=flashcard.id,
-                    easiness_factor=2.5,
-                    interval=0,
-                    repetitions=0,
-                    next_review_date=date.today(),
-                )
-                db.add(progress)
-                new_progress_list.append(progress)
+        Returns:
+            Las flashcards de la página y el cursor de la siguiente (None si no hay más)
 
-        # Confirmar todos los nuevos registros de progreso a la vez
-        if new_progress_list:
-            await db.commit()
+        Raises:
+            ValueError: Si el cursor no es válido
+        """
+        queue = self._due_queue(user_id, mind_map_id)
+        order = self._due_order(queue)
 
-            # Recargar con relaciones de tarjetas didácticas
-            for progress in new_progress_list:
-                await db.refresh(progress)
+        query = select(queue).order_by(*order).limit(limit + 1)
+        if cursor:
+            query = query.where(tuple_(*order) > tuple_(*self._decode_due_cursor(cursor)))
 
-            # Cargar relación de tarjetas didácticas
-            new_progress_ids = [p.id for p in new_progress_list]
-            reload_query = (
-                select(FlashcardProgress)
-                .where(FlashcardProgress.id.in_(new_progress_ids))
-                .options(selectinload(FlashcardProgress.flashcard))
-            )
-            reload_result = await db.execute(reload_query)
-            reloaded_progress = list(reload_result.scalars().all())
-            due_flashcards.extend(reloaded_progress)
+        rows = (await db.execute(query)).all()
+        next_cursor = self._encode_due_cursor(rows[limit - 1]) if len(rows) > limit else None
+        return [self._progress_view(row) for row in rows[:limit]], next_cursor
 
-        return due_flashcards
+    async def count_due_flashcards(
+        self, db: AsyncSession, user_id: UUID, mind_map_id: UUID | None = None
+    ) -> dict:
+        """Contar las flashcards pendientes hoy (nuevas y de repaso) con los límites diarios."""
+        queue = self._due_queue(user_id, mind_map_id)
+        result = await db.execute(
+            select(
+                func.count().filter(queue.c.is_new).label("new"),
+                func.count().filter(~queue.c.is_new).label("review"),
+            )
+        )
+        counts = result.one()
+        return {"new": counts.new, "review": counts.review, "total": counts.new + counts.review}
@@ -0,0 +1,247 @@
+import asyncio
+from datetime import datetime
+from typing import NamedTuple, Sequence
+from uuid import UUID
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.flashcard import FlashcardReviewLog, FSRSParameters
+from app.utils.fsrs import (
+    AGAIN,
+    DECAY,
+    DEFAULT_PARAMETERS,
+    FACTOR,
+    PARAMETER_BOUNDS,
+    fsrs_review_arrays,
+)
+
+
+class TrainingSet(NamedTuple):
+    """Historial de revisiones de un usuario preparado para el ajuste."""
+
+    # Matrices (flashcards x revisiones), con las flashcards de más revisiones primero
+    grades: np.ndarray
+    elapsed_days: np.ndarray
+    # Flashcards con al menos k + 1 revisiones, para cada posición k
+    active: np.ndarray
+    # Revisiones que cuentan en la pérdida (no la primera ni las del mismo día)
+    scored: int
+
+
+def build_training_set(sequences: Sequence[Sequence[tuple[int, int]]]) -> TrainingSet:
+    """
+    Preparar las secuencias (quality, elapsed_days) de cada flashcard, desde que era nueva.
+    """
+    sequences = sorted(sequences, key=len, reverse=True)
+    lengths = np.array([len(sequence) for sequence in sequences])
+    grades = np.full((len(sequences), lengths.max(initial=0)), AGAIN, dtype=np.int64)
+    elapsed_days = np.zeros_like(grades)
+    for index, sequence in enumerate(sequences):
+        qualities, elapsed = zip(*sequence)
+        grades[index, : len(sequence)] = np.maximum(AGAIN, np.array(qualities) - 1)
+        elapsed_days[index, : len(sequence)] = elapsed
+
+    active = (lengths[:, None] > np.arange(grades.shape[1])).sum(axis=0)
+    scored = sum(
+        int((elapsed_days[:count, step] >= 1).sum())
+        for step, count in enumerate(active)
+        if step
+    )
+    return TrainingSet(grades, elapsed_days, active, scored)
+
+
+def log_loss(parameters: np.ndarray, data: TrainingSet) -> np.ndarray:
+    """
+    Pérdida logarítmica media de las predicciones de recuerdo de cada conjunto de parámetros.
+
+    Todos los conjuntos (filas de parameters) se evalúan a la vez: se reproducen
+    las revisiones posición a posición y, antes de cada una, la probabilidad de
+    recordar estimada se compara con el resultado real (fallo o no).
+    """
+    parameters = np.atleast_2d(parameters)
+    shape = (len(parameters), len(data.grades))
+    stability = np.full(shape, np.nan)
+    difficulty = np.full(shape, np.nan)
+    loss = np.zeros(len(parameters))
+
+    for step, count in enumerate(data.active):
+        grades = data.grades[:count, step]
+        elapsed_days = data.elapsed_days[:count, step]
+
+        if step:
+            # Las revisiones del mismo día no miden el olvido
+            scored = elapsed_days >= 1
+            recall = np.clip(
+                (1 + FACTOR * elapsed_days[scored] / stability[:, :count][:, scored]) ** DECAY,
+                1e-6,
+                1 - 1e-6,
+            )
+            loss -= np.where(
+                grades[scored] > AGAIN, np.log(recall), np.log1p(-recall)
+            ).sum(axis=1)
+
+        stability[:, :count], difficulty[:, :count] = fsrs_review_arrays(
+            stability[:, :count], difficulty[:, :count], grades, elapsed_days, parameters
+        )
+
+    return loss / max(data.scored, 1)
+
+
+def fit_parameters(
+    data: TrainingSet,
+    iterations: int,
+    initial: Sequence[float] = DEFAULT_PARAMETERS,
+    learning_rate: float = 0.05,
+) -> tuple[tuple[float, ...], float, float]:
+    """
+    Ajustar los parámetros FSRS minimizando la pérdida logarítmica (Adam).
+
+    El gradiente se estima por diferencias finitas evaluando en una sola pasada
+    vectorizada los parámetros actuales y uno desplazado por cada parámetro. Los
+    pasos se escalan con la magnitud de cada parámetro por defecto y los valores
+    se mantienen dentro de PARAMETER_BOUNDS.
+
+    Returns:
+        Los mejores parámetros encontrados, la pérdida con los iniciales y la pérdida final
+    """
+    lower, upper = np.array(PARAMETER_BOUNDS, dtype=np.float64).T
+    scale = np.maximum(np.abs(np.array(DEFAULT_PARAMETERS)), 0.1)
+    step = 1e-4 * scale
+    probes = np.vstack([np.zeros_like(scale), np.diag(step)])
+
+    weights = np.clip(np.array(initial, dtype=np.float64), lower, upper)
+    initial_loss = best_loss = float(log_loss(weights, data)[0])
+    best = weights
+    moment = np.zeros_like(weights)
+    velocity = np.zeros_like(weights)
+    beta1, beta2 = 0.9, 0.999
+
+    for iteration in range(1, iterations + 1):
+        losses = log_loss(weights + probes, data)
+        if losses[0] < best_loss:
+            best, best_loss = weights, float(losses[0])
+
+        gradient = (losses[1:] - losses[0]) / step * scale
+        moment = beta1 * moment + (1 - beta1) * gradient
+        velocity = beta2 * velocity + (1 - beta2) * gradient**2
+        update = (moment / (1 - beta1**iteration)) / (
+            np.sqrt(velocity / (1 - beta2**iteration)) + 1e-8
+        )
+        weights = np.clip(weights - learning_rate * update * scale, lower, upper)
+
+    final_loss = float(log_loss(weights, data)[0])
+    if final_loss < best_loss:
+        best, best_loss = weights, final_loss
+
+    return tuple(float(weight) for weight in best), initial_loss, best_loss
+
+
+async def load_training_set(db: AsyncSession, user_id: UUID) -> tuple[TrainingSet, int]:
+    """
+    Cargar el historial de revisiones de un usuario desde flashcard_reviews.
+
+    Solo se usan las flashcards cuyo historial registrado empieza cuando eran
+    nuevas (sin él no se conoce su estado de memoria inicial).
+
+    Returns:
+        El conjunto de entrenamiento y el número total de revisiones del usuario
+    """
+    result = await db.stream(
+        select(
+            FlashcardReviewLog.flashcard_id,
+            FlashcardReviewLog.quality,
+            FlashcardReviewLog.elapsed_days,
+            FlashcardReviewLog.prior_interval,
+        )
+        .where(FlashcardReviewLog.user_id == user_id)
+        .order_by(
+            FlashcardReviewLog.flashcard_id,
+            FlashcardReviewLog.reviewed_at,
+            FlashcardReviewLog.id,
+        )
+        .execution_options(yield_per=10000)
+    )
+
+    sequences: dict[UUID, list[tuple[int, int]] | None] = {}
+    review_count = 0
+    async for flashcard_id, quality, elapsed_days, prior_interval in result:
+        review_count += 1
+        if flashcard_id not in sequences:
+            # Las flashcards nuevas tienen intervalo 0 hasta su primera revisión
+            sequences[flashcard_id] = None if prior_interval else []
+        sequence = sequences[flashcard_id]
+        if sequence is not None:
+            sequence.append((quality, elapsed_days))
+
+    sequences_from_new = [sequence for sequence in sequences.values() if sequence]
+    return build_training_set(sequences_from_new), review_count
+
+
+async def optimize_user_parameters(
+    db: AsyncSession, user_id: UUID, iterations: int
+) -> FSRSParameters | None:
+    """
+    Ajustar y guardar los parámetros FSRS de un usuario.
+
+    El ajuste (CPU) se ejecuta en un hilo para no bloquear el event loop.
+
+    Returns:
+        Los parámetros guardados, o None si el historial no tiene revisiones útiles
+    """
+    data, review_count = await load_training_set(db, user_id)
+    if not data.scored:
+        return None
+
+    weights, default_loss, loss = await asyncio.to_thread(fit_parameters, data, iterations)
+
+    now = datetime.utcnow()
+    statement = insert(FSRSParameters).values(
+        user_id=user_id,
+        weights=list(weights),
+        review_count=review_count,
+        default_loss=default_loss,
+        loss=loss,
+        created_at=now,
+        updated_at=now,
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[FSRSParameters.user_id],
+        set_={
+            "weights": statement.excluded.weights,
+            "review_count": statement.excluded.review_count,
+            "default_loss": statement.excluded.default_loss,
+            "loss": statement.excluded.loss,
+            "updated_at": statement.excluded.updated_at,
+        },
+    ).returning(FSRSParameters)
+
+    parameters = (await db.execute(statement)).scalar_one()
+    await db.commit()
+    return parameters
+
+
+async def users_to_optimize(
+    db: AsyncSession, min_reviews: int, refit_growth: float
+) -> list[UUID]:
+    """
+    Usuarios con al menos min_reviews revisiones sin parámetros ajustados, o cuyo
+    número de revisiones ha crecido en refit_growth (p. ej. 0.2 = 20 %) desde el último ajuste.
+    """
+    review_count = func.count().label("review_count")
+    reviews = (
+        select(FlashcardReviewLog.user_id, review_count)
+        .group_by(FlashcardReviewLog.user_id)
+        .having(review_count >= min_reviews)
+        .subquery()
+    )
+    result = await db.execute(
+        select(reviews.c.user_id)
+        .outerjoin(FSRSParameters, FSRSParameters.user_id == reviews.c.user_id)
+        .where(
+            FSRSParameters.user_id.is_(None)
+            | (reviews.c.review_count >= FSRSParameters.review_count * (1 + refit_growth))
+        )
+        .order_by(reviews.c.user_id)
+    )
+    return list(result.scalars())
@@ -5,6 +5,7 @@ from uuid import UUID
 from datetime import datetime
 from app.models.game import GameSession
 from app.models.mind_map import MindMap, MindMapEdge
+from app.services.stats_service import study_stats
 from app.utils.graph_validator import GraphValidator
 
 
@@ -88,6 +89,9 @@ class GameService:
         game_session.completed = True
         game_session.time_elapsed_seconds = time_elapsed_seconds
         game_session.completed_at = datetime.utcnow()
+        await study_stats.record_game(
+            db, user_id, game_session.mind_map_id, score, time_elapsed_seconds
+        )
 
         await db.commit()
         await db.refresh(game_session)
@@ -0,0 +1,353 @@
+import asyncio
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Awaitable, Callable
+from uuid import UUID
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.job import BackgroundJob
+from app.utils.logger import setup_logger
+
+logger = setup_logger("mapit")
+
+
+class JobStatus:
+    """Estados posibles de un trabajo en segundo plano."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+    FINISHED = (COMPLETED, FAILED)
+
+
+@dataclass
+class Job:
+    """Trabajo en segundo plano con su estado y etapa actual."""
+
+    job_type: str
+    user_id: UUID
+    payload: dict = field(default_factory=dict, repr=False)
+    id: UUID = field(default_factory=uuid.uuid4)
+    status: str = JobStatus.QUEUED
+    stage: str = JobStatus.QUEUED
+    result: dict | None = None
+    error: str | None = None
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    updated_at: datetime = field(default_factory=datetime.utcnow)
+
+
+# Un handler recibe el trabajo y una función para informar la etapa actual,
+# y devuelve el resultado que se expone al cliente
+StageReporter = Callable[[str], Awaitable[None]]
+JobHandler = Callable[[Job, StageReporter], Awaitable[dict]]
+# Liberar los recursos de la carga útil (p. ej. archivos temporales), se ejecute
+# o no el trabajo
+JobCleanup = Callable[[Job], None]
+
+
+class LocalJobBackend:
+    """
+    Backend de trabajos en proceso (memoria + asyncio.Queue), sin servicios externos.
+
+    El estado solo existe en el proceso que ejecuta el trabajo: con varios workers
+    de uvicorn o tras un reinicio, consultar el trabajo devuelve 404.
+    """
+
+    def __init__(self):
+        self._jobs: dict[UUID, Job] = {}
+        self._queue: asyncio.Queue[UUID] = asyncio.Queue()
+        self._subscribers: dict[UUID, set[asyncio.Queue]] = {}
+
+    async def save(self, job: Job) -> None:
+        """Guardar el trabajo y notificar a los suscriptores."""
+        self._jobs[job.id] = job
+        for subscriber in self._subscribers.get(job.id, set()):
+            subscriber.put_nowait(job)
+
+    async def get(self, job_id: UUID) -> Job | None:
+        """Obtener un trabajo por ID."""
+        return self._jobs.get(job_id)
+
+    async def enqueue(self, job_id: UUID) -> None:
+        """Encolar un trabajo para los workers."""
+        await self._queue.put(job_id)
+
+    async def dequeue(self) -> UUID:
+        """Esperar el siguiente trabajo disponible."""
+        return await self._queue.get()
+
+    def subscribe(self, job_id: UUID) -> asyncio.Queue:
+        """Registrar un suscriptor para las actualizaciones de un trabajo."""
+        subscriber: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(job_id, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, job_id: UUID, subscriber: asyncio.Queue) -> None:
+        """Eliminar un suscriptor."""
+        subscribers = self._subscribers.get(job_id)
+        if subscribers:
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self._subscribers[job_id]
+
+    async def purge_finished(self, older_than: datetime) -> None:
+        """Eliminar trabajos terminados antes de la fecha indicada."""
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.status in JobStatus.FINISHED and job.updated_at < older_than
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def queued_jobs(self) -> list[Job]:
+        """Trabajos de este proceso que aún no ha empezado ningún worker."""
+        return [job for job in self._jobs.values() if job.status == JobStatus.QUEUED]
+
+
+class DatabaseJobBackend(LocalJobBackend):
+    """
+    Backend de trabajos con el estado guardado en la tabla background_jobs.
+
+    La cola y la carga útil siguen en el proceso que recibió el trabajo, pero su
+    estado se puede consultar desde cualquier worker de uvicorn y tras un reinicio.
+    Un trabajo sin terminar que no se actualiza en JOB_STALE_AFTER_SECONDS se da
+    por interrumpido (su proceso terminó de forma abrupta).
+    """
+
+    async def save(self, job: Job) -> None:
+        await super().save(job)
+        values = {
+            "id": job.id,
+            "job_type": job.job_type,
+            "user_id": job.user_id,
+            "status": job.status,
+            "stage": job.stage,
+            "result": job.result,
+            "error": job.error,
+            "created_at": job.created_at,
+            "updated_at": job.updated_at,
+        }
+        statement = insert(BackgroundJob).values(values)
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                statement.on_conflict_do_update(
+                    index_elements=[BackgroundJob.id],
+                    set_={
+                        column: statement.excluded[column]
+                        for column in ("status", "stage", "result", "error", "updated_at")
+                    },
+                )
+            )
+            await db.commit()
+
+    async def get(self, job_id: UUID) -> Job | None:
+        job = await super().get(job_id)
+        if job:
+            return job
+
+        async with AsyncSessionLocal() as db:
+            row = await db.get(BackgroundJob, job_id)
+        if not row:
+            return None
+
+        job = Job(
+            job_type=row.job_type,
+            user_id=row.user_id,
+            id=row.id,
+            status=row.status,
+            stage=row.stage,
+            result=row.result,
+            error=row.error,
+            created_at=row.created_at,
+            updated_at=row.updated_at,
+        )
+        stale_before = datetime.utcnow() - timedelta(seconds=settings.JOB_STALE_AFTER_SECONDS)
+        if job.status not in JobStatus.FINISHED and job.updated_at < stale_before:
+            job.status = JobStatus.FAILED
+            job.error = "Trabajo interrumpido por el servidor"
+        return job
+
+    async def purge_finished(self, older_than: datetime) -> None:
+        await super().purge_finished(older_than)
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                delete(BackgroundJob).where(
+                    BackgroundJob.status.in_(JobStatus.FINISHED),
+                    BackgroundJob.updated_at < older_than,
+                )
+            )
+            await db.commit()
+
+
+class JobService:
+    """Cola de trabajos con un pool de workers asíncronos."""
+
+    def __init__(self, backend: LocalJobBackend | None = None, num_workers: int = 2):
+        self.backend = backend or LocalJobBackend()
+        self.num_workers = num_workers
+        self._handlers: dict[str, JobHandler] = {}
+        self._cleanups: dict[str, JobCleanup] = {}
+        self._workers: list[asyncio.Task] = []
+
+    def register_handler(
+        self, job_type: str, handler: JobHandler, cleanup: JobCleanup | None = None
+    ) -> None:
+        """
+        Registrar el handler que procesa un tipo de trabajo.
+
+        cleanup se llama una vez por trabajo al terminar, también si se cancela
+        antes de empezar o falla al marcarlo en curso.
+        """
+        self._handlers[job_type] = handler
+        if cleanup:
+            self._cleanups[job_type] = cleanup
+
+    async def start(self) -> None:
+        """Iniciar los workers."""
+        if self._workers:
+            return
+        self._workers = [
+            asyncio.create_task(self._worker(index)) for index in range(self.num_workers)
+        ]
+
+    async def stop(self) -> None:
+        """Detener los workers (los trabajos en curso y los encolados se cancelan)."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        for job in self.backend.queued_jobs():
+            try:
+                await self._update(
+                    job, status=JobStatus.FAILED, error="Trabajo cancelado por el servidor"
+                )
+            except Exception as e:
+                logger.error(f"No se pudo cancelar el trabajo {job.id}: {str(e)}")
+            self._release(job)
+
+    async def submit(self, job_type: str, user_id: UUID, payload: dict) -> Job:
+        """Crear y encolar un trabajo."""
+        if job_type not in self._handlers:
+            raise ValueError(f"Tipo de trabajo desconocido: {job_type}")
+
+        await self.backend.purge_finished(
+            datetime.utcnow() - timedelta(seconds=settings.JOB_RESULT_TTL_SECONDS)
+        )
+
+        job = Job(job_type=job_type, user_id=user_id, payload=payload)
+        await self.backend.save(job)
+        await self.backend.enqueue(job.id)
+
+        return job
+
+    async def get_job(self, job_id: UUID, user_id: UUID) -> Job | None:
+        """Obtener un trabajo con verificación de autorización."""
+        job = await self.backend.get(job_id)
+        if not job or job.user_id != user_id:
+            return None
+        return job
+
+    async def watch(self, job: Job) -> AsyncIterator[Job]:
+        """
+        Emitir el estado del trabajo en cada cambio hasta que termine.
+
+        Los cambios de los trabajos de este proceso llegan al instante; los de
+        otros procesos se leen del backend cada JOB_WATCH_POLL_INTERVAL_SECONDS.
+        """
+        subscriber = self.backend.subscribe(job.id)
+        try:
+            current = await self.backend.get(job.id) or job
+            yield current
+            while current.status not in JobStatus.FINISHED:
+                try:
+                    update = await asyncio.wait_for(
+                        subscriber.get(), timeout=settings.JOB_WATCH_POLL_INTERVAL_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    update = await self.backend.get(job.id)
+                    if not update or (update.status, update.stage, update.updated_at) == (
+                        current.status,
+                        current.stage,
+                        current.updated_at,
+                    ):
+                        continue
+                current = update
+                yield current
+        finally:
+            self.backend.unsubscribe(job.id, subscriber)
+
+    async def _update(self, job: Job, **changes) -> None:
+        for key, value in changes.items():
+            setattr(job, key, value)
+        job.updated_at = datetime.utcnow()
+        await self.backend.save(job)
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            job_id = await self.backend.dequeue()
+            # Un fallo del backend (p. ej. la base de datos) no debe detener el worker
+            try:
+                job = await self.backend.get(job_id)
+                if job:
+                    await self._run(job)
+            except Exception as e:
+                logger.error(f"Error en el worker {index} con el trabajo {job_id}: {str(e)}")
+
+    async def _run(self, job: Job) -> None:
+        handler = self._handlers[job.job_type]
+
+        async def report_stage(stage: str) -> None:
+            await self._update(job, stage=stage)
+
+        try:
+            await self._update(job, status=JobStatus.RUNNING)
+            result = await handler(job, report_stage)
+            await self._update(
+                job, status=JobStatus.COMPLETED, stage=JobStatus.COMPLETED, result=result
+            )
+        except asyncio.CancelledError:
+            await self._update(
+                job, status=JobStatus.FAILED, error="Trabajo cancelado por el servidor"
+            )
+            raise
+        except ValueError as e:
+            # Errores esperados (p. ej. PDF sin texto extraíble)
+            await self._update(job, status=JobStatus.FAILED, error=str(e))
+        except Exception as e:
+            logger.error(f"Error en el trabajo {job.id} ({job.job_type}): {str(e)}")
+            await self._update(
+                job, status=JobStatus.FAILED, error=f"Error procesando el trabajo: {str(e)}"
+            )
+        finally:
+            self._release(job)
+
+    def _release(self, job: Job) -> None:
+        """Liberar la carga útil del trabajo (p. ej. el PDF), que ya no es necesaria."""
+        cleanup = self._cleanups.get(job.job_type)
+        if cleanup and job.payload:
+            try:
+                cleanup(job)
+            except Exception as e:
+                logger.error(f"Error liberando el trabajo {job.id}: {str(e)}")
+        job.payload = {}
+
+
+def create_job_backend() -> LocalJobBackend:
+    """Crear el backend de trabajos configurado."""
+    if settings.JOB_BACKEND == "database":
+        return DatabaseJobBackend()
+    if settings.JOB_BACKEND == "local":
+        return LocalJobBackend()
+    raise ValueError(f"Backend de trabajos no soportado: {settings.JOB_BACKEND}")
+
+
+job_service = JobService(
+    backend=create_job_backend(), num_workers=settings.JOB_WORKERS
+)
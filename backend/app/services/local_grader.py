@@ -0,0 +1,317 @@
+import math
+from collections import Counter
+from app.config import settings
+from app.utils.text import normalize_answer
+
+
+# Palabras vacías que no aportan al comparar definiciones cortas
+STOPWORDS = frozenset(
+    "a al como con de del el en es la las lo los o para por que se su sus un una y".split()
+)
+
+
+# Palabras que invierten el sentido: nunca se ignoran ni se toleran como errores
+NEGATIONS = frozenset("no ni nunca jamas tampoco sin".split())
+
+
+def _edit_distance(correct: str, user: str) -> int:
+    """Distancia de edición entre dos cadenas (Levenshtein con trasposiciones adyacentes)."""
+    before_previous: list[int] = []
+    previous = list(range(len(user) + 1))
+    for i, correct_char in enumerate(correct, start=1):
+        current = [i]
+        for j, user_char in enumerate(user, start=1):
+            distance = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (correct_char != user_char),
+            )
+            # "mitocondira" por "mitocondria" es un solo error
+            if (
+                i > 1
+                and j > 1
+                and correct_char == user[j - 2]
+                and correct[i - 2] == user_char
+            ):
+                distance = min(distance, before_previous[j - 2] + 1)
+            current.append(distance)
+        before_previous, previous = previous, current
+    return previous[-1]
+
+
+# Confusiones ortográficas habituales: única sustitución tolerada como errata
+CONFUSABLE_LETTERS = frozenset(
+    frozenset(pair) for pair in ("bv", "iy", "sz", "cs", "cz", "gj", "ck", "qk", "xs")
+)
+
+# Longitud mínima de una palabra para tolerar una letra de más, de menos o confundida
+TYPO_MIN_LENGTH = 6
+
+
+def _is_typo(correct: str, user: str) -> bool:
+    """
+    Indicar si una palabra solo difiere de la correcta por una errata.
+
+    Se toleran dos letras contiguas intercambiadas y, en palabras largas, una
+    letra de más o de menos o una confusión ortográfica ("b"/"v"). Nunca en
+    palabras cortas, negaciones ni números: "1945"/"1946", "bajo"/"baja" o
+    "absorción"/"adsorción" cambian el sentido.
+    """
+    if correct == user:
+        return True
+    if (
+        len(correct) <= 3
+        or correct in NEGATIONS
+        or any(char.isdigit() for char in correct + user)
+    ):
+        return False
+
+    if len(correct) == len(user):
+        differences = [
+            i for i, (correct_char, user_char) in enumerate(zip(correct, user))
+            if correct_char != user_char
+        ]
+        # "mitocondira" por "mitocondria"
+        if len(differences) == 2:
+            first, second = differences
+            return (
+                second == first + 1
+                and correct[first] == user[second]
+                and correct[second] == user[first]
+            )
+        return (
+            len(correct) >= TYPO_MIN_LENGTH
+            and len(differences) == 1
+            and frozenset((correct[differences[0]], user[differences[0]])) in CONFUSABLE_LETTERS
+        )
+
+    return len(correct) >= TYPO_MIN_LENGTH and _edit_distance(correct, user) == 1
+
+
+def typo_match(correct: str, user: str) -> bool:
+    """
+    Indicar si la respuesta solo difiere de la correcta en errores de escritura.
+
+    Las palabras (sin palabras vacías) se comparan una a una y en orden: cada
+    una admite como mucho una errata y ninguna puede sobrar ni faltar. Así un
+    cambio de sentido ("no produce", "ARN"/"ADN", "hipotónica"/"hipertónica")
+    no pasa por una errata.
+    """
+    correct_tokens = correct.split()
+    user_tokens = user.split()
+
+    # Si solo hay palabras vacías, compararlas igualmente
+    if set(correct_tokens) - STOPWORDS:
+        correct_tokens = [token for token in correct_tokens if token not in STOPWORDS]
+        user_tokens = [token for token in user_tokens if token not in STOPWORDS]
+
+    if len(correct_tokens) != len(user_tokens):
+        return False
+    return all(
+        _is_typo(correct_token, user_token)
+        for correct_token, user_token in zip(correct_tokens, user_tokens)
+    )
+
+
+def token_overlap(correct: str, user: str) -> float:
+    """Coeficiente de Dice entre los conjuntos de palabras (sin palabras vacías)."""
+    correct_tokens = set(correct.split())
+    user_tokens = set(user.split())
+
+    # Si solo hay palabras vacías, compararlas igualmente
+    if correct_tokens - STOPWORDS:
+        correct_tokens -= STOPWORDS
+        user_tokens -= STOPWORDS
+
+    if not correct_tokens or not user_tokens:
+        return 0.0
+    return 2 * len(correct_tokens & user_tokens) / (len(correct_tokens) + len(user_tokens))
+
+
+def edit_similarity(correct: str, user: str) -> float:
+    """Similitud por distancia de Levenshtein normalizada (1 = idénticos)."""
+    if not correct and not user:
+        return 1.0
+    return 1 - _edit_distance(correct, user) / max(len(correct), len(user))
+
+
+def _char_ngrams(text: str, n: int) -> Counter:
+    padded = f" {text} "
+    return Counter(padded[i : i + n] for i in range(len(padded) - n + 1))
+
+
+def ngram_similarity(correct: str, user: str, n: int = 3) -> float:
+    """
+    Similitud coseno entre n-gramas de caracteres con ponderación TF-IDF.
+
+    El IDF se calcula sobre las dos respuestas: los n-gramas que solo aparecen en
+    una de ellas pesan más que los compartidos, lo que penaliza las diferencias.
+    """
+    correct_grams = _char_ngrams(correct, n)
+    user_grams = _char_ngrams(user, n)
+    if not correct_grams or not user_grams:
+        return 0.0
+
+    def weight(gram: str, count: int) -> float:
+        document_frequency = (gram in correct_grams) + (gram in user_grams)
+        idf = math.log(3 / (1 + document_frequency)) + 1
+        return (1 + math.log(count)) * idf
+
+    correct_vector = {gram: weight(gram, count) for gram, count in correct_grams.items()}
+    user_vector = {gram: weight(gram, count) for gram, count in user_grams.items()}
+
+    dot = sum(
+        value * user_vector[gram]
+        for gram, value in correct_vector.items()
+        if gram in user_vector
+    )
+    norm = math.sqrt(sum(v * v for v in correct_vector.values())) * math.sqrt(
+        sum(v * v for v in user_vector.values())
+    )
+    return dot / norm if norm else 0.0
+
+
+class LocalGrader:
+    """
+    Calificador local de respuestas, sin IA.
+
+    Resuelve los casos claros (respuesta exacta, con solo errores de escritura
+    u obviamente incorrecta) y deja los dudosos para Gemini. La similitud global
+    nunca basta para aceptar: una negación o una palabra cambiada apenas la
+    reduce y cambia el sentido.
+    """
+
+    def __init__(
+        self,
+        accept_threshold: float,
+        reject_threshold: float,
+        max_edit_chars: int,
+        enabled: bool = True,
+    ):
+        self.accept_threshold = accept_threshold
+        self.reject_threshold = reject_threshold
+        self.max_edit_chars = max_edit_chars
+        self.enabled = enabled
+        self.stats = {"accepted": 0, "rejected": 0, "escalated": 0}
+
+    def _scores(self, correct_answer: str, user_answer: str) -> tuple[float, float]:
+        """
+        Similitudes entre 0 y 1 de dos respuestas ya normalizadas.
+
+        Returns:
+            Tuple de (léxica, edición): la léxica es la media del solapamiento de
+            palabras y de n-gramas (tolera el orden); la de edición tolera errores
+            de escritura
+        """
+        if correct_answer == user_answer:
+            return 1.0, 1.0
+
+        lexical = (
+            token_overlap(correct_answer, user_answer)
+            + ngram_similarity(correct_answer, user_answer)
+        ) / 2
+
+        # La distancia de edición es cuadrática: solo para respuestas cortas
+        if max(len(correct_answer), len(user_answer)) > self.max_edit_chars:
+            return lexical, 0.0
+        return lexical, edit_similarity(correct_answer, user_answer)
+
+    def grade(self, correct_answer: str, user_answer: str) -> dict | None:
+        """
+        Calificar la respuesta si el caso es claro.
+
+        Returns:
+            Dict con: {"quality": int, "feedback": str, "quality_label": str},
+            o None si la respuesta está en la franja dudosa y debe evaluarla la IA
+        """
+        if not self.enabled:
+            return None
+
+        correct = normalize_answer(correct_answer)
+        user = normalize_answer(user_answer)
+
+        if not user:
+            self.stats["rejected"] += 1
+            return {
+                "quality": 0,
+                "feedback": f"Sin respuesta. La respuesta correcta es: {correct_answer}",
+                "quality_label": "No recuerdo",
+            }
+
+        if correct == user:
+            self.stats["accepted"] += 1
+            return {
+                "quality": 5,
+                "feedback": "Respuesta exactamente correcta",
+                "quality_label": "Perfecto",
+            }
+
+        if typo_match(correct, user):
+            self.stats["accepted"] += 1
+            return {
+                "quality": 4,
+                "feedback": f"Respuesta correcta. Forma exacta: {correct_answer}",
+                "quality_label": "Bien",
+            }
+
+        lexical, edit = self._scores(correct, user)
+
+        # Dos cadenas cualquiera comparten algunos caracteres: la distancia de edición
+        # solo descarta el rechazo cuando sugiere un error de escritura
+        if lexical <= self.reject_threshold and edit < 0.5:
+            self.stats["rejected"] += 1
+            return {
+                "quality": 1,
+                "feedback": f"Respuesta incorrecta. La respuesta correcta es: {correct_answer}",
+                "quality_label": "Mal",
+            }
+
+        self.stats["escalated"] += 1
+        return None
+
+    def estimate(self, correct_answer: str, user_answer: str) -> dict:
+        """Calificación aproximada por similitud, para cuando la IA no está disponible."""
+        correct = normalize_answer(correct_answer)
+        user = normalize_answer(user_answer)
+
+        if not user:
+            return {
+                "quality": 0,
+                "feedback": "Sin respuesta. Repasa el concepto.",
+                "quality_label": "No recuerdo",
+            }
+
+        lexical, edit = self._scores(correct, user)
+        similarity = max(lexical, edit) if edit >= 0.5 else lexical
+
+        if similarity >= self.accept_threshold:
+            return {
+                "quality": 5 if similarity == 1 else 4,
+                "feedback": "Respuesta correcta",
+                "quality_label": "Perfecto" if similarity == 1 else "Bien",
+            }
+        if similarity >= 0.6:
+            return {
+                "quality": 3,
+                "feedback": "Respuesta parcialmente correcta. Revisa los detalles.",
+                "quality_label": "Correcto",
+            }
+        if similarity >= 0.35:
+            return {
+                "quality": 2,
+                "feedback": "Falta información importante. Repasa el concepto.",
+                "quality_label": "Difícil",
+            }
+        return {
+            "quality": 1,
+            "feedback": "Respuesta incorrecta. Repasa el concepto.",
+            "quality_label": "Mal",
+        }
+
+
+local_grader = LocalGrader(
+    accept_threshold=settings.GRADER_ACCEPT_THRESHOLD,
+    reject_threshold=settings.GRADER_REJECT_THRESHOLD,
+    max_edit_chars=settings.GRADER_MAX_EDIT_CHARS,
+    enabled=settings.GRADER_ENABLED,
+)
@@ -0,0 +1,40 @@
+from app.database import AsyncSessionLocal
+from app.services.job_service import Job, StageReporter
+from app.services.mind_map_service import MindMapService
+from app.services.pdf_service import remove_spooled_file
+
+
+MIND_MAP_CREATION_JOB = "mind_map_creation"
+
+
+async def run_mind_map_creation_job(job: Job, report_stage: StageReporter) -> dict:
+    """
+    Procesar un PDF subido: generar el mapa mental y sus flashcards.
+
+    El trabajo usa su propia sesión de base de datos, independiente de la solicitud HTTP.
+    Las etapas se informan a través de report_stage (extracting_text,
+    generating_content, saving).
+
+    Returns:
+        Dict con el ID del mapa mental creado
+    """
+    payload = job.payload
+
+    async with AsyncSessionLocal() as db:
+        mind_map_service = MindMapService()
+        mind_map = await mind_map_service.create_mind_map_with_flashcards(
+            db=db,
+            user_id=job.user_id,
+            pdf_path=payload["pdf_path"],
+            filename=payload["filename"],
+            title=payload.get("title"),
+            content_hash=payload.get("content_hash"),
+            on_stage=report_stage,
+        )
+
+    return {"mind_map_id": str(mind_map.id)}
+
+
+def cleanup_mind_map_creation_job(job: Job) -> None:
+    """Eliminar el archivo temporal de la subida, se haya procesado o no."""
+    remove_spooled_file(job.payload["pdf_path"])
@@ -1,63 +1,168 @@
+import asyncio
+from typing import Awaitable, Callable
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 from uuid import UUID
+from app.config import settings
 from app.models.mind_map import MindMap, MindMapNode, MindMapEdge
 from app.services.pdf_service import PDFService
 from app.services.ai_service import AIService
+from app.services.cache_service import StructureCacheService
+from app.services.flashcard_service import FlashcardService
+from app.services.stats_service import study_stats
+from app.utils.logger import log_warning
 
 
 class MindMapService:
     """Servicio para operaciones de mapas mentales."""
 
-    def __init__(self):
+    def __init__(self, ai_service: AIService | None = None):
         self.pdf_service = PDFService()
-        self.ai_service = AIService()
+        self.ai_service = ai_service or AIService()
 
-    async def create_mind_map_from_pdf(
+    async def create_mind_map_with_flashcards(
         self,
         db: AsyncSession,
         user_id: UUID,
-        pdf_bytes: bytes,
+        pdf_path: str,
         filename: str,
         title: str | None = None,
+        content_hash: str | None = None,
+        num_cards: int = 10,
+        on_stage: Callable[[str], Awaitable[None]] | None = None,
     ) -> MindMap:
         """
-        Crear mapa mental a partir de PDF.
+        Crear mapa mental y flashcards a partir de PDF en una sola pasada.
+
+        El texto se extrae una sola vez y las dos llamadas a la IA se ejecutan en
+        paralelo, sin ninguna transacción abierta; ambos resultados se guardan en
+        la misma transacción.
 
         Args:
             db: Sesión de base de datos
             user_id: ID de usuario
-            pdf_bytes: Contenido del archivo PDF
+            pdf_path: Ruta del archivo PDF
             filename: Nombre del archivo original
             title: Título personalizado opcional
+            content_hash: Hash calculado durante la subida (opcional)
+            num_cards: Número de flashcards a generar
+            on_stage: Callback opcional para informar la etapa actual
 
         Returns:
-            Crear un mapa mental con nodos y aristas
+            Mapa mental creado con nodos y aristas
         """
-        # Extraer texto y calcular hash
-        text, content_hash = await self.pdf_service.process_pdf(pdf_bytes)
 
-        # Generar estructura de mapa mental usando IA
-        structure = await self.ai_service.generate_mind_map_structure(text, title)
+        async def report(stage: str) -> None:
+            if on_stage:
+                await on_stage(stage)
+
+        await report("extracting_text")
+        text, content_hash = await self.pdf_service.process_pdf(
+            pdf_path, content_hash
+        )
+
+        structure = await self._get_cached_structure(db, content_hash)
+        # Liberar la conexión mientras se espera a la IA: la transacción de
+        # escritura empieza cuando ya están los dos resultados
+        await db.commit()
+
+        await report("generating_content")
+        flashcards_task = asyncio.wait_for(
+            self.ai_service.generate_flashcards(text, num_cards),
+            timeout=settings.AI_FLASHCARDS_TIMEOUT_SECONDS,
+        )
+
+        if structure is None:
+            structure_task = asyncio.wait_for(
+                self.ai_service.generate_mind_map_structure(text),
+                timeout=settings.AI_MIND_MAP_TIMEOUT_SECONDS,
+            )
+            structure_result, flashcards_result = await asyncio.gather(
+                structure_task, flashcards_task, return_exceptions=True
+            )
+
+            if isinstance(structure_result, asyncio.TimeoutError):
+                raise ValueError(
+                    "La IA tardó demasiado en generar el mapa mental. Inténtalo de nuevo."
+                )
+            if isinstance(structure_result, BaseException):
+                raise structure_result
+
+            structure = structure_result
+            await self._store_structure(db, content_hash, structure)
+        else:
+            (flashcards_result,) = await asyncio.gather(
+                flashcards_task, return_exceptions=True
+            )
+
+        # Las flashcards no deben impedir la creación del mapa mental
+        if isinstance(flashcards_result, BaseException):
+            log_warning(
+                f"No se pudieron generar flashcards para '{filename}': "
+                f"{type(flashcards_result).__name__} {flashcards_result}"
+            )
+            flashcards_result = []
+
+        await report("saving")
+        mind_map = self._add_mind_map(
+            db, user_id, structure, filename, content_hash, title
+        )
+        await db.flush()  # Obtener mind_map.id
+        FlashcardService.add_flashcards(db, mind_map.id, flashcards_result)
+        await study_stats.add_flashcards(db, user_id, mind_map.id, len(flashcards_result))
+
+        await db.commit()
 
-        # Crear mapa mental
+        return await self._load_mind_map(db, mind_map.id)
+
+    async def _get_cached_structure(
+        self, db: AsyncSession, content_hash: str
+    ) -> dict | None:
+        """Buscar la estructura en caché para el prompt y modelo actuales."""
+        return await StructureCacheService.get_structure(
+            db,
+            content_hash=content_hash,
+            prompt_version=self.ai_service.MIND_MAP_PROMPT_VERSION,
+            model_name=self.ai_service.model,
+        )
+
+    async def _store_structure(
+        self, db: AsyncSession, content_hash: str, structure: dict
+    ) -> None:
+        """Guardar la estructura generada para el prompt y modelo actuales."""
+        await StructureCacheService.store_structure(
+            db,
+            content_hash=content_hash,
+            prompt_version=self.ai_service.MIND_MAP_PROMPT_VERSION,
+            model_name=self.ai_service.model,
+            structure=structure,
+        )
+
+    @staticmethod
+    def _add_mind_map(
+        db: AsyncSession,
+        user_id: UUID,
+        structure: dict,
+        filename: str,
+        content_hash: str,
+        title: str | None = None,
+    ) -> MindMap:
+        """Añadir a la sesión el mapa mental con sus nodos y aristas (sin confirmar)."""
+        # Utilice el título proporcionado o el título generado por IA
         mind_map = MindMap(
             user_id=user_id,
-            title=structure.get("title", title or filename),
+            title=title or structure.get("title") or filename,
             pdf_filename=filename,
             pdf_content_hash=content_hash,
         )
-
         db.add(mind_map)
-        await db.flush()  # Obtener mind_map.id
 
         # Crear nodos
         for node_data in structure.get("nodes", []):
-            position = node_data.get("position", {})
+            position = node_data.get("position") or {}
 
             node = MindMapNode(
-                mind_map_id=mind_map.id,
                 node_id=node_data["id"],
                 label=node_data["label"],
                 content=node_data.get("content"),
@@ -65,30 +170,29 @@ class MindMapService:
                 position_y=position.get("y"),
                 level=node_data.get("level", 0),
             )
-            db.add(node)
+            mind_map.nodes.append(node)
 
         # Crear edges
         for edge_data in structure.get("edges", []):
             edge = MindMapEdge(
-                mind_map_id=mind_map.id,
                 edge_id=edge_data["id"],
                 source_node_id=edge_data["source"],
                 target_node_id=edge_data["target"],
             )
-            db.add(edge)
+            mind_map.edges.append(edge)
 
-        await db.commit()
-        await db.refresh(mind_map)
+        return mind_map
 
-        # Cargar relaciones
+    @staticmethod
+    async def _load_mind_map(db: AsyncSession, mind_map_id: UUID) -> MindMap:
+        """Recargar el mapa mental con sus relaciones."""
         result = await db.execute(
             select(MindMap)
-            .where(MindMap.id == mind_map.id)
+            .where(MindMap.id == mind_map_id)
             .options(selectinload(MindMap.nodes), selectinload(MindMap.edges))
+            .execution_options(populate_existing=True)
         )
-        mind_map = result.scalar_one()
-
-        return mind_map
+        return result.scalar_one()
 
     async def get_mind_map_by_id(
         self, db: AsyncSession, mind_map_id: UUID, user_id: UUID
@@ -1,34 +1,223 @@
+import asyncio
 import fitz  # PyMuPDF
 import hashlib
-from io import BytesIO
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from fastapi import UploadFile
+from app.config import settings
+
+
+_executor: ProcessPoolExecutor | None = None
+
+
+def get_pdf_executor() -> ProcessPoolExecutor:
+    """Obtener (o crear) el pool de procesos compartido para la extracción de texto."""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.PDF_PROCESS_POOL_SIZE,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+def _reset_pdf_executor(executor: ProcessPoolExecutor) -> None:
+    """
+    Descartar un pool con workers colgados o muertos; el siguiente uso crea uno nuevo.
+
+    Los workers se terminan a la fuerza: un PDF que supera el tiempo límite sigue
+    ocupando su proceso hasta que se mata. Las extracciones que compartían el
+    pool reciben BrokenProcessPool y se reintentan en el pool nuevo.
+    """
+    global _executor
+    if _executor is executor:
+        _executor = None
+
+    # _processes es interno, pero es la única forma de llegar a los workers
+    processes = list((executor._processes or {}).values())
+    executor.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        if process.is_alive():
+            process.kill()
+
+
+def shutdown_pdf_executor() -> None:
+    """Cerrar el pool de procesos (se llama al detener la aplicación)."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+INVALID_PDF_MESSAGE = "El archivo no es un PDF válido"
+
+
+def _count_pages(pdf_path: str) -> int:
+    """Contar las páginas del PDF (se ejecuta en el pool de procesos)."""
+    # Los errores de PyMuPDF (FileDataError, EmptyFileError) son RuntimeError
+    try:
+        with fitz.open(pdf_path, filetype="pdf") as doc:
+            return doc.page_count
+    except RuntimeError:
+        raise ValueError(INVALID_PDF_MESSAGE)
+
+
+def _extract_page_range(pdf_path: str, start: int, stop: int) -> list[str]:
+    """Extraer el texto de las páginas [start, stop) (se ejecuta en el pool de procesos)."""
+    text_content = []
+
+    # PyMuPDF lee el archivo bajo demanda, sin cargar el documento completo en memoria
+    try:
+        with fitz.open(pdf_path, filetype="pdf") as doc:
+            for page_number in range(start, stop):
+                text = doc[page_number].get_text()
+                if text.strip():
+                    text_content.append(text)
+    except RuntimeError:
+        raise ValueError(INVALID_PDF_MESSAGE)
+
+    return text_content
+
+
+class UploadTooLargeError(ValueError):
+    """El archivo subido supera el tamaño máximo permitido."""
+
+
+@dataclass
+class SpooledPDF:
+    """PDF subido guardado en un archivo temporal."""
+
+    path: str
+    size: int
+    content_hash: str
+
+    def remove(self) -> None:
+        """Eliminar el archivo temporal."""
+        remove_spooled_file(self.path)
+
+
+def remove_spooled_file(path: str) -> None:
+    """Eliminar un archivo temporal de subida si todavía existe."""
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
 
 
 class PDFService:
-    """Servicio para procesamiento de PDF (solo en memoria)"""
+    """Servicio para procesamiento de PDF (desde archivos temporales)"""
+
+    @staticmethod
+    async def spool_upload(file: UploadFile) -> SpooledPDF:
+        """
+        Guardar un PDF subido en un archivo temporal leyendo por bloques.
+
+        El límite de tamaño se verifica a medida que se lee y el hash se calcula
+        en el mismo recorrido, por lo que nunca se mantiene el archivo completo en memoria.
+
+        Raises:
+            UploadTooLargeError: Si el archivo supera MAX_UPLOAD_SIZE_MB
+        """
+        max_size = settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024
+        digest = hashlib.sha256()
+        size = 0
+
+        # Las operaciones de disco se ejecutan en hilos para no bloquear el event loop
+        spool = await asyncio.to_thread(
+            tempfile.NamedTemporaryFile,
+            prefix="mapit-upload-",
+            suffix=".pdf",
+            dir=settings.UPLOAD_TMP_DIR,
+            delete=False,
+        )
+
+        try:
+            try:
+                while chunk := await file.read(settings.UPLOAD_CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > max_size:
+                        raise UploadTooLargeError(
+                            "El archivo es demasiado grande. "
+                            f"El tamaño máximo es {settings.MAX_UPLOAD_SIZE_MB}MB"
+                        )
+                    digest.update(chunk)
+                    await asyncio.to_thread(spool.write, chunk)
+            finally:
+                await asyncio.to_thread(spool.close)
+        except BaseException:
+            await asyncio.to_thread(remove_spooled_file, spool.name)
+            raise
+
+        return SpooledPDF(path=spool.name, size=size, content_hash=digest.hexdigest())
 
     @staticmethod
-    async def extract_text_from_pdf(pdf_bytes: bytes) -> str:
+    async def extract_text_from_pdf(pdf_path: str) -> str:
         """
-        Extraer texto de bytes PDF (procesamiento en memoria).
+        Extraer texto de un archivo PDF.
+
+        La extracción se ejecuta en un pool de procesos para no bloquear el event
+        loop. Los documentos grandes se dividen en rangos de páginas que se procesan
+        en paralelo; se leen como máximo PDF_MAX_PAGES páginas.
 
         Args:
-            pdf_bytes: Contenido del archivo PDF en bytes
+            pdf_path: Ruta del archivo PDF
 
         Returns:
             Texto extraído de todas las páginas
+
+        Raises:
+            ValueError: Si el archivo no es un PDF válido, si la extracción supera
+                PDF_EXTRACTION_TIMEOUT_SECONDS o si el pool se rompe dos veces
+                seguidas (p. ej. un PDF que hace caer el worker); el pool roto o
+                colgado se reemplaza
         """
-        text_content = []
+        loop = asyncio.get_running_loop()
 
-        # Open PDF from memory
-        pdf_stream = BytesIO(pdf_bytes)
+        async def extract(executor: ProcessPoolExecutor) -> list[list[str]]:
+            page_count = await loop.run_in_executor(executor, _count_pages, pdf_path)
+            page_count = min(page_count, settings.PDF_MAX_PAGES)
 
-        with fitz.open(stream=pdf_stream, filetype="pdf") as doc:
-            for page in doc:
-                text = page.get_text()
-                if text.strip():
-                    text_content.append(text)
+            pages_per_task = settings.PDF_PAGES_PER_TASK
+            return await asyncio.gather(
+                *(
+                    loop.run_in_executor(
+                        executor,
+                        _extract_page_range,
+                        pdf_path,
+                        start,
+                        min(start + pages_per_task, page_count),
+                    )
+                    for start in range(0, page_count, pages_per_task)
+                )
+            )
 
-        return "\n\n".join(text_content)
+        # El pool también se rompe cuando otra extracción lo reemplaza por superar
+        # el tiempo límite: en ese caso se reintenta una vez en el pool nuevo
+        for attempt in range(2):
+            executor = get_pdf_executor()
+            try:
+                chunks = await asyncio.wait_for(
+                    extract(executor), timeout=settings.PDF_EXTRACTION_TIMEOUT_SECONDS
+                )
+                break
+            except asyncio.TimeoutError:
+                _reset_pdf_executor(executor)
+                raise ValueError(
+                    "El PDF tardó demasiado en procesarse. "
+                    "Intenta con un documento más pequeño."
+                )
+            except BrokenProcessPool:
+                _reset_pdf_executor(executor)
+                if attempt:
+                    raise ValueError(
+                        "No se pudo procesar el PDF. Comprueba que el archivo es válido."
+                    )
+
+        return "\n\n".join(text for chunk in chunks for text in chunk)
 
     @staticmethod
     def calculate_content_hash(content: bytes) -> str:
@@ -36,18 +225,36 @@ class PDFService:
         return hashlib.sha256(content).hexdigest()
 
     @staticmethod
-    async def process_pdf(pdf_bytes: bytes) -> tuple[str, str]:
+    def calculate_file_hash(path: str) -> str:
+        """Calcular el hash SHA-256 de un archivo leyéndolo por bloques."""
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            while chunk := f.read(settings.UPLOAD_CHUNK_SIZE):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    async def process_pdf(
+        pdf_path: str, content_hash: str | None = None
+    ) -> tuple[str, str]:
         """
         Process PDF: Extraer texto y calcular hash.
 
+        Args:
+            pdf_path: Ruta del archivo PDF
+            content_hash: Hash ya calculado durante la subida (opcional)
+
         Returns:
             Tuple de (extracted_text, content_hash)
 
         Raises:
             ValueError: Si el PDF no contiene suficiente texto
         """
-        text = await PDFService.extract_text_from_pdf(pdf_bytes)
-        content_hash = PDFService.calculate_content_hash(pdf_bytes)
+        text = await PDFService.extract_text_from_pdf(pdf_path)
+        if content_hash is None:
+            content_hash = await asyncio.to_thread(
+                PDFService.calculate_file_hash, pdf_path
+            )
 
         # Validate extracted text
         if not text or len(text.strip()) < 50:
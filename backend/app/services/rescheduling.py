@@ -0,0 +1,226 @@
+from dataclasses import dataclass
+from datetime import date, datetime
+from uuid import UUID
+import numpy as np
+from sqlalchemy import Date, DateTime, Float, Integer, bindparam, func, select, update
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import AsyncSessionLocal
+from app.models.flashcard import Flashcard, FlashcardProgress
+from app.services.stats_service import study_stats
+from app.utils.sm2 import MIN_EASINESS_FACTOR, sm2_review_arrays
+
+
+@dataclass(frozen=True)
+class RescheduleOptions:
+    """Ajustes que se aplican en bloque al progreso de las flashcards."""
+
+    # Factor de facilidad mínimo (los menores se elevan a este valor)
+    min_easiness_factor: float | None = None
+    # Multiplicador de los intervalos actuales (la fecha se mueve en la diferencia)
+    interval_modifier: float | None = None
+    # Días que se posponen las revisiones (p. ej. tras una caída o unas vacaciones)
+    shift_days: int = 0
+
+
+def adjust_schedule(
+    easiness_factor: np.ndarray,
+    interval: np.ndarray,
+    next_review: np.ndarray,
+    options: RescheduleOptions,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Aplicar los ajustes a los arrays de progreso (next_review en datetime64[D]).
+
+    Los intervalos de las flashcards aún sin aprender (intervalo 0) no se modifican.
+    """
+    if options.min_easiness_factor is not None:
+        easiness_factor = np.maximum(
+            easiness_factor, max(options.min_easiness_factor, MIN_EASINESS_FACTOR)
+        )
+
+    if options.interval_modifier is not None:
+        scaled = np.maximum(1, np.rint(interval * options.interval_modifier)).astype(np.int64)
+        scaled = np.where(interval > 0, scaled, interval)
+        next_review = next_review + (scaled - interval).astype("timedelta64[D]")
+        interval = scaled
+
+    if options.shift_days:
+        next_review = next_review + np.timedelta64(options.shift_days, "D")
+
+    return easiness_factor, interval, next_review
+
+
+def replay_sm2(
+    easiness_factor: np.ndarray,
+    interval: np.ndarray,
+    repetitions: np.ndarray,
+    qualities: np.ndarray,
+    lengths: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Reproducir secuencias de revisiones de muchas flashcards a la vez.
+
+    Args:
+        easiness_factor, interval, repetitions: Estado inicial de cada flashcard
+        qualities: Matriz (flashcards x revisiones) con la calidad de cada revisión
+        lengths: Número de revisiones válidas de cada fila de qualities
+
+    Returns:
+        El estado final de cada flashcard
+    """
+    easiness_factor = easiness_factor.copy()
+    interval = interval.copy()
+    repetitions = repetitions.copy()
+
+    # Un paso por posición de la secuencia, aplicado a las flashcards que la tienen
+    for step in range(qualities.shape[1]):
+        active = lengths > step
+        (
+            easiness_factor[active],
+            interval[active],
+            repetitions[active],
+        ) = sm2_review_arrays(
+            easiness_factor[active],
+            interval[active],
+            repetitions[active],
+            qualities[active, step],
+        )
+
+    return easiness_factor, interval, repetitions
+
+
+async def _write_schedule(
+    db: AsyncSession,
+    ids: list[UUID],
+    updated_at: list[datetime],
+    easiness_factor: np.ndarray,
+    interval: np.ndarray,
+    next_review: np.ndarray,
+) -> int:
+    """
+    Actualizar muchas filas con una sola sentencia (UPDATE ... FROM unnest(...)).
+
+    Solo se escriben las filas que siguen como se leyeron (mismo updated_at): una
+    revisión hecha entre la lectura y la escritura no se pisa con el estado anterior.
+
+    Returns:
+        Número de filas escritas
+    """
+    values = func.unnest(
+        bindparam("ids", type_=ARRAY(PG_UUID(as_uuid=True))),
+        bindparam("updated_ats", type_=ARRAY(DateTime)),
+        bindparam("easiness_factors", type_=ARRAY(Float)),
+        bindparam("intervals", type_=ARRAY(Integer)),
+        bindparam("next_review_dates", type_=ARRAY(Date)),
+    ).table_valued(
+        "id", "updated_at", "easiness_factor", "interval", "next_review_date"
+    ).render_derived()
+
+    result = await db.execute(
+        update(FlashcardProgress)
+        .where(
+            FlashcardProgress.id == values.c.id,
+            FlashcardProgress.updated_at == values.c.updated_at,
+        )
+        .values(
+            easiness_factor=values.c.easiness_factor,
+            interval=values.c.interval,
+            next_review_date=values.c.next_review_date,
+            updated_at=datetime.utcnow(),
+        )
+        .execution_options(synchronize_session=False),
+        {
+            "ids": ids,
+            "updated_ats": updated_at,
+            "easiness_factors": easiness_factor.tolist(),
+            "intervals": interval.tolist(),
+            "next_review_dates": next_review.tolist(),
+        },
+    )
+    await db.commit()
+    return result.rowcount
+
+
+async def reschedule_progress(
+    options: RescheduleOptions,
+    user_id: UUID | None = None,
+    mind_map_id: UUID | None = None,
+    due_before: date | None = None,
+    batch_size: int = 10000,
+    dry_run: bool = False,
+) -> dict:
+    """
+    Aplicar los ajustes al progreso guardado, por lotes de `batch_size` filas.
+
+    Cada lote se carga en arrays de NumPy, se ajusta de forma vectorizada y solo
+    las filas que cambian se escriben con una única sentencia. Las filas revisadas
+    mientras tanto no se modifican (se cuentan como omitidas). Las flashcards
+    nunca revisadas no tienen fila de progreso y no se ven afectadas. Reconstruir
+    el progreso desde el registro de revisiones descarta estos ajustes. Si hay
+    cambios, al terminar se recalculan los contadores de study_stats.
+
+    Args:
+        user_id, mind_map_id: Limitar a un usuario o a un mapa mental
+        due_before: Limitar a las revisiones pendientes hasta esta fecha (incluida)
+        dry_run: Calcular sin escribir
+
+    Returns:
+        Número de filas leídas, modificadas y omitidas por revisarse mientras tanto
+    """
+    query = select(
+        FlashcardProgress.id,
+        FlashcardProgress.updated_at,
+        FlashcardProgress.easiness_factor,
+        FlashcardProgress.interval,
+        FlashcardProgress.next_review_date,
+    )
+    if user_id:
+        query = query.where(FlashcardProgress.user_id == user_id)
+    if mind_map_id:
+        query = query.join(Flashcard).where(Flashcard.mind_map_id == mind_map_id)
+    if due_before:
+        query = query.where(FlashcardProgress.next_review_date <= due_before)
+
+    counts = {"rows": 0, "changed": 0, "skipped": 0}
+
+    # Lectura en streaming y escritura por lotes en otra sesión
+    async with AsyncSessionLocal() as reader, AsyncSessionLocal() as writer:
+        result = await reader.stream(query.execution_options(yield_per=batch_size))
+        async for rows in result.partitions():
+            ids, updated_ats, easiness_factors, intervals, next_reviews = zip(*rows)
+            easiness_factor = np.array(easiness_factors, dtype=np.float64)
+            interval = np.array(intervals, dtype=np.int64)
+            next_review = np.array(next_reviews, dtype="datetime64[D]")
+
+            new_easiness_factor, new_interval, new_next_review = adjust_schedule(
+                easiness_factor, interval, next_review, options
+            )
+            changed = (
+                (new_easiness_factor != easiness_factor)
+                | (new_interval != interval)
+                | (new_next_review != next_review)
+            )
+
+            counts["rows"] += len(ids)
+            if dry_run or not changed.any():
+                counts["changed"] += int(changed.sum())
+                continue
+
+            changed_rows = np.flatnonzero(changed)
+            written = await _write_schedule(
+                writer,
+                [ids[index] for index in changed_rows],
+                [updated_ats[index] for index in changed_rows],
+                new_easiness_factor[changed],
+                new_interval[changed],
+                new_next_review[changed],
+            )
+            counts["changed"] += written
+            counts["skipped"] += len(changed_rows) - written
+
+        # Las fechas de revisión de flashcard_due_counts dependen del progreso
+        if counts["changed"] and not dry_run:
+            await study_stats.rebuild(writer, [user_id] if user_id else None)
+
+    return counts
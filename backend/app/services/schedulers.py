@@ -0,0 +1,213 @@
+from abc import ABC, abstractmethod
+from typing import NamedTuple, Sequence
+from uuid import UUID
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.models.flashcard import FSRSParameters
+from app.services.rescheduling import replay_sm2
+from app.utils.fsrs import (
+    AGAIN,
+    DEFAULT_PARAMETERS,
+    FSRSState,
+    fsrs_review,
+    fsrs_review_arrays,
+    grade_from_quality,
+    memory_state_from_sm2,
+    next_interval,
+    next_interval_arrays,
+)
+from app.utils.sm2 import SM2State, sm2_review
+
+
+class ReviewState(NamedTuple):
+    """Estado de programación de una flashcard (SM-2 y, si existe, FSRS)."""
+
+    easiness_factor: float
+    interval: int
+    repetitions: int
+    stability: float | None = None
+    difficulty: float | None = None
+
+
+class ReviewStateArrays(NamedTuple):
+    """Estado de programación de muchas flashcards (stability NaN si no hay estado FSRS)."""
+
+    easiness_factor: np.ndarray
+    interval: np.ndarray
+    repetitions: np.ndarray
+    stability: np.ndarray
+    difficulty: np.ndarray
+
+
+class Scheduler(ABC):
+    """Algoritmo de repetición espaciada usado para programar las revisiones."""
+
+    name: str
+
+    @abstractmethod
+    def review(self, state: ReviewState, quality: int, elapsed_days: int) -> ReviewState:
+        """
+        Aplicar una revisión al estado.
+
+        Args:
+            quality: 0-5 (0=apagón total, 5=respuesta perfecta)
+            elapsed_days: Días desde la revisión anterior
+        """
+
+    @abstractmethod
+    def replay(
+        self,
+        state: ReviewStateArrays,
+        qualities: np.ndarray,
+        elapsed_days: np.ndarray,
+        lengths: np.ndarray,
+    ) -> ReviewStateArrays:
+        """
+        Reproducir secuencias de revisiones de muchas flashcards a la vez.
+
+        Args:
+            state: Estado inicial de cada flashcard
+            qualities, elapsed_days: Matrices (flashcards x revisiones)
+            lengths: Número de revisiones válidas de cada fila
+        """
+
+
+class SM2Scheduler(Scheduler):
+    """Planificador SM-2 (por defecto). No modifica el estado FSRS."""
+
+    name = "sm2"
+
+    def review(self, state: ReviewState, quality: int, elapsed_days: int) -> ReviewState:
+        easiness_factor, interval, repetitions = sm2_review(
+            SM2State(state.easiness_factor, state.interval, state.repetitions), quality
+        )
+        return state._replace(
+            easiness_factor=easiness_factor, interval=interval, repetitions=repetitions
+        )
+
+    def replay(
+        self,
+        state: ReviewStateArrays,
+        qualities: np.ndarray,
+        elapsed_days: np.ndarray,
+        lengths: np.ndarray,
+    ) -> ReviewStateArrays:
+        easiness_factor, interval, repetitions = replay_sm2(
+            state.easiness_factor, state.interval, state.repetitions, qualities, lengths
+        )
+        return state._replace(
+            easiness_factor=easiness_factor, interval=interval, repetitions=repetitions
+        )
+
+
+class FSRSScheduler(Scheduler):
+    """
+    Planificador FSRS-4.5: el intervalo es el tiempo hasta que la probabilidad
+    estimada de recordar baja a la retención deseada.
+
+    El factor de facilidad y las repeticiones se siguen actualizando como en SM-2
+    para poder volver a SM-2 sin perder el progreso. Las flashcards programadas
+    antes con SM-2 parten de un estado FSRS estimado a partir del suyo.
+    """
+
+    name = "fsrs"
+
+    def __init__(
+        self,
+        parameters: Sequence[float] = DEFAULT_PARAMETERS,
+        desired_retention: float = settings.FSRS_DESIRED_RETENTION,
+        maximum_interval: int = settings.FSRS_MAXIMUM_INTERVAL_DAYS,
+    ):
+        self.parameters = tuple(parameters)
+        self.desired_retention = desired_retention
+        self.maximum_interval = maximum_interval
+
+    def review(self, state: ReviewState, quality: int, elapsed_days: int) -> ReviewState:
+        sm2 = sm2_review(
+            SM2State(state.easiness_factor, state.interval, state.repetitions), quality
+        )
+
+        if state.stability is not None:
+            memory = FSRSState(state.stability, state.difficulty)
+        elif state.repetitions or state.interval:
+            stability, difficulty = memory_state_from_sm2(
+                state.easiness_factor, state.interval, self.parameters
+            )
+            memory = FSRSState(float(stability), float(difficulty))
+        else:
+            memory = None
+
+        memory = fsrs_review(memory, grade_from_quality(quality), elapsed_days, self.parameters)
+        return ReviewState(
+            easiness_factor=sm2.easiness_factor,
+            interval=next_interval(
+                memory.stability, self.desired_retention, self.maximum_interval
+            ),
+            repetitions=sm2.repetitions,
+            stability=memory.stability,
+            difficulty=memory.difficulty,
+        )
+
+    def replay(
+        self,
+        state: ReviewStateArrays,
+        qualities: np.ndarray,
+        elapsed_days: np.ndarray,
+        lengths: np.ndarray,
+    ) -> ReviewStateArrays:
+        easiness_factor, _, repetitions = replay_sm2(
+            state.easiness_factor, state.interval, state.repetitions, qualities, lengths
+        )
+
+        stability = state.stability.astype(np.float64)
+        difficulty = state.difficulty.astype(np.float64)
+        converted = np.isnan(stability) & ((state.repetitions > 0) | (state.interval > 0))
+        stability[converted], difficulty[converted] = memory_state_from_sm2(
+            state.easiness_factor[converted], state.interval[converted], self.parameters
+        )
+
+        grades = np.maximum(AGAIN, qualities - 1)
+        parameters = np.array(self.parameters)
+        for step in range(qualities.shape[1]):
+            active = lengths > step
+            stability[active], difficulty[active] = fsrs_review_arrays(
+                stability[active],
+                difficulty[active],
+                grades[active, step],
+                elapsed_days[active, step],
+                parameters,
+            )
+
+        # Las flashcards sin revisiones conservan su intervalo
+        interval = np.where(
+            lengths > 0,
+            next_interval_arrays(stability, self.desired_retention, self.maximum_interval),
+            state.interval,
+        )
+        return ReviewStateArrays(easiness_factor, interval, repetitions, stability, difficulty)
+
+
+def create_scheduler(parameters: Sequence[float] | None = None) -> Scheduler:
+    """Crear el planificador configurado (con parámetros FSRS propios si se indican)."""
+    if settings.FLASHCARDS_SCHEDULER == "sm2":
+        return SM2Scheduler()
+    if settings.FLASHCARDS_SCHEDULER == "fsrs":
+        return FSRSScheduler(parameters or DEFAULT_PARAMETERS)
+    raise ValueError(f"Planificador no soportado: {settings.FLASHCARDS_SCHEDULER}")
+
+
+async def load_schedulers(db: AsyncSession, user_ids: Sequence[UUID]) -> dict[UUID, Scheduler]:
+    """Planificador de cada usuario, con sus parámetros FSRS ajustados si los tiene."""
+    if settings.FLASHCARDS_SCHEDULER != "fsrs":
+        scheduler = create_scheduler()
+        return {user_id: scheduler for user_id in user_ids}
+
+    result = await db.execute(
+        select(FSRSParameters.user_id, FSRSParameters.weights).where(
+            FSRSParameters.user_id.in_(user_ids)
+        )
+    )
+    weights = dict(result.all())
+    return {user_id: create_scheduler(weights.get(user_id)) for user_id in user_ids}
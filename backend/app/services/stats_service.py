@@ -0,0 +1,404 @@
+from collections import Counter
+from datetime import date, datetime, time
+from typing import NamedTuple, Sequence
+from uuid import UUID
+from sqlalchemy import DateTime, Integer, case, delete, func, literal, select
+from sqlalchemy.dialects.postgresql import ARRAY, aggregate_order_by, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.models.flashcard import Flashcard, FlashcardProgress
+from app.models.game import GameSession
+from app.models.mind_map import MindMap
+from app.models.stats import FlashcardDueCount, StudyStats
+
+
+class ProgressChange(NamedTuple):
+    """Cambio del progreso de una flashcard tras una o varias revisiones."""
+
+    mind_map_id: UUID
+    # None si la flashcard no se había revisado nunca
+    prior_interval: int | None
+    prior_next_review_date: date | None
+    interval: int
+    next_review_date: date
+
+
+def reviewed_today_query(user_id: UUID):
+    """
+    Consulta de las revisiones de hoy del usuario, para los límites diarios de la cola.
+
+    Cuenta las de todos sus mapas mentales. La fila de progreso se crea en la
+    primera revisión: si se creó hoy, la flashcard era nueva.
+    """
+    day_start = datetime.combine(date.today(), time.min)
+    return select(
+        func.count().filter(FlashcardProgress.created_at >= day_start).label("new"),
+        func.count().filter(FlashcardProgress.created_at < day_start).label("review"),
+    ).where(
+        FlashcardProgress.user_id == user_id,
+        FlashcardProgress.last_reviewed_at >= day_start,
+    )
+
+
+class StudyStatsService:
+    """
+    Contadores de estudio por usuario y mapa mental (study_stats y flashcard_due_counts).
+
+    Los métodos record_* y add_flashcards no confirman: se ejecutan en la transacción
+    del evento que registran. Los cambios en bloque del progreso (rebuild_progress,
+    reschedule) los recalculan con rebuild.
+    """
+
+    @staticmethod
+    def _category(interval: int | None) -> str:
+        if interval is None:
+            return "flashcards_new"
+        if interval < settings.STATS_MATURE_INTERVAL_DAYS:
+            return "flashcards_learning"
+        return "flashcards_mature"
+
+    @staticmethod
+    def _increment(statement, columns: Sequence[str]) -> dict:
+        """Valores de ON CONFLICT que suman los de la fila insertada a los actuales."""
+        return {
+            column: getattr(StudyStats, column) + getattr(statement.excluded, column)
+            for column in columns
+        } | {"updated_at": statement.excluded.updated_at}
+
+    async def add_flashcards(
+        self, db: AsyncSession, user_id: UUID, mind_map_id: UUID, count: int
+    ) -> None:
+        """Registrar flashcards nuevas de un mapa mental (crea sus contadores si no existen)."""
+        statement = insert(StudyStats).values(
+            user_id=user_id,
+            mind_map_id=mind_map_id,
+            flashcards_new=count,
+            updated_at=datetime.utcnow(),
+        )
+        await db.execute(
+            statement.on_conflict_do_update(
+                index_elements=[StudyStats.user_id, StudyStats.mind_map_id],
+                set_=self._increment(statement, ["flashcards_new"]),
+            )
+        )
+
+    async def record_reviews(
+        self, db: AsyncSession, user_id: UUID, changes: Sequence[ProgressChange]
+    ) -> None:
+        """Registrar el cambio de categoría y de fecha de revisión de las flashcards revisadas."""
+        categories: dict[UUID, Counter] = {}
+        due_dates: Counter = Counter()
+        for change in changes:
+            before = self._category(change.prior_interval)
+            after = self._category(change.interval)
+            if before != after:
+                counter = categories.setdefault(change.mind_map_id, Counter())
+                counter[before] -= 1
+                counter[after] += 1
+            if change.prior_next_review_date is not None:
+                due_dates[change.mind_map_id, change.prior_next_review_date] -= 1
+            due_dates[change.mind_map_id, change.next_review_date] += 1
+
+        now = datetime.utcnow()
+        columns = ["flashcards_new", "flashcards_learning", "flashcards_mature"]
+        if categories:
+            statement = insert(StudyStats).values(
+                [
+                    {
+                        "user_id": user_id,
+                        "mind_map_id": mind_map_id,
+                        **{column: counter[column] for column in columns},
+                        "updated_at": now,
+                    }
+                    for mind_map_id, counter in categories.items()
+                ]
+            )
+            await db.execute(
+                statement.on_conflict_do_update(
+                    index_elements=[StudyStats.user_id, StudyStats.mind_map_id],
+                    set_=self._increment(statement, columns),
+                )
+            )
+
+        due_dates = {key: delta for key, delta in due_dates.items() if delta}
+        if due_dates:
+            statement = insert(FlashcardDueCount).values(
+                [
+                    {
+                        "user_id": user_id,
+                        "mind_map_id": mind_map_id,
+                        "due_date": due_date,
+                        "flashcards": delta,
+                    }
+                    for (mind_map_id, due_date), delta in due_dates.items()
+                ]
+            )
+            await db.execute(
+                statement.on_conflict_do_update(
+                    index_elements=[
+                        FlashcardDueCount.user_id,
+                        FlashcardDueCount.mind_map_id,
+                        FlashcardDueCount.due_date,
+                    ],
+                    set_={
+                        "flashcards": FlashcardDueCount.flashcards
+                        + statement.excluded.flashcards
+                    },
+                )
+            )
+            await db.execute(
+                delete(FlashcardDueCount).where(
+                    FlashcardDueCount.user_id == user_id, FlashcardDueCount.flashcards == 0
+                )
+            )
+
+    async def record_game(
+        self,
+        db: AsyncSession,
+        user_id: UUID,
+        mind_map_id: UUID,
+        score: int,
+        time_elapsed_seconds: int,
+    ) -> None:
+        """Registrar una partida completada."""
+        statement = insert(StudyStats).values(
+            user_id=user_id,
+            mind_map_id=mind_map_id,
+            games_completed=1,
+            game_score_total=score,
+            best_score=score,
+            best_time_seconds=time_elapsed_seconds,
+            updated_at=datetime.utcnow(),
+        )
+        excluded = statement.excluded
+        improved = (
+            StudyStats.best_score.is_(None)
+            | (excluded.best_score > StudyStats.best_score)
+            | (
+                (excluded.best_score == StudyStats.best_score)
+                & (excluded.best_time_seconds < StudyStats.best_time_seconds)
+            )
+        )
+        await db.execute(
+            statement.on_conflict_do_update(
+                index_elements=[StudyStats.user_id, StudyStats.mind_map_id],
+                set_=self._increment(statement, ["games_completed", "game_score_total"])
+                | {
+                    "best_score": case(
+                        (improved, excluded.best_score), else_=StudyStats.best_score
+                    ),
+                    "best_time_seconds": case(
+                        (improved, excluded.best_time_seconds),
+                        else_=StudyStats.best_time_seconds,
+                    ),
+                },
+            )
+        )
+
+    async def get_stats(
+        self, db: AsyncSession, user_id: UUID, mind_map_id: UUID | None = None
+    ) -> dict:
+        """
+        Obtener los contadores de cada mapa mental del usuario y sus totales.
+
+        Una sola consulta por clave primaria: las pendientes hoy se suman de las
+        fechas de revisión hasta hoy de cada mapa. available_today aplica además
+        lo que queda de los límites diarios del usuario, como la cola de estudio.
+        """
+        due_today = (
+            select(func.coalesce(func.sum(FlashcardDueCount.flashcards), 0))
+            .where(
+                FlashcardDueCount.user_id == StudyStats.user_id,
+                FlashcardDueCount.mind_map_id == StudyStats.mind_map_id,
+                FlashcardDueCount.due_date <= date.today(),
+            )
+            .scalar_subquery()
+        )
+        reviewed_today = reviewed_today_query(user_id).cte("reviewed_today")
+        query = select(
+            StudyStats,
+            due_today.label("due_today"),
+            select(reviewed_today.c.new).scalar_subquery().label("reviewed_new"),
+            select(reviewed_today.c.review).scalar_subquery().label("reviewed_review"),
+        ).where(StudyStats.user_id == user_id)
+        if mind_map_id:
+            query = query.where(StudyStats.mind_map_id == mind_map_id)
+
+        result = (await db.execute(query)).all()
+        limits = (
+            (
+                max(settings.FLASHCARDS_NEW_PER_DAY - result[0].reviewed_new, 0),
+                max(settings.FLASHCARDS_REVIEWS_PER_DAY - result[0].reviewed_review, 0),
+            )
+            if result
+            else (0, 0)
+        )
+        rows = [(stats, due) for stats, due, _, _ in result]
+        return {
+            "totals": self._counters(rows, limits),
+            "mind_maps": [
+                {"mind_map_id": stats.mind_map_id, **self._counters([(stats, due)], limits)}
+                for stats, due in rows
+            ],
+        }
+
+    @staticmethod
+    def _owned_by(user_id, mind_map_id):
+        """Condición de JOIN con MindMap: solo cuenta lo del propietario del mapa mental."""
+        return (MindMap.id == mind_map_id) & (MindMap.user_id == user_id)
+
+    async def rebuild(self, db: AsyncSession, user_ids: Sequence[UUID] | None = None) -> dict:
+        """
+        Recalcular los contadores (de algunos usuarios o de todos) desde las tablas de origen.
+
+        Se borran y se vuelven a insertar con sentencias INSERT ... SELECT en una
+        sola transacción.
+
+        Returns:
+            Número de filas de contadores de mapas mentales y de fechas de revisión
+        """
+        flashcards = (
+            select(Flashcard.mind_map_id, func.count().label("flashcards"))
+            .group_by(Flashcard.mind_map_id)
+            .subquery()
+        )
+        progress = (
+            select(
+                Flashcard.mind_map_id,
+                func.count().label("reviewed"),
+                func.count()
+                .filter(FlashcardProgress.interval >= settings.STATS_MATURE_INTERVAL_DAYS)
+                .label("mature"),
+            )
+            .join(Flashcard, Flashcard.id == FlashcardProgress.flashcard_id)
+            .join(MindMap, self._owned_by(FlashcardProgress.user_id, Flashcard.mind_map_id))
+            .group_by(Flashcard.mind_map_id)
+            .subquery()
+        )
+        games = (
+            select(
+                GameSession.mind_map_id,
+                func.count().label("games_completed"),
+                func.sum(GameSession.score).label("game_score_total"),
+                func.max(GameSession.score).label("best_score"),
+                func.array_agg(
+                    aggregate_order_by(
+                        GameSession.time_elapsed_seconds,
+                        GameSession.score.desc(),
+                        GameSession.time_elapsed_seconds,
+                    ),
+                    type_=ARRAY(Integer),
+                )[1].label("best_time_seconds"),
+            )
+            .join(MindMap, self._owned_by(GameSession.user_id, GameSession.mind_map_id))
+            .where(GameSession.completed)
+            .group_by(GameSession.mind_map_id)
+            .subquery()
+        )
+
+        reviewed = func.coalesce(progress.c.reviewed, 0)
+        mature = func.coalesce(progress.c.mature, 0)
+        stats = (
+            select(
+                MindMap.user_id,
+                MindMap.id,
+                func.coalesce(flashcards.c.flashcards, 0) - reviewed,
+                reviewed - mature,
+                mature,
+                func.coalesce(games.c.games_completed, 0),
+                func.coalesce(games.c.game_score_total, 0),
+                games.c.best_score,
+                games.c.best_time_seconds,
+                literal(datetime.utcnow(), DateTime),
+            )
+            .outerjoin(flashcards, flashcards.c.mind_map_id == MindMap.id)
+            .outerjoin(progress, progress.c.mind_map_id == MindMap.id)
+            .outerjoin(games, games.c.mind_map_id == MindMap.id)
+        )
+        due_counts = (
+            select(
+                FlashcardProgress.user_id,
+                Flashcard.mind_map_id,
+                FlashcardProgress.next_review_date,
+                func.count(),
+            )
+            .join(Flashcard, Flashcard.id == FlashcardProgress.flashcard_id)
+            .join(MindMap, self._owned_by(FlashcardProgress.user_id, Flashcard.mind_map_id))
+            .group_by(
+                FlashcardProgress.user_id,
+                Flashcard.mind_map_id,
+                FlashcardProgress.next_review_date,
+            )
+        )
+
+        delete_stats = delete(StudyStats)
+        delete_due_counts = delete(FlashcardDueCount)
+        if user_ids is not None:
+            stats = stats.where(MindMap.user_id.in_(user_ids))
+            due_counts = due_counts.where(FlashcardProgress.user_id.in_(user_ids))
+            delete_stats = delete_stats.where(StudyStats.user_id.in_(user_ids))
+            delete_due_counts = delete_due_counts.where(FlashcardDueCount.user_id.in_(user_ids))
+
+        await db.execute(delete_stats)
+        await db.execute(delete_due_counts)
+        stats_result = await db.execute(
+            insert(StudyStats).from_select(
+                [
+                    "user_id",
+                    "mind_map_id",
+                    "flashcards_new",
+                    "flashcards_learning",
+                    "flashcards_mature",
+                    "games_completed",
+                    "game_score_total",
+                    "best_score",
+                    "best_time_seconds",
+                    "updated_at",
+                ],
+                stats,
+            )
+        )
+        due_counts_result = await db.execute(
+            insert(FlashcardDueCount).from_select(
+                ["user_id", "mind_map_id", "due_date", "flashcards"], due_counts
+            )
+        )
+        await db.commit()
+
+        return {"mind_maps": stats_result.rowcount, "due_dates": due_counts_result.rowcount}
+
+    @staticmethod
+    def _counters(rows: Sequence[tuple[StudyStats, int]], limits: tuple[int, int]) -> dict:
+        """
+        Sumar los contadores de uno o varios mapas mentales.
+
+        limits es lo que queda hoy de los límites diarios (nuevas, repasos).
+        """
+        new_remaining, reviews_remaining = limits
+        due_today = sum(due for _, due in rows)
+        new = sum(stats.flashcards_new for stats, _ in rows)
+        games_completed = sum(stats.games_completed for stats, _ in rows)
+        played = [stats for stats, _ in rows if stats.best_score is not None]
+        best = max(
+            played,
+            key=lambda stats: (stats.best_score, -(stats.best_time_seconds or 0)),
+            default=None,
+        )
+        return {
+            "due_today": due_today,
+            "new": new,
+            "available_today": min(due_today, reviews_remaining) + min(new, new_remaining),
+            "learning": sum(stats.flashcards_learning for stats, _ in rows),
+            "mature": sum(stats.flashcards_mature for stats, _ in rows),
+            "games_completed": games_completed,
+            "average_score": round(
+                sum(stats.game_score_total for stats, _ in rows) / games_completed, 1
+            )
+            if games_completed
+            else None,
+            "best_score": best.best_score if best else None,
+            "best_time_seconds": best.best_time_seconds if best else None,
+        }
+
+
+study_stats = StudyStatsService()
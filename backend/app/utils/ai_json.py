@@ -0,0 +1,104 @@
+"""
+Utilidades para respuestas JSON de la IA: esquemas de respuesta y parser tolerante.
+"""
+
+import json
+import re
+from typing import Any
+from pydantic import TypeAdapter
+
+
+# Claves de JSON Schema que entiende el esquema de respuesta de Gemini
+_SUPPORTED_SCHEMA_KEYS = {
+    "type",
+    "properties",
+    "items",
+    "required",
+    "enum",
+    "description",
+    "nullable",
+    "minimum",
+    "maximum",
+}
+
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+
+
+def to_response_schema(response_type: Any) -> dict:
+    """
+    Convertir un modelo pydantic (o list[Model]) en un esquema de respuesta de Gemini.
+
+    Gemini no admite referencias ($ref/$defs) ni anyOf, por lo que se resuelven
+    en línea y los tipos opcionales se marcan como nullable.
+    """
+    schema = TypeAdapter(response_type).json_schema()
+    definitions = schema.pop("$defs", {})
+
+    def convert(node: dict) -> dict:
+        if "$ref" in node:
+            node = definitions[node["$ref"].split("/")[-1]]
+
+        if "anyOf" in node:
+            options = [option for option in node["anyOf"] if option.get("type") != "null"]
+            converted = convert(options[0])
+            if len(options) < len(node["anyOf"]):
+                converted["nullable"] = True
+            return converted
+
+        converted = {}
+        for key, value in node.items():
+            if key not in _SUPPORTED_SCHEMA_KEYS:
+                continue
+            if key == "type":
+                converted[key] = value.upper()
+            elif key == "properties":
+                converted[key] = {name: convert(prop) for name, prop in value.items()}
+            elif key == "items":
+                converted[key] = convert(value)
+            else:
+                converted[key] = value
+        return converted
+
+    return convert(schema)
+
+
+def parse_json_response(text: str | None) -> Any:
+    """
+    Decodificar el JSON de una respuesta de la IA de forma tolerante.
+
+    Elimina bloques de código markdown y texto alrededor del JSON, y repara
+    comas finales antes de decodificar.
+
+    Raises:
+        ValueError: Si la respuesta no contiene JSON válido
+    """
+    if not text:
+        raise ValueError("Respuesta vacía de la IA")
+
+    response_text = text.strip()
+
+    # Eliminar bloques de código markdown
+    if response_text.startswith("```"):
+        response_text = re.sub(r"^```[a-zA-Z]*\s*", "", response_text)
+        response_text = re.sub(r"\s*```$", "", response_text)
+
+    try:
+        return json.loads(response_text)
+    except json.JSONDecodeError:
+        pass
+
+    # Recortar el texto alrededor del objeto o array JSON
+    starts = [i for i in (response_text.find("{"), response_text.find("[")) if i >= 0]
+    if not starts:
+        raise ValueError("La respuesta de la IA no contiene JSON")
+    start = min(starts)
+    end = response_text.rfind("}" if response_text[start] == "{" else "]")
+    if end <= start:
+        raise ValueError("La respuesta de la IA contiene JSON incompleto")
+
+    candidate = _TRAILING_COMMA.sub(r"\1", response_text[start : end + 1])
+
+    try:
+        return json.loads(candidate)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"JSON no válido en la respuesta de la IA: {str(e)}")
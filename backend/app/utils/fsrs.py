@@ -0,0 +1,194 @@
+import math
+from typing import NamedTuple
+import numpy as np
+from app.utils.sm2 import INITIAL_EASINESS_FACTOR, MIN_EASINESS_FACTOR
+
+
+# Parámetros por defecto de FSRS-4.5 (ajustados sobre millones de revisiones)
+DEFAULT_PARAMETERS = (
+    0.4872, 1.4003, 3.7145, 13.8206, 5.1618, 1.2298, 0.8975, 0.031, 1.6474,
+    0.1367, 1.0461, 2.1072, 0.0793, 0.3246, 1.587, 0.2272, 2.8755,
+)
+
+# Límites de cada parámetro durante la optimización
+PARAMETER_BOUNDS = (
+    (0.1, 100), (0.1, 100), (0.1, 100), (0.1, 100), (1, 10), (0.1, 5), (0.1, 5),
+    (0, 0.5), (0, 3), (0.1, 0.8), (0.01, 2.5), (0.5, 5), (0.01, 0.2), (0.01, 0.9),
+    (0.01, 2), (0, 1), (1, 4),
+)
+
+# Curva de olvido: R(t, S) = (1 + FACTOR * t / S) ** DECAY, con R(S, S) = 0.9
+DECAY = -0.5
+FACTOR = 0.9 ** (1 / DECAY) - 1
+
+MIN_STABILITY = 0.01
+MIN_DIFFICULTY = 1
+MAX_DIFFICULTY = 10
+
+# Calificaciones de FSRS
+AGAIN, HARD, GOOD, EASY = 1, 2, 3, 4
+
+
+class FSRSState(NamedTuple):
+    """Estado de memoria FSRS de una flashcard."""
+
+    # Días hasta que la probabilidad de recordar baja al 90 %
+    stability: float
+    # 1 (fácil) - 10 (difícil)
+    difficulty: float
+
+
+def grade_from_quality(quality: int) -> int:
+    """Convertir la calidad 0-5 de SM-2 en la calificación 1-4 de FSRS."""
+    # 0-2: fallo (como en SM-2); 3: difícil; 4: bien; 5: fácil
+    return max(AGAIN, quality - 1)
+
+
+def retrievability(elapsed_days: float, stability: float) -> float:
+    """Probabilidad de recordar tras elapsed_days días con la estabilidad dada."""
+    return (1 + FACTOR * elapsed_days / stability) ** DECAY
+
+
+def next_interval(stability: float, desired_retention: float, maximum_interval: int) -> int:
+    """Intervalo en días hasta que la probabilidad de recordar baja a desired_retention."""
+    interval = stability / FACTOR * (desired_retention ** (1 / DECAY) - 1)
+    return min(max(1, round(interval)), maximum_interval)
+
+
+def memory_state_from_sm2(
+    easiness_factor: float | np.ndarray,
+    interval: int | np.ndarray,
+    parameters=DEFAULT_PARAMETERS,
+) -> FSRSState:
+    """
+    Estimar el estado FSRS de flashcards programadas hasta ahora con SM-2.
+
+    El intervalo de SM-2 se toma como la estabilidad (retención del 90 %) y la
+    dificultad se interpola entre la inicial (factor 2.5) y la máxima (factor 1.3).
+    Acepta escalares o arrays.
+    """
+    initial_difficulty = parameters[4]
+    difficulty = initial_difficulty + (INITIAL_EASINESS_FACTOR - easiness_factor) * (
+        MAX_DIFFICULTY - initial_difficulty
+    ) / (INITIAL_EASINESS_FACTOR - MIN_EASINESS_FACTOR)
+    return FSRSState(
+        np.maximum(interval, MIN_STABILITY).astype(np.float64),
+        np.clip(difficulty, MIN_DIFFICULTY, MAX_DIFFICULTY),
+    )
+
+
+def fsrs_review(
+    state: FSRSState | None,
+    grade: int,
+    elapsed_days: float,
+    parameters=DEFAULT_PARAMETERS,
+) -> FSRSState:
+    """
+    Aplicar una revisión al estado usando el algoritmo FSRS-4.5.
+
+    Args:
+        state: Estado actual (None si la flashcard nunca se ha revisado)
+        grade: 1-4 (1=fallo, 4=fácil)
+        elapsed_days: Días desde la revisión anterior
+
+    Returns:
+        El nuevo estado
+    """
+    w = parameters
+    initial_difficulty = min(max(w[4] - (grade - GOOD) * w[5], MIN_DIFFICULTY), MAX_DIFFICULTY)
+    if state is None:
+        return FSRSState(w[grade - 1], initial_difficulty)
+
+    stability, difficulty = state
+    recall = retrievability(elapsed_days, stability)
+
+    if grade > AGAIN:
+        stability = stability * (
+            1
+            + math.exp(w[8])
+            * (11 - difficulty)
+            * stability ** -w[9]
+            * (math.exp(w[10] * (1 - recall)) - 1)
+            * (w[15] if grade == HARD else 1)
+            * (w[16] if grade == EASY else 1)
+        )
+    else:
+        # Un fallo nunca aumenta la estabilidad
+        stability = min(
+            w[11]
+            * difficulty ** -w[12]
+            * ((stability + 1) ** w[13] - 1)
+            * math.exp(w[14] * (1 - recall)),
+            stability,
+        )
+
+    # Variación según la calificación, con reversión hacia la dificultad inicial
+    difficulty = w[7] * w[4] + (1 - w[7]) * (difficulty - w[6] * (grade - GOOD))
+
+    return FSRSState(
+        max(stability, MIN_STABILITY),
+        min(max(difficulty, MIN_DIFFICULTY), MAX_DIFFICULTY),
+    )
+
+
+def fsrs_review_arrays(
+    stability: np.ndarray,
+    difficulty: np.ndarray,
+    grade: np.ndarray,
+    elapsed_days: np.ndarray,
+    parameters: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Versión vectorizada de fsrs_review: aplica una revisión a cada posición de los arrays.
+
+    Una estabilidad NaN indica una flashcard sin estado (primera revisión).
+    parameters puede ser una matriz (conjuntos x parámetros): el resultado tiene
+    entonces una fila por conjunto de parámetros.
+    """
+    w = np.asarray(parameters, dtype=np.float64)
+
+    def p(index: int) -> np.ndarray:
+        return w[..., index, None]
+
+    new = np.isnan(stability)
+    initial_stability = np.take(w, grade - 1, axis=-1)
+    initial_difficulty = np.clip(p(4) - (grade - GOOD) * p(5), MIN_DIFFICULTY, MAX_DIFFICULTY)
+
+    # Valores válidos en las posiciones sin estado para no propagar NaN
+    stability = np.where(new, 1.0, stability)
+    difficulty = np.where(new, initial_difficulty, difficulty)
+    recall = (1 + FACTOR * elapsed_days / stability) ** DECAY
+
+    recalled = stability * (
+        1
+        + np.exp(p(8))
+        * (11 - difficulty)
+        * stability ** -p(9)
+        * np.expm1(p(10) * (1 - recall))
+        * np.where(grade == HARD, p(15), 1)
+        * np.where(grade == EASY, p(16), 1)
+    )
+    forgotten = np.minimum(
+        p(11)
+        * difficulty ** -p(12)
+        * ((stability + 1) ** p(13) - 1)
+        * np.exp(p(14) * (1 - recall)),
+        stability,
+    )
+    next_difficulty = p(7) * p(4) + (1 - p(7)) * (difficulty - p(6) * (grade - GOOD))
+
+    next_stability = np.maximum(np.where(grade > AGAIN, recalled, forgotten), MIN_STABILITY)
+    next_difficulty = np.clip(next_difficulty, MIN_DIFFICULTY, MAX_DIFFICULTY)
+
+    return (
+        np.where(new, initial_stability, next_stability),
+        np.where(new, initial_difficulty, next_difficulty),
+    )
+
+
+def next_interval_arrays(
+    stability: np.ndarray, desired_retention: float, maximum_interval: int
+) -> np.ndarray:
+    """Versión vectorizada de next_interval."""
+    interval = np.rint(stability / FACTOR * (desired_retention ** (1 / DECAY) - 1))
+    return np.clip(interval, 1, maximum_interval).astype(np.int64)
@@ -0,0 +1,88 @@
+from datetime import date, timedelta
+from typing import NamedTuple
+import numpy as np
+
+
+INITIAL_EASINESS_FACTOR = 2.5
+MIN_EASINESS_FACTOR = 1.3
+
+
+class SM2State(NamedTuple):
+    """Estado de repetición espaciada de una flashcard."""
+
+    easiness_factor: float
+    interval: int
+    repetitions: int
+
+
+INITIAL_STATE = SM2State(INITIAL_EASINESS_FACTOR, 0, 0)
+
+
+def sm2_review(state: SM2State, quality: int) -> SM2State:
+    """
+    Aplicar una revisión al estado usando el algoritmo SM-2.
+
+    Args:
+        state: Estado actual de la flashcard
+        quality: 0-5 (0=apagón total, 5=respuesta perfecta)
+
+    Returns:
+        El nuevo estado (el intervalo en días hasta la próxima revisión)
+    """
+    easiness_factor, interval, repetitions = state
+
+    if quality >= 3:
+        # Respuesta correcta
+        if repetitions == 0:
+            interval = 1
+        elif repetitions == 1:
+            interval = 6
+        else:
+            interval = int(interval * easiness_factor)
+
+        repetitions += 1
+    else:
+        # Respuesta incorrecta - reiniciar
+        repetitions = 0
+        interval = 1
+
+    # Actualizar el factor de facilidad
+    easiness_factor = max(
+        MIN_EASINESS_FACTOR,
+        easiness_factor + (0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)),
+    )
+
+    return SM2State(easiness_factor, interval, repetitions)
+
+
+def next_review_date(state: SM2State, today: date | None = None) -> date:
+    """Fecha de la próxima revisión según el intervalo del estado."""
+    return (today or date.today()) + timedelta(days=state.interval)
+
+
+def sm2_review_arrays(
+    easiness_factor: np.ndarray,
+    interval: np.ndarray,
+    repetitions: np.ndarray,
+    quality: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Versión vectorizada de sm2_review: aplica una revisión a cada posición de los arrays.
+
+    Produce exactamente los mismos resultados que sm2_review elemento a elemento.
+    """
+    correct = quality >= 3
+    grown = np.where(
+        repetitions == 0,
+        1,
+        np.where(repetitions == 1, 6, (interval * easiness_factor).astype(np.int64)),
+    )
+    penalty = 5 - quality
+    return (
+        np.maximum(
+            MIN_EASINESS_FACTOR,
+            easiness_factor + (0.1 - penalty * (0.08 + penalty * 0.02)),
+        ),
+        np.where(correct, grown, 1),
+        np.where(correct, repetitions + 1, 0),
+    )
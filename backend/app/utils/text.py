@@ -0,0 +1,32 @@
+import hashlib
+import re
+import string
+import unicodedata
+
+
+_PUNCTUATION = str.maketrans({char: " " for char in string.punctuation + "¿¡«»“”‘’…"})
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_answer(text: str) -> str:
+    """
+    Normalizar una respuesta para compararla con otras.
+
+    Ignora mayúsculas, acentos, signos de puntuación y espacios repetidos:
+    "  Mitocondria. " y "mitocondría" producen el mismo resultado.
+    """
+    decomposed = unicodedata.normalize("NFKD", text)
+    without_accents = "".join(
+        char for char in decomposed if not unicodedata.combining(char)
+    )
+    without_punctuation = without_accents.lower().translate(_PUNCTUATION)
+    return _WHITESPACE.sub(" ", without_punctuation).strip()
+
+
+def text_fingerprint(*parts: str) -> str:
+    """Calcular el hash SHA-256 de varios textos (separados para evitar colisiones)."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
@@ -0,0 +1,143 @@
+"""
+Microbenchmarks de las funciones puras más usadas (pytest-benchmark).
+
+Cubren la actualización SM-2 (una a una y vectorizada), GraphValidator y format_mind_map_response con
+entradas sintéticas de distintos tamaños. No necesitan base de datos.
+
+Uso:
+    python -m pytest benchmarks/bench_micro.py --benchmark-json micro.json
+"""
+
+import os
+import random
+import uuid
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+# La configuración de la aplicación exige estas variables al importar las rutas
+os.environ.setdefault("DATABASE_URL", "postgresql+asyncpg://benchmark@localhost/benchmark")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+
+from app.api.mind_maps import format_mind_map_response
+from app.models import MindMap, MindMapNode, MindMapEdge
+from app.utils.graph_validator import GraphValidator
+from app.utils.sm2 import INITIAL_STATE, SM2State, sm2_review, sm2_review_arrays
+
+
+SIZES = [10, 1_000, 10_000]
+
+
+def random_tree_edges(size: int, rng: random.Random) -> list[dict]:
+    """Aristas de un árbol aleatorio de `size` nodos (cada nodo cuelga de uno anterior)."""
+    return [
+        {"id": f"e{index}", "source": str(rng.randint(1, index)), "target": str(index + 1)}
+        for index in range(1, size)
+    ]
+
+
+def build_mind_map(size: int, rng: random.Random) -> MindMap:
+    """Mapa mental transitorio (sin sesión) con `size` nodos."""
+    mind_map_id = uuid.uuid4()
+    now = datetime.utcnow()
+    nodes = [
+        MindMapNode(
+            mind_map_id=mind_map_id,
+            node_id=str(index),
+            label=f"Concepto {index}",
+            content=f"Descripción del concepto {index}",
+            position_x=rng.uniform(0, 1000) if index % 2 else None,
+            position_y=rng.uniform(0, 1000) if index % 2 else None,
+            level=min(index, 3),
+        )
+        for index in range(1, size + 1)
+    ]
+    edges = [
+        MindMapEdge(
+            mind_map_id=mind_map_id,
+            edge_id=edge["id"],
+            source_node_id=edge["source"],
+            target_node_id=edge["target"],
+        )
+        for edge in random_tree_edges(size, rng)
+    ]
+    return MindMap(
+        id=mind_map_id,
+        title="Benchmark",
+        pdf_filename="benchmark.pdf",
+        nodes=nodes,
+        edges=edges,
+        created_at=now,
+        updated_at=now,
+    )
+
+
+def test_sm2_review_single(benchmark):
+    state = SM2State(2.5, 6, 2)
+    benchmark(sm2_review, state, 4)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_sm2_review_sequence(benchmark, size):
+    rng = random.Random(size)
+    qualities = [rng.randint(0, 5) for _ in range(size)]
+
+    def run():
+        state = INITIAL_STATE
+        for quality in qualities:
+            state = sm2_review(state, quality)
+        return state
+
+    benchmark(run)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_sm2_review_deck_loop(benchmark, size):
+    rng = random.Random(size)
+    states = [SM2State(rng.uniform(1.3, 3.0), rng.randint(0, 60), rng.randint(0, 8)) for _ in range(size)]
+    qualities = [rng.randint(0, 5) for _ in range(size)]
+
+    benchmark(lambda: [sm2_review(s, q) for s, q in zip(states, qualities)])
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_sm2_review_deck_vectorized(benchmark, size):
+    rng = np.random.default_rng(size)
+    easiness_factor = rng.uniform(1.3, 3.0, size)
+    interval = rng.integers(0, 61, size)
+    repetitions = rng.integers(0, 9, size)
+    qualities = rng.integers(0, 6, size)
+
+    benchmark(sm2_review_arrays, easiness_factor, interval, repetitions, qualities)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_graph_edges_to_set(benchmark, size):
+    edges = random_tree_edges(size, random.Random(size))
+    result = benchmark(GraphValidator.edges_to_set, edges)
+    assert len(result) == size - 1
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_graph_calculate_score(benchmark, size):
+    rng = random.Random(size)
+    original = random_tree_edges(size, rng)
+    # Una partida típica: la mayoría de aristas correctas, algunas invertidas
+    submitted = [
+        {"source": edge["target"], "target": edge["source"]}
+        if rng.random() < 0.3
+        else {"source": edge["source"], "target": edge["target"]}
+        for edge in original
+        if rng.random() < 0.8
+    ]
+    benchmark(GraphValidator.calculate_score, original, submitted)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_format_mind_map_response(benchmark, size):
+    mind_map = build_mind_map(size, random.Random(size))
+    result = benchmark(format_mind_map_response, mind_map)
+    assert len(result["nodes"]) == size
@@ -0,0 +1,202 @@
+"""
+Comprobación de planes de consulta (EXPLAIN) de las consultas más usadas.
+
+Siembra un conjunto de datos, ejecuta los métodos reales de los servicios
+capturando el SQL que emiten y pide a PostgreSQL el plan de cada sentencia.
+Falla (código de salida 1) si alguna consulta no usa los índices esperados;
+tests/test_query_plans.py ejecuta la misma comprobación con pytest.
+
+Uso:
+    python -m benchmarks.explain --users 200 --output plans.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+os.environ.setdefault("AI_PROVIDER", "fake")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import AsyncSessionLocal, engine
+from app.services.flashcard_service import FlashcardService
+from app.services.game_service import GameService
+from app.services.mind_map_service import MindMapService
+from app.services.stats_service import study_stats
+from benchmarks.seed import SeedData, SeedScale, remove_seed_data, seed_database
+
+
+@dataclass
+class PlanCheck:
+    name: str
+    run: Callable[[AsyncSession, SeedData], Awaitable]
+    expected_indexes: set[str]
+
+
+def plan_checks() -> list[PlanCheck]:
+    # Los servicios no usan la IA en estas consultas
+    flashcards = FlashcardService(ai_service=object())
+    mind_maps = MindMapService(ai_service=object())
+    games = GameService()
+
+    return [
+        PlanCheck(
+            "list_mind_maps",
+            lambda db, data: mind_maps.get_user_mind_maps(db, data.users[0].id),
+            {"ix_mind_maps_user_id_created_at"},
+        ),
+        PlanCheck(
+            "get_mind_map",
+            lambda db, data: mind_maps.get_mind_map_by_id(
+                db, data.users[0].mind_maps[0].id, data.users[0].id
+            ),
+            {"uq_mind_map_node", "uq_mind_map_edge"},
+        ),
+        PlanCheck(
+            "list_game_sessions",
+            lambda db, data: games.get_user_game_sessions(db, data.users[0].id),
+            {"ix_game_sessions_user_id_created_at"},
+        ),
+        PlanCheck(
+            "flashcards_for_mind_map",
+            lambda db, data: flashcards.get_flashcards_for_mind_map(
+                db, data.users[0].mind_maps[0].id
+            ),
+            {"ix_flashcards_mind_map_id_created_at"},
+        ),
+        PlanCheck(
+            "due_queue",
+            lambda db, data: flashcards.get_due_flashcards(db, data.users[0].id),
+            {"ix_mind_maps_user_id_created_at", "ix_flashcards_mind_map_id_created_at"},
+        ),
+        PlanCheck(
+            "due_count",
+            lambda db, data: flashcards.count_due_flashcards(db, data.users[0].id),
+            {"ix_mind_maps_user_id_created_at", "ix_flashcards_mind_map_id_created_at"},
+        ),
+        PlanCheck(
+            "study_stats",
+            lambda db, data: study_stats.get_stats(db, data.users[0].id),
+            {"study_stats_pkey", "flashcard_due_counts_pkey"},
+        ),
+    ]
+
+
+def plan_nodes(plan: dict):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+async def capture_statements(check: PlanCheck, data: SeedData) -> list[tuple]:
+    """Ejecutar la consulta del servicio y devolver las sentencias SQL emitidas."""
+    statements = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", on_execute)
+    try:
+        async with AsyncSessionLocal() as db:
+            await check.run(db, data)
+            await db.rollback()
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", on_execute)
+    return statements
+
+
+async def explain(statement: str, parameters) -> dict:
+    async with engine.connect() as conn:
+        result = await conn.exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {statement}", parameters
+        )
+        return result.scalar()[0]["Plan"]
+
+
+async def run_checks(scale: SeedScale, seed: int = 0) -> dict:
+    """Sembrar datos de la escala indicada y comprobar el plan de cada consulta."""
+    data = await seed_database(scale, random.Random(seed))
+
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(text("ANALYZE"))
+
+        results = {}
+        for check in plan_checks():
+            plans = []
+            used_indexes: set[str] = set()
+            for statement, parameters in await capture_statements(check, data):
+                plan = await explain(statement, parameters)
+                nodes = list(plan_nodes(plan))
+                used_indexes.update(n["Index Name"] for n in nodes if "Index Name" in n)
+                plans.append(
+                    {
+                        "statement": statement,
+                        "total_cost": plan["Total Cost"],
+                        "indexes": sorted(n["Index Name"] for n in nodes if "Index Name" in n),
+                        "seq_scans": sorted(
+                            n["Relation Name"] for n in nodes if n["Node Type"] == "Seq Scan"
+                        ),
+                    }
+                )
+
+            missing = check.expected_indexes - used_indexes
+            results[check.name] = {
+                "ok": not missing,
+                "expected_indexes": sorted(check.expected_indexes),
+                "missing_indexes": sorted(missing),
+                "plans": plans,
+            }
+    finally:
+        await remove_seed_data(data)
+        await engine.dispose()
+
+    return {
+        "benchmark": "explain",
+        "scale": vars(scale),
+        "ok": all(result["ok"] for result in results.values()),
+        "checks": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--maps-per-user", type=int, default=5)
+    parser.add_argument("--nodes-per-map", type=int, default=15)
+    parser.add_argument("--cards-per-map", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Archivo JSON de salida (por defecto, stdout)")
+    args = parser.parse_args()
+
+    scale = SeedScale(
+        users=args.users,
+        maps_per_user=args.maps_per_user,
+        nodes_per_map=args.nodes_per_map,
+        cards_per_map=args.cards_per_map,
+    )
+    results = asyncio.run(run_checks(scale, args.seed))
+    output = json.dumps(results, indent=2, ensure_ascii=False)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        sys.stdout.write(output + "\n")
+
+    for name, result in results["checks"].items():
+        if not result["ok"]:
+            sys.stderr.write(
+                f"{name}: no usa {', '.join(result['missing_indexes'])}\n"
+            )
+    sys.exit(0 if results["ok"] else 1)
+
+
+if __name__ == "__main__":
+    main()
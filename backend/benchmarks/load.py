@@ -0,0 +1,323 @@
+"""
+Benchmark de carga de extremo a extremo para la API de MapIT.
+
+Arranca app.main:app en proceso (httpx + ASGI) contra la base de datos
+configurada en DATABASE_URL y el proveedor de IA simulado, siembra datos y
+ejecuta una mezcla de operaciones con usuarios virtuales concurrentes. El
+resultado (latencias p50/p95/p99, throughput y consultas SQL por operación) se
+emite como JSON para comparar versiones.
+
+Uso:
+    python -m benchmarks.load --users 20 --duration 30 --output results.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+# El proveedor simulado debe configurarse antes de importar la aplicación
+os.environ.setdefault("AI_PROVIDER", "fake")
+os.environ.setdefault("AI_FAKE_LATENCY_MS", "300")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+
+import fitz  # PyMuPDF
+import httpx
+from app.database import engine
+from app.main import app
+from benchmarks.metrics import LatencyRecorder, QueryCounter, Timer, current_operation
+from benchmarks.seed import (
+    BENCHMARK_PASSWORD,
+    SeedData,
+    SeedScale,
+    SeededUser,
+    remove_seed_data,
+    seed_database,
+)
+
+
+DEFAULT_MIX = {
+    "login": 1,
+    "list_mind_maps": 15,
+    "get_mind_map": 20,
+    "due_flashcards": 20,
+    "review_flashcard": 25,
+    "game_complete": 8,
+    "study_stats": 10,
+    "upload": 1,
+}
+
+JOB_POLL_INTERVAL_SECONDS = 0.2
+
+
+def parse_mix(value: str) -> dict[str, int]:
+    """Parsear una mezcla "operacion=peso,operacion=peso"."""
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        if name not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"Operación desconocida: {name}")
+        mix[name] = int(weight or 1)
+    return mix
+
+
+def build_pdf(rng: random.Random, pages: int = 3) -> bytes:
+    """Generar un PDF con texto para las subidas."""
+    doc = fitz.open()
+    for page_number in range(pages):
+        page = doc.new_page()
+        sentences = [
+            f"El concepto {rng.randint(1, 10_000)} de la página {page_number} "
+            "describe un proceso relevante para el estudio."
+            for _ in range(20)
+        ]
+        page.insert_textbox(page.rect + (50, 50, -50, -50), "\n".join(sentences))
+    content = doc.tobytes()
+    doc.close()
+    return content
+
+
+class VirtualUser:
+    """Usuario virtual que ejecuta operaciones de la mezcla."""
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        user: SeededUser,
+        recorder: LatencyRecorder,
+        rng: random.Random,
+    ):
+        self.client = client
+        self.user = user
+        self.recorder = recorder
+        self.rng = rng
+        self.headers: dict[str, str] = {}
+
+    async def request(self, operation: str, method: str, url: str, **kwargs) -> httpx.Response:
+        token = current_operation.set(operation)
+        try:
+            with Timer() as timer:
+                response = await self.client.request(
+                    method, url, headers=self.headers, **kwargs
+                )
+        finally:
+            current_operation.reset(token)
+        self.recorder.record(operation, timer.elapsed, response.status_code)
+        return response
+
+    def pick_mind_map(self):
+        return self.rng.choice(self.user.mind_maps)
+
+    async def login(self) -> None:
+        response = await self.request(
+            "login",
+            "POST",
+            "/api/auth/login",
+            data={"username": self.user.email, "password": BENCHMARK_PASSWORD},
+        )
+        response.raise_for_status()
+        self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    async def list_mind_maps(self) -> None:
+        await self.request("list_mind_maps", "GET", "/api/mind-maps")
+
+    async def get_mind_map(self) -> None:
+        await self.request("get_mind_map", "GET", f"/api/mind-maps/{self.pick_mind_map().id}")
+
+    async def due_flashcards(self) -> None:
+        params = {}
+        if self.rng.random() < 0.5:
+            params["mind_map_id"] = str(self.pick_mind_map().id)
+        await self.request("due_flashcards", "GET", "/api/flashcards/due", params=params)
+
+    async def review_flashcard(self) -> None:
+        flashcard_id = self.rng.choice(self.pick_mind_map().flashcard_ids)
+        await self.request(
+            "review_flashcard",
+            "POST",
+            f"/api/flashcards/{flashcard_id}/review",
+            json={"quality": self.rng.randint(0, 5)},
+        )
+
+    async def study_stats(self) -> None:
+        params = {}
+        if self.rng.random() < 0.5:
+            params["mind_map_id"] = str(self.pick_mind_map().id)
+        await self.request("study_stats", "GET", "/api/stats", params=params)
+
+    async def game_complete(self) -> None:
+        mind_map = self.pick_mind_map()
+        response = await self.request(
+            "game_start", "POST", "/api/game/sessions", json={"mind_map_id": str(mind_map.id)}
+        )
+        if response.status_code >= 400:
+            return
+
+        # Enviar una parte de las aristas correctas
+        edges = [
+            {"source": edge["source"], "target": edge["target"]}
+            for edge in mind_map.edges
+            if self.rng.random() < 0.8
+        ]
+        await self.request(
+            "game_complete",
+            "PUT",
+            f"/api/game/sessions/{response.json()['id']}",
+            json={"edges": edges, "time_elapsed_seconds": self.rng.randint(30, 300)},
+        )
+
+    async def upload(self) -> None:
+        pdf = build_pdf(self.rng)
+        response = await self.request(
+            "upload",
+            "POST",
+            "/api/mind-maps",
+            files={"file": ("benchmark.pdf", pdf, "application/pdf")},
+        )
+        if response.status_code >= 400:
+            return
+
+        # Tiempo total hasta que el trabajo termina (extracción + IA + guardado)
+        job_url = f"/api/jobs/{response.json()['id']}"
+        with Timer() as timer:
+            while True:
+                job = await self.client.get(job_url, headers=self.headers)
+                status = job.json().get("status")
+                if status in ("completed", "failed"):
+                    break
+                await asyncio.sleep(JOB_POLL_INTERVAL_SECONDS)
+        self.recorder.record("upload_job", timer.elapsed, 200 if status == "completed" else 500)
+
+
+async def run_virtual_user(
+    virtual_user: VirtualUser, mix: dict[str, int], deadline: float
+) -> None:
+    operations = list(mix)
+    weights = [mix[operation] for operation in operations]
+
+    await virtual_user.login()
+    while time.perf_counter() < deadline:
+        operation = virtual_user.rng.choices(operations, weights)[0]
+        await getattr(virtual_user, operation)()
+
+
+async def run_benchmark(args: argparse.Namespace) -> dict:
+    rng = random.Random(args.seed)
+    scale = SeedScale(
+        users=args.users,
+        maps_per_user=args.maps_per_user,
+        nodes_per_map=args.nodes_per_map,
+        cards_per_map=args.cards_per_map,
+    )
+
+    # Los logs por solicitud distorsionan la medición
+    for name in ("mapit", "http"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    await app.router.startup()
+    seed_started_at = time.perf_counter()
+    data: SeedData = await seed_database(scale, rng)
+    seed_seconds = time.perf_counter() - seed_started_at
+
+    recorder = LatencyRecorder()
+    # Los errores de la aplicación se registran como respuestas 500 en lugar de abortar
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+
+    try:
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://benchmark", timeout=None
+        ) as client:
+            virtual_users = [
+                VirtualUser(
+                    client,
+                    data.users[index % len(data.users)],
+                    recorder,
+                    random.Random(rng.random()),
+                )
+                for index in range(args.concurrency)
+            ]
+
+            with QueryCounter(engine) as queries:
+                started_at = time.perf_counter()
+                deadline = started_at + args.duration
+                await asyncio.gather(
+                    *(run_virtual_user(vu, args.mix, deadline) for vu in virtual_users)
+                )
+                elapsed = time.perf_counter() - started_at
+    finally:
+        if not args.keep_data:
+            await remove_seed_data(data)
+        await app.router.shutdown()
+
+    return {
+        "benchmark": "load",
+        "started_at": datetime.utcnow().isoformat(),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "config": {
+            "duration_seconds": args.duration,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+            "mix": args.mix,
+            "scale": vars(scale),
+            "ai_provider": os.environ.get("AI_PROVIDER"),
+            "ai_fake_latency_ms": float(os.environ.get("AI_FAKE_LATENCY_MS", 0)),
+        },
+        "seed_seconds": round(seed_seconds, 3),
+        "elapsed_seconds": round(elapsed, 3),
+        **recorder.summary(elapsed, queries),
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--users", type=int, default=20, help="Usuarios sembrados")
+    parser.add_argument("--maps-per-user", type=int, default=3)
+    parser.add_argument("--nodes-per-map", type=int, default=15)
+    parser.add_argument("--cards-per-map", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=20, help="Usuarios virtuales")
+    parser.add_argument("--duration", type=float, default=30, help="Segundos de carga")
+    parser.add_argument(
+        "--mix",
+        type=parse_mix,
+        default=DEFAULT_MIX,
+        help="Pesos por operación, p. ej. get_mind_map=5,review_flashcard=3",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Archivo JSON de salida (por defecto, stdout)")
+    parser.add_argument(
+        "--keep-data", action="store_true", help="No borrar los datos sembrados al terminar"
+    )
+    args = parser.parse_args()
+
+    results = asyncio.run(run_benchmark(args))
+    output = json.dumps(results, indent=2, ensure_ascii=False)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        sys.stdout.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+# Operación en curso; las consultas ejecutadas fuera de una operación (workers de
+# trabajos en segundo plano) se cuentan como "background"
+current_operation: ContextVar[str] = ContextVar("current_operation", default="background")
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """Percentil por interpolación lineal (values debe estar ordenada)."""
+    if not values:
+        return 0.0
+    position = (len(values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+class QueryCounter:
+    """Cuenta las sentencias SQL ejecutadas por operación."""
+
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine.sync_engine
+        self.counts: dict[str, int] = defaultdict(int)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.counts[current_operation.get()] += 1
+
+    def __enter__(self) -> "QueryCounter":
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+
+
+class LatencyRecorder:
+    """Registra la latencia y los errores de cada operación."""
+
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+        self.status_codes: dict[str, dict[int, int]] = defaultdict(lambda: defaultdict(int))
+
+    def record(self, operation: str, seconds: float, status_code: int) -> None:
+        self.latencies[operation].append(seconds)
+        self.status_codes[operation][status_code] += 1
+        if status_code >= 400:
+            self.errors[operation] += 1
+
+    def summary(self, elapsed: float, queries: QueryCounter) -> dict:
+        """Resumen por operación: percentiles en ms, throughput y consultas por solicitud."""
+        operations = {}
+        for operation, latencies in sorted(self.latencies.items()):
+            ordered = sorted(latencies)
+            count = len(ordered)
+            operations[operation] = {
+                "count": count,
+                "errors": self.errors[operation],
+                "status_codes": dict(self.status_codes[operation]),
+                "throughput_rps": round(count / elapsed, 3),
+                "mean_ms": round(sum(ordered) / count * 1000, 2),
+                "p50_ms": round(percentile(ordered, 0.50) * 1000, 2),
+                "p95_ms": round(percentile(ordered, 0.95) * 1000, 2),
+                "p99_ms": round(percentile(ordered, 0.99) * 1000, 2),
+                "max_ms": round(ordered[-1] * 1000, 2),
+                "queries": queries.counts.get(operation, 0),
+                "queries_per_request": round(queries.counts.get(operation, 0) / count, 2),
+            }
+
+        total = sum(len(latencies) for latencies in self.latencies.values())
+        return {
+            "operations": operations,
+            "total": {
+                "count": total,
+                "errors": sum(self.errors.values()),
+                "throughput_rps": round(total / elapsed, 3) if elapsed else 0.0,
+                "queries": sum(queries.counts.values()),
+                "background_queries": queries.counts.get("background", 0),
+            },
+        }
+
+
+class Timer:
+    """Cronómetro para medir una operación."""
+
+    def __enter__(self) -> "Timer":
+        self.started_at = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.elapsed = time.perf_counter() - self.started_at
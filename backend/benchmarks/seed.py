@@ -0,0 +1,207 @@
+import random
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from sqlalchemy import delete, insert
+from app.database import AsyncSessionLocal
+from app.models import (
+    User,
+    MindMap,
+    MindMapNode,
+    MindMapEdge,
+    Flashcard,
+    FlashcardProgress,
+    GameSession,
+)
+from app.services.stats_service import study_stats
+from app.utils.security import get_password_hash
+
+
+BENCHMARK_PASSWORD = "benchmark-password"
+
+
+@dataclass
+class SeedScale:
+    """Volumen de datos a sembrar."""
+
+    users: int = 20
+    maps_per_user: int = 3
+    nodes_per_map: int = 15
+    cards_per_map: int = 10
+    reviewed_fraction: float = 0.5
+    games_per_map: int = 2
+
+
+@dataclass
+class SeededMindMap:
+    id: uuid.UUID
+    edges: list[dict]
+    flashcard_ids: list[uuid.UUID]
+
+
+@dataclass
+class SeededUser:
+    id: uuid.UUID
+    email: str
+    mind_maps: list[SeededMindMap] = field(default_factory=list)
+
+
+@dataclass
+class SeedData:
+    run_id: str
+    users: list[SeededUser]
+
+
+async def seed_database(scale: SeedScale, rng: random.Random) -> SeedData:
+    """
+    Sembrar usuarios, mapas mentales, flashcards, progreso y partidas.
+
+    Se insertan en bloque (una sentencia por tabla) para que la siembra no
+    domine el tiempo del benchmark. Todos los usuarios comparten la contraseña
+    BENCHMARK_PASSWORD.
+    """
+    run_id = uuid.uuid4().hex[:8]
+    hashed_password = get_password_hash(BENCHMARK_PASSWORD)
+    now = datetime.utcnow()
+    today = date.today()
+
+    users, mind_maps, nodes, edges = [], [], [], []
+    flashcards, progress, games = [], [], []
+    seeded_users = []
+
+    for user_index in range(scale.users):
+        user_id = uuid.uuid4()
+        email = f"bench-{run_id}-{user_index}@example.com"
+        users.append(
+            {
+                "id": user_id,
+                "email": email,
+                "hashed_password": hashed_password,
+                "full_name": f"Benchmark {user_index}",
+                "created_at": now,
+                "updated_at": now,
+            }
+        )
+        seeded_user = SeededUser(id=user_id, email=email)
+
+        for map_index in range(scale.maps_per_user):
+            mind_map_id = uuid.uuid4()
+            created_at = now - timedelta(days=rng.randint(0, 60))
+            mind_maps.append(
+                {
+                    "id": mind_map_id,
+                    "user_id": user_id,
+                    "title": f"Mapa {map_index} de {email}",
+                    "pdf_filename": f"documento-{map_index}.pdf",
+                    "pdf_content_hash": uuid.uuid4().hex * 2,
+                    "created_at": created_at,
+                    "updated_at": created_at,
+                }
+            )
+
+            # Árbol: cada nodo cuelga de uno anterior
+            map_edges = []
+            for node_index in range(1, scale.nodes_per_map + 1):
+                nodes.append(
+                    {
+                        "id": uuid.uuid4(),
+                        "mind_map_id": mind_map_id,
+                        "node_id": str(node_index),
+                        "label": f"Concepto {node_index}",
+                        "content": f"Descripción del concepto {node_index}",
+                        "level": 0 if node_index == 1 else 1 + (node_index > 5),
+                        "created_at": created_at,
+                    }
+                )
+                if node_index > 1:
+                    edge = {
+                        "id": f"e{node_index - 1}",
+                        "source": str(rng.randint(1, node_index - 1)),
+                        "target": str(node_index),
+                    }
+                    map_edges.append(edge)
+                    edges.append(
+                        {
+                            "id": uuid.uuid4(),
+                            "mind_map_id": mind_map_id,
+                            "edge_id": edge["id"],
+                            "source_node_id": edge["source"],
+                            "target_node_id": edge["target"],
+                            "created_at": created_at,
+                        }
+                    )
+
+            flashcard_ids = []
+            for card_index in range(scale.cards_per_map):
+                flashcard_id = uuid.uuid4()
+                flashcard_ids.append(flashcard_id)
+                flashcards.append(
+                    {
+                        "id": flashcard_id,
+                        "mind_map_id": mind_map_id,
+                        "question": f"¿Qué es el concepto {card_index}?",
+                        "answer": f"El concepto {card_index} es una idea del mapa {map_index}",
+                        "created_at": created_at,
+                    }
+                )
+                if rng.random() < scale.reviewed_fraction:
+                    progress.append(
+                        {
+                            "id": uuid.uuid4(),
+                            "user_id": user_id,
+                            "flashcard_id": flashcard_id,
+                            "easiness_factor": round(rng.uniform(1.3, 2.8), 2),
+                            "interval": rng.randint(1, 30),
+                            "repetitions": rng.randint(1, 6),
+                            "next_review_date": today + timedelta(days=rng.randint(-5, 10)),
+                            "last_reviewed_at": now - timedelta(days=rng.randint(1, 30)),
+                            "created_at": now,
+                            "updated_at": now,
+                        }
+                    )
+
+            for _ in range(scale.games_per_map):
+                games.append(
+                    {
+                        "id": uuid.uuid4(),
+                        "user_id": user_id,
+                        "mind_map_id": mind_map_id,
+                        "score": rng.randint(0, 100),
+                        "completed": True,
+                        "time_elapsed_seconds": rng.randint(30, 600),
+                        "created_at": created_at,
+                        "completed_at": created_at,
+                    }
+                )
+
+            seeded_user.mind_maps.append(
+                SeededMindMap(id=mind_map_id, edges=map_edges, flashcard_ids=flashcard_ids)
+            )
+
+        seeded_users.append(seeded_user)
+
+    async with AsyncSessionLocal() as db:
+        for model, rows in (
+            (User, users),
+            (MindMap, mind_maps),
+            (MindMapNode, nodes),
+            (MindMapEdge, edges),
+            (Flashcard, flashcards),
+            (FlashcardProgress, progress),
+            (GameSession, games),
+        ):
+            if rows:
+                await db.execute(insert(model), rows)
+        await db.commit()
+
+        # Contadores de study_stats de los usuarios sembrados
+        await study_stats.rebuild(db, [user.id for user in seeded_users])
+
+    return SeedData(run_id=run_id, users=seeded_users)
+
+
+async def remove_seed_data(data: SeedData) -> None:
+    """Eliminar los usuarios sembrados (el resto se borra en cascada)."""
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(User).where(User.id.in_([user.id for user in data.users])))
+        await db.commit()
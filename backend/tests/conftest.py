@@ -0,0 +1,6 @@
+import os
+
+# La configuración de la aplicación exige estas variables al importarla; las
+# pruebas que necesitan PostgreSQL se omiten si la base de datos no responde
+os.environ.setdefault("DATABASE_URL", "postgresql+asyncpg://test@localhost/test")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
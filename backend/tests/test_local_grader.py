@@ -0,0 +1,52 @@
+import pytest
+from app.services.local_grader import LocalGrader
+
+
+@pytest.fixture
+def grader():
+    return LocalGrader(accept_threshold=0.8, reject_threshold=0.15, max_edit_chars=300)
+
+
+@pytest.mark.parametrize(
+    "correct, user",
+    [
+        ("La mitocondria produce ATP", "La mitocondria no produce ATP"),
+        ("El ADN es una doble hélice", "El ARN es una doble hélice"),
+        ("Solución hipotónica", "Solución hipertónica"),
+        ("Reacción exotérmica", "Reacción endotérmica"),
+        ("Siempre se conserva la energía", "Nunca se conserva la energía"),
+        ("La mitocondria produce ATP", "ATP produce la mitocondria y glucosa"),
+        ("En 1945", "En 1946"),
+        ("Colón llegó en 1492", "Colón llegó en 1493"),
+        ("12000", "13000"),
+        ("Absorción", "Adsorción"),
+        ("Bajo", "Baja"),
+    ],
+)
+def test_meaning_changes_are_not_accepted(grader, correct, user):
+    evaluation = grader.grade(correct, user)
+    assert evaluation is None or evaluation["quality"] < 3
+
+
+@pytest.mark.parametrize(
+    "correct, user",
+    [
+        ("La mitocondria produce ATP", "la mitocondira produce ATP"),
+        ("Fotosíntesis", "fotosintesys"),
+        ("La mitocondria produce ATP", "mitocondria produce el ATP"),
+        ("La fotosíntesis ocurre en el cloroplasto", "La fotosintesis ocurre en el cloroplato"),
+        ("El núcleo contiene el ADN", "El nucelo contiene el ADN"),
+        ("Célula vegetal", "Célula begetal"),
+    ],
+)
+def test_typos_are_accepted(grader, correct, user):
+    assert grader.grade(correct, user)["quality"] == 4
+
+
+def test_exact_answer_is_perfect(grader):
+    assert grader.grade("Mitocondria", "  mitocondría. ")["quality"] == 5
+
+
+def test_empty_and_unrelated_answers_are_rejected(grader):
+    assert grader.grade("Mitocondria", "")["quality"] == 0
+    assert grader.grade("La mitocondria produce ATP", "Pythagoras")["quality"] == 1
@@ -0,0 +1,29 @@
+import asyncio
+import pytest
+from sqlalchemy import text
+from app.database import engine
+from benchmarks.explain import plan_checks, run_checks
+from benchmarks.seed import SeedScale
+
+
+async def _ping() -> None:
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    finally:
+        await engine.dispose()
+
+
+@pytest.fixture(scope="module")
+def plan_results():
+    try:
+        asyncio.run(_ping())
+    except Exception as e:
+        pytest.skip(f"PostgreSQL no disponible: {e}")
+    return asyncio.run(run_checks(SeedScale(users=200, maps_per_user=5, cards_per_map=20)))
+
+
+@pytest.mark.parametrize("name", [check.name for check in plan_checks()])
+def test_query_uses_expected_indexes(plan_results, name):
+    result = plan_results["checks"][name]
+    assert not result["missing_indexes"], f"{name} no usa {result['missing_indexes']}"
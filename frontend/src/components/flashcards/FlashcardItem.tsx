@@ -47,9 +47,20 @@ export function FlashcardItem({
 
     setIsEvaluating(true);
     try {
-      const evaluation = await flashcardService.evaluateAnswer(
+      const evaluation = await flashcardService.evaluateAnswerStream(
         flashcard.id,
-        userAnswer
+        userAnswer,
+        {
+          // Mostrar la calificación en cuanto llega y completar la retroalimentación
+          onScore: (score) => {
+            setAiEvaluation({ ...score, feedback: "" });
+            setShowAnswer(true);
+          },
+          onFeedback: (text) =>
+            setAiEvaluation((current) =>
+              current ? { ...current, feedback: current.feedback + text } : current
+            ),
+        }
       );
       setAiEvaluation(evaluation);
       setShowAnswer(true);
@@ -64,8 +64,9 @@ export function useDueFlashcards(mindMapId?: string) {
     setLoading(true);
     setError(null);
     try {
+      // Solo la primera página de la cola: una sesión de estudio
       const data = await flashcardService.getDueFlashcards(mindMapId);
-      setDueFlashcards(data);
+      setDueFlashcards(data.items);
     } catch (err: any) {
       setError(err.response?.data?.detail || "Error loading due flashcards");
     } finally {
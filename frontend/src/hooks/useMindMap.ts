@@ -34,7 +34,7 @@ export function useMindMap(id?: string) {
       setMindMap(data);
       return data;
     } catch (err: any) {
-      setError(err.response?.data?.detail || "Error uploading PDF");
+      setError(err.response?.data?.detail || err.message || "Error uploading PDF");
       throw err;
     } finally {
       setLoading(false);
@@ -4,7 +4,8 @@ import { useMindMaps } from '../hooks/useMindMap';
 import { Button } from '../components/ui/button';
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '../components/ui/card';
 import { mindMapService } from '../services/mindMapService';
-import { flashcardService } from '../services/flashcardService';
+import { statsService } from '../services/statsService';
+import type { StudyStats } from '../types/stats';
 import { format } from 'date-fns';
 import { es } from 'date-fns/locale';
 
@@ -12,32 +13,28 @@ export function Dashboard() {
   const { mindMaps, loading, error, reload } = useMindMaps();
   const [uploading, setUploading] = useState(false);
   const [uploadError, setUploadError] = useState('');
-  const [dueFlashcardCounts, setDueFlashcardCounts] = useState<Record<string, number>>({});
+  const [studyStats, setStudyStats] = useState<StudyStats | null>(null);
 
-  // Cargar el conteo de flashcards vencidas para cada mapa mental
+  // Cargar los contadores de estudio de todos los mapas mentales en una sola solicitud
   useEffect(() => {
-    const loadDueFlashcardCounts = async () => {
+    const loadStudyStats = async () => {
       if (mindMaps.length === 0) return;
-      
-      const counts: Record<string, number> = {};
-      
-      await Promise.all(
-        mindMaps.map(async (mindMap) => {
-          try {
-            const dueFlashcards = await flashcardService.getDueFlashcards(mindMap.id);
-            counts[mindMap.id] = dueFlashcards.length;
-          } catch (err) {
-            counts[mindMap.id] = 0;
-          }
-        })
-      );
-      
-      setDueFlashcardCounts(counts);
+
+      try {
+        setStudyStats(await statsService.getStats());
+      } catch (err) {
+        setStudyStats(null);
+      }
     };
-    
-    loadDueFlashcardCounts();
+
+    loadStudyStats();
   }, [mindMaps]);
 
+  // Flashcards pendientes hoy (repasos y nuevas) de cada mapa mental
+  const dueFlashcardCounts: Record<string, number> = Object.fromEntries(
+    (studyStats?.mind_maps ?? []).map((stats) => [stats.mind_map_id, stats.available_today])
+  );
+
   const handleFileUpload = async (e: React.ChangeEvent<HTMLInputElement>) => {
     const file = e.target.files?.[0];
     if (!file) return;
@@ -50,7 +47,7 @@ export function Dashboard() {
       reload();
       e.target.value = '';
     } catch (err: any) {
-      setUploadError(err.response?.data?.detail || 'Error al subir PDF');
+      setUploadError(err.response?.data?.detail || err.message || 'Error al subir PDF');
     } finally {
       setUploading(false);
     }
@@ -60,7 +57,17 @@ export function Dashboard() {
     <div className="container mx-auto px-4 space-y-8">
       <div>
         <div className="flex flex-col sm:flex-row sm:items-center sm:justify-between gap-4 mb-4">
-          <h2 className="text-2xl font-semibold">Tus Mapas Mentales</h2>
+          <div>
+            <h2 className="text-2xl font-semibold">Tus Mapas Mentales</h2>
+            {studyStats && (
+              <p className="text-sm text-muted-foreground">
+                {studyStats.totals.due_today} para repasar hoy · {studyStats.totals.new} nuevas ·{' '}
+                {studyStats.totals.learning} en aprendizaje · {studyStats.totals.mature} dominadas ·{' '}
+                {studyStats.totals.games_completed} partida{studyStats.totals.games_completed !== 1 ? 's' : ''}
+                {studyStats.totals.average_score !== null && ` (media ${studyStats.totals.average_score}%)`}
+              </p>
+            )}
+          </div>
           
           <div className="space-y-2">
             <input
@@ -3,6 +3,7 @@ import { useParams, Link, useNavigate } from 'react-router-dom';
 import { useMindMap } from '../hooks/useMindMap';
 import { GameBoard } from '../components/game/GameBoard';
 import { gameService } from '../services/gameService';
+import { statsService } from '../services/statsService';
 import { Button } from '../components/ui/button';
 import { Card, CardContent, CardHeader, CardTitle } from '../components/ui/card';
 import LogoMapit from '../assets/LogoMapit.svg';
@@ -22,26 +23,12 @@ export function GamePage() {
       if (!id) return;
       
       try {
-        const sessions = await gameService.listGameSessions(id, 100);
-        const completedSessions = sessions.filter(s => s.completed && s.score !== null);
-        
-        if (completedSessions.length > 0) {
-          // Encontrar la sesión con mejor puntaje
-          const best = completedSessions.reduce((prev, current) => {
-            // Priorizar por puntaje, y en caso de empate, por menor tiempo
-            if (current.score > prev.score) return current;
-            if (current.score === prev.score && 
-                current.time_elapsed_seconds !== null && 
-                prev.time_elapsed_seconds !== null &&
-                current.time_elapsed_seconds < prev.time_elapsed_seconds) {
-              return current;
-            }
-            return prev;
-          });
-          
+        const { totals } = await statsService.getStats(id);
+
+        if (totals.best_score !== null) {
           setBestScore({
-            score: best.score,
-            time: best.time_elapsed_seconds || 0
+            score: totals.best_score,
+            time: totals.best_time_seconds || 0
           });
         }
       } catch (error) {
@@ -1,10 +1,14 @@
 import api from "./api";
+import { storage } from "../utils/storage";
 import type {
   Flashcard,
   FlashcardProgress,
+  FlashcardDueQueue,
+  FlashcardDueCount,
   FlashcardReview,
   FlashcardAnswerSubmission,
   AIEvaluationResponse,
+  AIEvaluationStreamHandlers,
 } from "../types/flashcard";
 
 export const flashcardService = {
@@ -27,8 +31,23 @@ export const flashcardService = {
     return response.data;
   },
 
-  async getDueFlashcards(mindMapId?: string): Promise<FlashcardProgress[]> {
-    const response = await api.get<FlashcardProgress[]>("/flashcards/due", {
+  async getDueFlashcards(
+    mindMapId?: string,
+    cursor?: string | null,
+    limit?: number
+  ): Promise<FlashcardDueQueue> {
+    const response = await api.get<FlashcardDueQueue>("/flashcards/due", {
+      params: {
+        ...(mindMapId ? { mind_map_id: mindMapId } : {}),
+        ...(cursor ? { cursor } : {}),
+        ...(limit ? { limit } : {}),
+      },
+    });
+    return response.data;
+  },
+
+  async countDueFlashcards(mindMapId?: string): Promise<FlashcardDueCount> {
+    const response = await api.get<FlashcardDueCount>("/flashcards/due/count", {
       params: mindMapId ? { mind_map_id: mindMapId } : {},
     });
     return response.data;
@@ -52,4 +71,59 @@ export const flashcardService = {
     );
     return response.data;
   },
+
+  async evaluateAnswerStream(
+    flashcardId: string,
+    userAnswer: string,
+    handlers: AIEvaluationStreamHandlers
+  ): Promise<AIEvaluationResponse> {
+    // Server-sent events sobre POST: la calificación llega antes que la retroalimentación
+    const submission: FlashcardAnswerSubmission = { user_answer: userAnswer };
+    const response = await fetch(
+      `${api.defaults.baseURL}/flashcards/${flashcardId}/evaluate/stream`,
+      {
+        method: "POST",
+        headers: {
+          "Content-Type": "application/json",
+          Authorization: `Bearer ${storage.getToken()}`,
+        },
+        body: JSON.stringify(submission),
+      }
+    );
+
+    if (!response.ok || !response.body) {
+      throw new Error(`Error al evaluar la respuesta (${response.status})`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+
+    for (;;) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      let separator: number;
+      while ((separator = buffer.indexOf("\n\n")) !== -1) {
+        const message = buffer.slice(0, separator);
+        buffer = buffer.slice(separator + 2);
+
+        const event = message.match(/^event: (.*)$/m)?.[1];
+        const data = message.match(/^data: (.*)$/m)?.[1];
+        if (!event || !data) continue;
+
+        const payload = JSON.parse(data);
+        if (event === "score") {
+          handlers.onScore(payload);
+        } else if (event === "feedback") {
+          handlers.onFeedback(payload.text);
+        } else if (event === "done") {
+          return payload as AIEvaluationResponse;
+        }
+      }
+    }
+
+    throw new Error("La evaluación terminó sin resultado");
+  },
 };
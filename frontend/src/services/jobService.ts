@@ -0,0 +1,25 @@
+import api from "./api";
+import type { Job } from "../types/job";
+
+const POLL_INTERVAL_MS = 1500;
+
+export const jobService = {
+  async getJob(jobId: string): Promise<Job> {
+    const response = await api.get<Job>(`/jobs/${jobId}`);
+    return response.data;
+  },
+
+  async waitForJob(jobId: string): Promise<Job> {
+    // Consultar el estado hasta que el trabajo termine
+    for (;;) {
+      const job = await this.getJob(jobId);
+      if (job.status === "completed") {
+        return job;
+      }
+      if (job.status === "failed") {
+        throw new Error(job.error || "Error procesando el trabajo");
+      }
+      await new Promise((resolve) => setTimeout(resolve, POLL_INTERVAL_MS));
+    }
+  },
+};
@@ -1,5 +1,7 @@
 import api from "./api";
+import { jobService } from "./jobService";
 import type { MindMap, MindMapListItem } from "../types/mindmap";
+import type { Job } from "../types/job";
 
 export const mindMapService = {
   async uploadPDF(file: File, title?: string): Promise<MindMap> {
@@ -9,12 +11,14 @@ export const mindMapService = {
       formData.append("title", title);
     }
 
-    const response = await api.post<MindMap>("/mind-maps", formData, {
+    // El backend procesa el PDF en segundo plano y devuelve un trabajo
+    const response = await api.post<Job>("/mind-maps", formData, {
       headers: {
         "Content-Type": "multipart/form-data",
       },
     });
-    return response.data;
+    const job = await jobService.waitForJob(response.data.id);
+    return this.getMindMapById(job.result!.mind_map_id!);
   },
 
   async getMindMaps(
@@ -0,0 +1,11 @@
+import api from "./api";
+import type { StudyStats } from "../types/stats";
+
+export const statsService = {
+  async getStats(mindMapId?: string): Promise<StudyStats> {
+    const response = await api.get<StudyStats>("/stats", {
+      params: { mind_map_id: mindMapId },
+    });
+    return response.data;
+  },
+};
@@ -6,16 +6,29 @@ export interface Flashcard {
 }
 
 export interface FlashcardProgress {
-  id: string;
+  id: string | null; // null si la flashcard aún no se ha revisado nunca
   flashcard_id: string;
   flashcard: Flashcard;
   easiness_factor: number;
   interval: number;
   repetitions: number;
+  stability: number | null; // estado FSRS (null si no se ha revisado con FSRS)
+  difficulty: number | null;
   next_review_date: string;
   last_reviewed_at: string | null;
 }
 
+export interface FlashcardDueQueue {
+  items: FlashcardProgress[];
+  next_cursor: string | null;
+}
+
+export interface FlashcardDueCount {
+  new: number;
+  review: number;
+  total: number;
+}
+
 export interface FlashcardReview {
   quality: number; // 0-5
 }
@@ -29,3 +42,8 @@ export interface AIEvaluationResponse {
   feedback: string;
   quality_label: string;
 }
+
+export interface AIEvaluationStreamHandlers {
+  onScore: (score: Pick<AIEvaluationResponse, "quality" | "quality_label">) => void;
+  onFeedback: (text: string) => void;
+}
@@ -0,0 +1,12 @@
+export type JobStatus = "queued" | "running" | "completed" | "failed";
+
+export interface Job {
+  id: string;
+  job_type: string;
+  status: JobStatus;
+  stage: string;
+  result: { mind_map_id?: string } | null;
+  error: string | null;
+  created_at: string;
+  updated_at: string;
+}
@@ -0,0 +1,20 @@
+export interface StudyStatsCounters {
+  due_today: number;
+  new: number;
+  available_today: number;
+  learning: number;
+  mature: number;
+  games_completed: number;
+  average_score: number | null;
+  best_score: number | null;
+  best_time_seconds: number | null;
+}
+
+export interface MindMapStudyStats extends StudyStatsCounters {
+  mind_map_id: string;
+}
+
+export interface StudyStats {
+  totals: StudyStatsCounters;
+  mind_maps: MindMapStudyStats[];
+}